@@ -1,3 +1,4 @@
+import base64
 import datetime
 import logging
 import os
@@ -8,10 +9,23 @@ import botocore
 from botocore.client import Config
 from src.app.common_modules.aws.device_credentials import get_credentials_manager
 from src.app.common_modules.aws.helpers.exceptions import DownloadFailedException
+from src.app.common_modules.aws.upload_queue import UploadQueue
 from src.app.helper_methods.datetime_helpers import datetimeToMillis
 from src.app.helper_methods.model.dynamodbConfig import DynamodbConfig
+from src.app.properties.aws_properties import AwsProperties
 from src.resources.version.version import Version
 
+CONNECTION_ERRORS = (
+    botocore.exceptions.EndpointConnectionError,
+    botocore.exceptions.ConnectTimeoutError,
+    botocore.exceptions.ReadTimeoutError,
+    botocore.exceptions.ConnectionClosedError,
+)
+DOWNLOAD_ERRORS = (
+    botocore.exceptions.ResponseStreamingError,
+    botocore.exceptions.IncompleteReadError,
+)
+
 
 class AwsBoto3:
     def __init__(self):
@@ -31,6 +45,8 @@ class AwsBoto3:
         self.bucket = 'skroot-data'
         self.useCase = Version().getUseCase()
         self.runUid = datetimeToMillis(datetime.datetime.now())
+        self.lastRowConfig = None
+        self.rowFlushSeconds = AwsProperties().rowFlushSeconds
 
         # Get company ID and S3 prefix from credentials API
         self.customerId = self._credentials_manager.get_company_id()
@@ -41,6 +57,9 @@ class AwsBoto3:
             self.runFolder = f'{s3_prefix}{self.useCase}/{self.runUid}'
         else:
             self.runFolder = None
+        # The first instance becomes the client every queued upload is sent with.
+        self.UploadQueue = UploadQueue()
+        self.UploadQueue.start(self)
 
     def _ensure_credentials(self) -> bool:
         """
@@ -67,24 +86,16 @@ class AwsBoto3:
         self.dynamodb = self._session.client('dynamodb', config=self._config, region_name=self._region)
 
     def uploadFile(self, fileLocation, fileType, tags={}) -> bool:
+        """ Queues the upload of the file as it is when sent, returns whether it was queued. """
         if not self.disabled and self.runFolder:
-            # Ensure credentials are fresh before operation
-            if self._ensure_credentials():
-                self._refresh_clients()
-
-            try:
-                destination = f'{self.runFolder}/{os.path.basename(fileLocation)}'
-                self.s3.upload_file(
-                    fileLocation, self.bucket, destination,
-                    ExtraArgs={'ContentType': fileType,
-                               "Tagging": parse.urlencode(tags),
-                               "CacheControl": "no-cache"})
-            except botocore.exceptions.EndpointConnectionError:
-                logging.info('no internet', extra={"id": "aws"})
-                return False
-            except:
-                logging.exception('Error uploading file to S3.', extra={"id": "aws"})
-                return False
+            self.UploadQueue.enqueueFile(
+                fileLocation,
+                self.bucket,
+                f'{self.runFolder}/{os.path.basename(fileLocation)}',
+                {'ContentType': fileType,
+                 "Tagging": parse.urlencode(tags),
+                 "CacheControl": "no-cache"},
+            )
             return True
         else:
             return False
@@ -105,11 +116,8 @@ class AwsBoto3:
                 raise DownloadFailedException()
 
     def pushExperimentRow(self, config: DynamodbConfig) -> bool:
+        """ Queues the row of this run, coalesced with any queued row of it, returns whether it was queued. """
         if not self.disabled:
-            # Ensure credentials are fresh before operation
-            if self._ensure_credentials():
-                self._refresh_clients()
-
             if self.customerId is not None:
                 item = {
                     'customerId': {'S': self.customerId},
@@ -124,9 +132,62 @@ class AwsBoto3:
                 }
                 if config.warehouse:
                     item['warehouse'] = {'S': config.warehouse}
-                self.dynamodb.put_item(
-                    TableName='runs',
-                    Item=item
+                # Only a new saturation date can wait to be coalesced with later updates of the row.
+                material = self.lastRowConfig is None or not self.lastRowConfig.softEquals(config)
+                self.UploadQueue.enqueueItem(
+                    'runs',
+                    f'{self.customerId}/{self.runUid}',
+                    item,
+                    delaySeconds=0 if material else self.rowFlushSeconds,
+                    ignoredAttributes=('lastUpdated',),
                 )
+                self.lastRowConfig = config
                 return True
         return False
+
+    def putObject(self, fileLocation, bucket, destination, extraArgs):
+        """ Sends a queued upload, raising ConnectionError when offline. """
+        self._ensureFreshClients()
+        try:
+            self.s3.upload_file(fileLocation, bucket, destination, ExtraArgs=extraArgs)
+        except CONNECTION_ERRORS as error:
+            raise ConnectionError('no internet') from error
+
+    def putItems(self, items):
+        """ Sends queued (table, row) pairs in one batch, returning those DynamoDB left unprocessed. """
+        self._ensureFreshClients()
+        requestItems = {}
+        for table, item in items:
+            requestItems.setdefault(table, []).append({'PutRequest': {'Item': item}})
+        try:
+            response = self.dynamodb.batch_write_item(RequestItems=requestItems)
+        except CONNECTION_ERRORS as error:
+            raise ConnectionError('no internet') from error
+        return [(table, request['PutRequest']['Item'])
+                for table, requests in response.get('UnprocessedItems', {}).items()
+                for request in requests]
+
+    def getObjectInfo(self, bucket, key):
+        """ The size, ETag and SHA-256 hex digest, if known, of an object, raising ConnectionError when offline. """
+        self._ensureFreshClients()
+        try:
+            response = self.s3.head_object(Bucket=bucket, Key=key, ChecksumMode='ENABLED')
+        except CONNECTION_ERRORS as error:
+            raise ConnectionError('no internet') from error
+        sha256 = response.get('Metadata', {}).get('sha256')
+        checksum = response.get('ChecksumSHA256')
+        if sha256 is None and checksum and '-' not in checksum:  # a multipart checksum is not of the whole object
+            sha256 = base64.b64decode(checksum).hex()
+        return response['ContentLength'], response['ETag'], sha256
+
+    def getObjectRange(self, bucket, key, etag, start, stop):
+        """ Bytes start to stop of an object, failing if its ETag changed, raising ConnectionError when offline. """
+        try:
+            response = self.s3.get_object(Bucket=bucket, Key=key, IfMatch=etag, Range=f'bytes={start}-{stop - 1}')
+            return response['Body'].read()
+        except CONNECTION_ERRORS + DOWNLOAD_ERRORS as error:
+            raise ConnectionError('no internet') from error
+
+    def _ensureFreshClients(self):
+        if self._ensure_credentials():
+            self._refresh_clients()
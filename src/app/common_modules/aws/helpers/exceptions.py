@@ -5,3 +5,7 @@ class AwsException(Exception):
 class DownloadFailedException(AwsException):
     """ Base class for the aws related exceptions. """
 
+
+
+class ChecksumMismatchException(DownloadFailedException):
+    """ The downloaded file does not match its published checksum and was discarded. """
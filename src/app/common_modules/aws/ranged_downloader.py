@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.app.common_modules.aws.helpers.exceptions import ChecksumMismatchException
+from src.app.properties.aws_properties import AwsProperties
+
+
+class RangedDownloader:
+    """
+    Downloads an object in byte ranges, several at a time, so an interrupted download resumes where it stopped.
+
+    Chunks are written into {localFilename}.part and the finished chunks are recorded in {localFilename}.progress after
+    each one, so a later download of the same object, with the same ETag, only fetches the missing chunks. The SHA-256
+    of the file is computed as the chunks arrive in order and checked against the one the transport reports, if any,
+    before the file is moved into place; on a mismatch the partial files are deleted and ChecksumMismatchException is
+    raised. Chunks are fetched through a transport, an AwsBoto3 or a stand-in in tests, that raises ConnectionError when
+    offline. progress is called with the bytes downloaded, the total bytes and the throughput in bytes per second after
+    every chunk.
+    """
+
+    def __init__(self, transport, progress=None):
+        properties = AwsProperties()
+        self.transport = transport
+        self.progress = progress
+        self.chunkBytes = properties.downloadChunkMegabytes * 1024 * 1024
+        self.concurrency = properties.downloadConcurrency
+        self.attempts = properties.downloadAttempts
+        self.retrySeconds = properties.downloadRetrySeconds
+
+    def download(self, bucket: str, key: str, localFilename: str) -> str:
+        """ Downloads the object to localFilename and returns its SHA-256 hex digest. """
+        size, etag, expectedSha256 = self.transport.getObjectInfo(bucket, key)
+        partFile, progressFile = f"{localFilename}.part", f"{localFilename}.progress"
+        completed = self._loadProgress(progressFile, etag, size)
+        if not completed and os.path.exists(partFile):
+            os.remove(partFile)
+        chunks = -(-size // self.chunkBytes)
+        hasher = hashlib.sha256()
+        hashedChunks = 0
+        arrived = {}
+        startTime = time.monotonic()
+        sessionBytes = 0
+        with open(partFile, "r+b" if os.path.exists(partFile) else "w+b") as part:
+            part.truncate(size)
+            hashedChunks = self._hashChunks(part, hasher, hashedChunks, completed, arrived)
+            failure = None
+            stopped = threading.Event()
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="Download") as executor:
+                futures = {
+                    executor.submit(self._fetchChunk, bucket, key, etag, index, size, stopped): index
+                    for index in range(chunks) if index not in completed
+                }
+                try:
+                    for future in as_completed(futures):
+                        if future.exception() is not None:
+                            # Stop fetching, but keep the chunks that are already on their way for the next attempt.
+                            failure = failure or future.exception()
+                            stopped.set()
+                            continue
+                        index = futures[future]
+                        data = future.result()
+                        if data is None:
+                            continue
+                        part.seek(index * self.chunkBytes)
+                        part.write(data)
+                        part.flush()
+                        os.fsync(part.fileno())
+                        completed.add(index)
+                        self._saveProgress(progressFile, etag, size, completed)
+                        arrived[index] = data
+                        hashedChunks = self._hashChunks(part, hasher, hashedChunks, completed, arrived)
+                        sessionBytes += len(data)
+                        if self.progress is not None:
+                            downloaded = sum(self._chunkLength(chunk, size) for chunk in completed)
+                            self.progress(downloaded, size, sessionBytes / max(time.monotonic() - startTime, 1e-6))
+                finally:
+                    stopped.set()
+        if failure is not None:
+            raise failure
+        sha256 = hasher.hexdigest()
+        if expectedSha256 is not None and sha256 != expectedSha256:
+            os.remove(partFile)
+            os.remove(progressFile)
+            raise ChecksumMismatchException(f"Checksum of {key} is {sha256}, expected {expectedSha256}")
+        if expectedSha256 is None:
+            logging.info(f"No checksum for {key}, downloaded file has SHA-256 {sha256}", extra={"id": "aws"})
+        os.replace(partFile, localFilename)
+        if os.path.exists(progressFile):
+            os.remove(progressFile)
+        return sha256
+
+    """ Private functions """
+
+    def _fetchChunk(self, bucket: str, key: str, etag: str, index: int, size: int, stopped: threading.Event):
+        """ The bytes of the chunk, None if the download stopped before it was fetched. """
+        if stopped.is_set():
+            return None
+        start = index * self.chunkBytes
+        stop = start + self._chunkLength(index, size)
+        for attempt in range(1, self.attempts + 1):
+            try:
+                data = self.transport.getObjectRange(bucket, key, etag, start, stop)
+                if len(data) != stop - start:
+                    raise ConnectionError(f"Received {len(data)} of {stop - start} bytes")
+                return data
+            except ConnectionError:
+                if attempt == self.attempts:
+                    raise
+                if stopped.wait(self.retrySeconds * 2 ** (attempt - 1)):
+                    return None
+
+    def _hashChunks(self, part, hasher, hashedChunks: int, completed: set, arrived: dict) -> int:
+        """ Hashes the chunks that now follow the hashed ones, reading chunks finished in an earlier download back. """
+        while hashedChunks in completed:
+            data = arrived.pop(hashedChunks, None)
+            if data is None:
+                part.seek(hashedChunks * self.chunkBytes)
+                data = part.read(self.chunkBytes)
+            hasher.update(data)
+            hashedChunks += 1
+        return hashedChunks
+
+    def _chunkLength(self, index: int, size: int) -> int:
+        return min(self.chunkBytes, size - index * self.chunkBytes)
+
+    def _loadProgress(self, progressFile: str, etag: str, size: int) -> set:
+        """ The chunks already downloaded, none if the object or the chunk size changed since. """
+        try:
+            with open(progressFile) as progress:
+                state = json.load(progress)
+        except (FileNotFoundError, ValueError):
+            return set()
+        if (state["etag"], state["size"], state["chunkBytes"]) != (etag, size, self.chunkBytes):
+            return set()
+        return set(state["completed"])
+
+    def _saveProgress(self, progressFile: str, etag: str, size: int, completed: set):
+        temporaryFile = f"{progressFile}.tmp"
+        with open(temporaryFile, "w") as progress:
+            json.dump({"etag": etag, "size": size, "chunkBytes": self.chunkBytes, "completed": sorted(completed)},
+                      progress)
+        os.replace(temporaryFile, progressFile)
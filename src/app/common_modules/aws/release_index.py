@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import botocore
+
+
+class ReleaseIndex:
+    """
+    The version tags of the software releases under an S3 prefix, cached locally by object key and ETag.
+
+    Listing is paginated, so releases past the first 1000 objects are found. Only objects that are new or have a new
+    ETag since the last refresh have their tags fetched, in parallel, and objects that are gone are dropped from the
+    cache. Objects whose tags cannot be read, e.g. R&D releases without an R&D profile, are left out and tried again.
+    """
+
+    def __init__(self, s3, bucket: str, prefix: str, cacheFile: str, workers: int = 8):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cacheFile = cacheFile
+        self.workers = workers
+        self.releases = self._loadCache()
+
+    def refresh(self) -> dict:
+        """ Returns {key: (majorVersion, minorVersion)} of every release, reading tags only for changed objects. """
+        listed = {}
+        for page in self.s3.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                if item['Key'][-1] != '/':  # Don't try to get tags of the folder itself
+                    listed[item['Key']] = item['ETag']
+        releases = {key: release for key, release in self.releases.items() if release['etag'] == listed.get(key)}
+        uncached = [key for key in listed if key not in releases]
+        if uncached:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for key, version in zip(uncached, executor.map(self._readVersion, uncached)):
+                    if version is not None:
+                        releases[key] = {'etag': listed[key], 'major': version[0], 'minor': version[1]}
+        if releases != self.releases:
+            self.releases = releases
+            self._saveCache()
+        return {key: (release['major'], release['minor']) for key, release in releases.items()}
+
+    """ Private functions """
+
+    def _readVersion(self, key: str):
+        majorVersion = 0.0
+        minorVersion = 0
+        try:
+            for tag in self.s3.get_object_tagging(Bucket=self.bucket, Key=key)["TagSet"]:
+                if tag['Key'] == 'major_version':
+                    majorVersion = float(tag['Value'])
+                elif tag['Key'] == 'minor_version':
+                    minorVersion = int(tag['Value'])
+        except botocore.exceptions.ClientError:
+            return None  # This means it's an R&D update, and we are not using an R&D profile
+        except:
+            logging.exception("failed to get tags of software update file", extra={"id": "software-update"})
+            return None
+        return majorVersion, minorVersion
+
+    def _loadCache(self) -> dict:
+        try:
+            with open(self.cacheFile) as cache:
+                return json.load(cache)
+        except FileNotFoundError:
+            return {}
+        except:
+            logging.exception("Failed to read the release index, rebuilding it", extra={"id": "software-update"})
+            return {}
+
+    def _saveCache(self):
+        temporaryFile = f"{self.cacheFile}.tmp"
+        with open(temporaryFile, "w") as cache:
+            json.dump(self.releases, cache)
+        os.replace(temporaryFile, self.cacheFile)
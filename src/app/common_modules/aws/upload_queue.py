@@ -0,0 +1,260 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from src.app.helper_methods.file_manager.common_file_manager import CommonFileManager
+from src.app.properties.aws_properties import AwsProperties
+
+
+class UploadQueue:
+    """
+    Singleton queue of the S3 uploads and DynamoDB rows of every reader, drained by one worker thread.
+
+    Jobs are kept in an SQLite database so queued work survives restarts, and callers only ever write to it, so their
+    latency does not depend on the network. A job replaces the queued job with the same key, e.g. an older upload of
+    the same S3 object, and files are read when they are sent, so only the newest version is uploaded. Jobs are sent
+    through one transport, the AwsBoto3 passed to start() or a stand-in in tests. A failed job is retried with
+    exponential backoff, and a ConnectionError holds back the whole queue since every job would fail the same way.
+
+    DynamoDB rows may be held back for a delay so several updates of a row are coalesced into one write, a row with no
+    delay makes the held back version of it due at once. Due rows are sent together in batches of up to 25, the most
+    BatchWriteItem accepts, and a row equal to the last one sent for its key is skipped.
+    """
+
+    S3 = "s3"
+    DYNAMODB = "dynamodb"
+    MAX_BATCH_ITEMS = 25
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        properties = AwsProperties()
+        self.retrySeconds = properties.uploadRetrySeconds
+        self.maxRetrySeconds = properties.maxUploadRetrySeconds
+        self.transport = None
+        self.database = None
+        self.pausedUntil = 0
+        self.connectionFailures = 0
+        self.sentItems = {}
+        self.queuedRows = 0
+        self.coalescedRows = 0
+        self.skippedRows = 0
+        self.rowBatches = 0
+        self.condition = threading.Condition()
+        self.stopping = threading.Event()
+        self.worker = None
+
+    def start(self, transport, databaseFile: str = None):
+        """Open the queue and start draining it through the transport. Later calls are ignored."""
+        with self.condition:
+            if self.worker is not None:
+                return
+            self.transport = transport
+            self.stopping.clear()
+            self.database = sqlite3.connect(
+                databaseFile or CommonFileManager().getUploadQueueDatabase(),
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self.database.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    nextAttempt REAL NOT NULL
+                )
+            """)
+            self.worker = threading.Thread(target=self._run, name="Upload Queue", daemon=True)
+            self.worker.start()
+
+    def stop(self):
+        """Stop the worker once the job it is sending is done and close the database. Queued jobs stay queued."""
+        with self.condition:
+            worker = self.worker
+            self.stopping.set()
+            self.condition.notify_all()
+        if worker is not None:
+            worker.join()
+        with self.condition:
+            if self.database is not None:
+                self.database.close()
+            self.database = None
+            self.worker = None
+
+    def enqueueFile(self, fileLocation: str, bucket: str, destination: str, extraArgs: dict):
+        with self.condition:
+            if self.database is None:
+                logging.warning(f"Upload queue not started, dropped {destination}", extra={"id": "aws"})
+                return
+            self._enqueue(f"{self.S3}:{bucket}/{destination}", self.S3, {
+                "fileLocation": fileLocation,
+                "bucket": bucket,
+                "destination": destination,
+                "extraArgs": extraArgs,
+            }, time.time())
+
+    def enqueueItem(self, table: str, key: str, item: dict, delaySeconds: float = 0, ignoredAttributes=()):
+        """
+        Queue the row to be written after delaySeconds, or sooner if a newer version of it is due earlier. The row is
+        skipped when it equals the last row sent for the key, not counting the ignoredAttributes, e.g. timestamps.
+        """
+        jobKey = f"{self.DYNAMODB}:{table}/{key}"
+        contents = {name: value for name, value in item.items() if name not in ignoredAttributes}
+        with self.condition:
+            if self.database is None:
+                logging.warning(f"Upload queue not started, dropped {jobKey}", extra={"id": "aws"})
+                return
+            self.queuedRows += 1
+            queued = self.database.execute("SELECT nextAttempt FROM jobs WHERE key = ?", (jobKey,)).fetchone()
+            if queued is None and self.sentItems.get(jobKey) == contents:
+                self.skippedRows += 1
+                return
+            nextAttempt = time.time() + delaySeconds
+            if queued is not None:
+                self.coalescedRows += 1
+                nextAttempt = min(nextAttempt, queued[0])
+            self._enqueue(jobKey, self.DYNAMODB, {"table": table, "item": item, "contents": contents}, nextAttempt)
+
+    def getRowMetrics(self) -> dict:
+        """Counts of the rows queued, the writes saved by coalescing and skipping rows, and the batches sent."""
+        with self.condition:
+            return {
+                "queued": self.queuedRows,
+                "coalesced": self.coalescedRows,
+                "skipped": self.skippedRows,
+                "writesSaved": self.coalescedRows + self.skippedRows,
+                "batches": self.rowBatches,
+            }
+
+    def getPendingCount(self) -> int:
+        with self.condition:
+            if self.database is None:
+                return 0
+            return self.database.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def waitUntilEmpty(self, timeout: float) -> bool:
+        """Returns whether every queued job was sent within the timeout, e.g. before shutting down."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            if self.database is None:
+                return True
+            while self.database.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    """ Private functions """
+
+    def _enqueue(self, key: str, kind: str, payload: dict, nextAttempt: float):
+        """Replace any queued job with the same key. Call with the condition held."""
+        self.database.execute(
+            "INSERT OR REPLACE INTO jobs (key, kind, payload, nextAttempt) VALUES (?, ?, ?, ?)",
+            (key, kind, json.dumps(payload), nextAttempt),
+        )
+        self.condition.notify_all()
+
+    def _run(self):
+        while jobs := self._waitForDueJobs():
+            try:
+                unsent = self._send(jobs)
+            except FileNotFoundError:
+                logging.warning(f"Dropped upload of {jobs[0][1]}, the file no longer exists.", extra={"id": "aws"})
+                self._finish(jobs[0])
+            except ConnectionError:
+                self._pause()
+            except Exception:
+                logging.exception(f"Failed to upload {', '.join(job[1] for job in jobs)}", extra={"id": "aws"})
+                for job in jobs:
+                    self._retry(job)
+            else:
+                self.connectionFailures = 0
+                for job in jobs:
+                    if job in unsent:
+                        logging.info(f"{job[1]} was not processed, retrying", extra={"id": "aws"})
+                        self._retry(job)
+                    else:
+                        self._finish(job)
+
+    def _waitForDueJobs(self) -> list:
+        """The next due upload, or up to MAX_BATCH_ITEMS due rows. None once the queue is stopping."""
+        with self.condition:
+            while True:
+                if self.stopping.is_set():
+                    return None
+                job = self.database.execute(
+                    "SELECT id, key, kind, payload, attempts, nextAttempt FROM jobs ORDER BY nextAttempt, id LIMIT 1"
+                ).fetchone()
+                dueAt = None if job is None else max(job[5], self.pausedUntil)
+                if dueAt is not None and dueAt <= time.time():
+                    break
+                self.condition.wait(None if dueAt is None else dueAt - time.time())
+            if job[2] == self.S3:
+                return [job[:5]]
+            return self.database.execute(
+                "SELECT id, key, kind, payload, attempts FROM jobs WHERE kind = ? AND nextAttempt <= ? "
+                "ORDER BY nextAttempt, id LIMIT ?",
+                (self.DYNAMODB, time.time(), self.MAX_BATCH_ITEMS),
+            ).fetchall()
+
+    def _send(self, jobs: list) -> list:
+        """Send the jobs, returning those the transport did not process."""
+        payloads = [json.loads(job[3]) for job in jobs]
+        if jobs[0][2] == self.S3:
+            payload = payloads[0]
+            self.transport.putObject(payload["fileLocation"], payload["bucket"], payload["destination"],
+                                     payload["extraArgs"])
+            return []
+        unprocessed = self.transport.putItems([(payload["table"], payload["item"]) for payload in payloads])
+        with self.condition:
+            self.rowBatches += 1
+        unsent = []
+        for job, payload in zip(jobs, payloads):
+            if (payload["table"], payload["item"]) in unprocessed:
+                unsent.append(job)
+            else:
+                self.sentItems[job[1]] = payload.get("contents", payload["item"])
+        return unsent
+
+    def _finish(self, job: tuple):
+        """Remove the sent job, unless a newer job with the same key replaced it while it was being sent."""
+        with self.condition:
+            self.database.execute("DELETE FROM jobs WHERE id = ?", (job[0],))
+            self.condition.notify_all()
+
+    def _retry(self, job: tuple):
+        attempts = job[4] + 1
+        with self.condition:
+            self.database.execute(
+                "UPDATE jobs SET attempts = ?, nextAttempt = ? WHERE id = ?",
+                (attempts, time.time() + self._backoff(attempts), job[0]),
+            )
+
+    def _pause(self):
+        """Hold back every job while offline. The job keeps its attempts, it did not fail on its own."""
+        self.connectionFailures += 1
+        delay = self._backoff(self.connectionFailures)
+        logging.info(f"No connection, retrying uploads in {delay} s", extra={"id": "aws"})
+        with self.condition:
+            self.pausedUntil = time.time() + delay
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.maxRetrySeconds, self.retrySeconds * 2 ** (failures - 1))
@@ -4,11 +4,11 @@ import os
 import platform
 from zipfile import ZipFile
 
-import botocore
-
 from src.app.common_modules.aws.aws import AwsBoto3
-from src.app.common_modules.aws.helpers.exceptions import DownloadFailedException
+from src.app.common_modules.aws.helpers.exceptions import ChecksumMismatchException, DownloadFailedException
 from src.app.common_modules.aws.helpers.helpers import runShScript
+from src.app.common_modules.aws.ranged_downloader import RangedDownloader
+from src.app.common_modules.aws.release_index import ReleaseIndex
 from src.app.helper_methods.custom_exceptions.common_exceptions import UserConfirmationException
 from src.app.helper_methods.file_manager.common_file_manager import CommonFileManager
 from src.app.helper_methods.helper_functions import restartPc
@@ -31,6 +31,12 @@ class SoftwareUpdate(AwsBoto3):
         with open(release_notes_file) as f:
             self.releaseNotes = json.load(f)
         self.CommonFileManager = CommonFileManager()
+        self.ReleaseIndex = ReleaseIndex(
+            self.s3,
+            'skroot-data',
+            f"software-releases/{self.version.getUseCase()}",
+            self.CommonFileManager.getReleaseIndex(),
+        )
 
     def downloadSoftwareUpdate(self):
         try:
@@ -52,6 +58,12 @@ class SoftwareUpdate(AwsBoto3):
                 text_notification.setText("Software update aborted.")
         except UserConfirmationException:
             pass
+        except ChecksumMismatchException:
+            logging.exception("software update failed its checksum", extra={"id": "software-update"})
+            text_notification.setText("Software update download was corrupted, it will start over on the next attempt.")
+        except DownloadFailedException:
+            logging.exception("failed to download software update", extra={"id": "software-update"})
+            text_notification.setText("Software update download interrupted, it will resume on the next attempt.")
         except:
             logging.exception("failed to update software", extra={"id": "software-update"})
 
@@ -63,38 +75,11 @@ class SoftwareUpdate(AwsBoto3):
             if self._ensure_credentials():
                 self._refresh_clients()
 
-            allReleases = self.s3.list_objects_v2(
-                Bucket='skroot-data',
-                Prefix=f"software-releases/{Version().getUseCase()}",
-            )
-            # first, we're just going through the releases and finding the most recent one
-            most_recent_version = (self.newestMajorVersion, self.newestMinorVersion)
-            for item in allReleases['Contents']:
-                filename = item['Key']
-                majorVersion = 0.0
-                minorVersion = 0
-                if filename[-1] == '/':
-                    continue  # Don't try to get tags of the folder itself
-                try:
-                    tagsDict = self.s3.get_object_tagging(Bucket='skroot-data', Key=filename)
-                    if tagsDict["TagSet"]:
-                        for tags in tagsDict["TagSet"]:
-                            if tags['Key'] == 'major_version':
-                                majorVersion = float(tags['Value'])
-                            elif tags['Key'] == 'minor_version':
-                                minorVersion = int(tags['Value'])
-
-                except botocore.exceptions.ClientError as e:
-                    continue  # This means it's an R&D update, and we are not using an R&D profile
-                except:
-                    logging.exception("failed to get tags of software update file", extra={"id": "software-update"})
-                # find the greatest version in the s3 bucket
-                if (most_recent_version[0] < majorVersion) or \
-                        (most_recent_version[0] == majorVersion and most_recent_version[1] < minorVersion):
-                    most_recent_version = (majorVersion, minorVersion)
-                if (self.newestMajorVersion < most_recent_version[0]) or \
-                        (self.newestMajorVersion == most_recent_version[0] and self.newestMinorVersion <
-                         most_recent_version[1]):
+            self.ReleaseIndex.s3 = self.s3  # the client is recreated when credentials are refreshed
+            # find the greatest version in the s3 bucket
+            for filename, (majorVersion, minorVersion) in sorted(self.ReleaseIndex.refresh().items()):
+                if (self.newestMajorVersion < majorVersion) or \
+                        (self.newestMajorVersion == majorVersion and self.newestMinorVersion < minorVersion):
                     updateRequired = True
                     self.updateNewestVersion(majorVersion, minorVersion, filename)
         else:
@@ -140,5 +125,21 @@ class SoftwareUpdate(AwsBoto3):
                 f'Restart Required',
                 f'Software update will require the system to restart.\n\nAre you sure you would like to continue?',
             )
-            self.downloadFile(self.newestZipVersion, local_filename)
+            text_notification.setText("Downloading software update...")
+            self.RootManager.updateIdleTasks()
+            try:
+                RangedDownloader(self, self.showDownloadProgress).download(
+                    self.bucket,
+                    self.newestZipVersion,
+                    local_filename,
+                )
+            except ConnectionError as error:
+                raise DownloadFailedException() from error
         return ReleaseNotes.download
+
+    def showDownloadProgress(self, downloadedBytes: int, totalBytes: int, bytesPerSecond: float):
+        text_notification.setText(
+            f"Downloading software update... {100 * downloadedBytes // max(totalBytes, 1)}% "
+            f"({bytesPerSecond / 1024 / 1024:.1f} MB/s)"
+        )
+        self.RootManager.updateIdleTasks()
@@ -4,15 +4,36 @@ from typing import Optional, Tuple, List
 import numpy as np
 from scipy.optimize import curve_fit
 
+from src.app.helper_methods.model.peak_fit import PeakFit
 from src.app.properties.dev_properties import DevProperties
 
 
-def frequencyToIndex(zeroPoint, frequencyVector) -> list:
+_isDevGuiMode = None
+
+
+def frequencyToIndex(zeroPoint, frequencyVector) -> np.ndarray:
     """ This converts a frequency vector into SGI """
-    if DevProperties().isDevMode and DevProperties().mode == "GUI":
+    if isDevGuiMode():
         return frequencyVector
         # return [100 * (1 - val/frequencyVector[0]) for val in frequencyVector]
-    return [max(0, 100 * (1 - val / zeroPoint)) for val in frequencyVector]
+    # fmax rather than maximum so that failed scans (NaN) still clamp to 0 as max(0, nan) did.
+    return np.fmax(0, 100 * (1 - np.asarray(frequencyVector, dtype=float) / zeroPoint))
+
+
+def sgiCsvColumn(sgi) -> np.ndarray:
+    """ SGI to write to the analyzed files, with clamped values as the integer 0 that max(0, value) used to write. """
+    column = np.asarray(sgi, dtype=float).astype(object)
+    column[column == 0] = 0
+    return column
+
+
+def isDevGuiMode() -> bool:
+    """ Whether SGI is replaced by the recorded dev values, read from DevProperties once since it checks the disk. """
+    global _isDevGuiMode
+    if _isDevGuiMode is None:
+        devProperties = DevProperties()
+        _isDevGuiMode = devProperties.isDevMode and devProperties.mode == "GUI"
+    return _isDevGuiMode
 
 
 def truncateByX(minX, maxX, x, y) -> Tuple[list, list]:
@@ -56,7 +77,7 @@ def gaussian(x, amplitude, centroid, std) -> np.ndarray:
     return amplitude * np.exp(-(x - centroid) ** 2 / (2 * std ** 2))
 
 
-def findMaxGaussian(x, y, pointsOnEachSide: Optional[int] = 50) -> Tuple[float, float, float]:
+def findMaxGaussian(x, y, pointsOnEachSide: Optional[int] = 50, p0=None) -> Tuple[float, float, float]:
     """
     Find the peak using Gaussian curve fitting.
 
@@ -65,39 +86,187 @@ def findMaxGaussian(x, y, pointsOnEachSide: Optional[int] = 50) -> Tuple[float,
         y: Magnitude array (list or numpy array)
         pointsOnEachSide: Number of points on each side of the peak to use for fitting.
                          If None, uses all available points. Defaults to 50.
+        p0: Optional (amplitude, centroid, std) initial guess, e.g. the previous scan's fit. It is clipped to the
+            fit bounds, and ignored if its centroid is outside the fitted window.
 
     Returns:
         Tuple of (amplitude, centroid_frequency, peak_width)
     """
+    popt, _ = fitGaussianPeak(x, y, pointsOnEachSide, p0)
+
+    amplitude = popt[0]
+    centroid = popt[1]
+    peakWidth = popt[2]
+
+    return amplitude, centroid, peakWidth
+
+
+def fitGaussianPeak(x, y, pointsOnEachSide: Optional[int] = 50, p0=None) -> Tuple[np.ndarray, np.ndarray]:
+    """ The curve_fit behind findMaxGaussian, returning (popt, pcov) so callers can judge how well conditioned it is. """
     x = np.asarray(x)
     y = np.asarray(y)
-
     max_idx = np.argmax(y)
+    xAroundPeak, yAroundPeak = peakWindow(x, y, pointsOnEachSide)
+    lowerBounds = [min(y), min(xAroundPeak), 0]
+    upperBounds = [max(y), max(xAroundPeak), np.inf]
+    if p0 is None or not lowerBounds[1] <= p0[1] <= upperBounds[1] or not p0[2] > 0:
+        p0 = (max(y), x[max_idx], 1)
+    else:
+        p0 = tuple(np.clip(p0, lowerBounds, upperBounds))
+
+    return curve_fit(
+        gaussian,
+        xAroundPeak,
+        yAroundPeak,
+        p0=p0,
+        bounds=(lowerBounds, upperBounds),
+    )
+
+
+def findMaxLogParabola(x, y, pointsOnEachSide: Optional[int] = 50, p0=None) -> Tuple[float, float, float]:
+    """
+    Closed-form Gaussian peak estimate, see findMaxLogParabolas. p0 is accepted for parity with findMaxGaussian and
+    ignored, the estimate needs no initial guess.
+
+    Returns:
+        Tuple of (amplitude, centroid_frequency, peak_width)
+    """
+    amplitudes, centroids, widths = findMaxLogParabolas(x, np.asarray(y, dtype=float)[np.newaxis, :], pointsOnEachSide)
+    if np.isnan(centroids[0]):
+        raise ValueError("No peak found by the log-parabola estimate.")
+    return amplitudes[0], centroids[0], widths[0]
+
+
+def findMaxLogParabolas(x, magnitudes, pointsOnEachSide: Optional[int] = 50) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Closed-form Gaussian peak estimates for many sweeps sharing the frequencies x.
 
+    A Gaussian is a parabola in log space, so for every row of magnitudes a quadratic is fitted to log(y) by weighted
+    least squares. The fit uses the contiguous points above half of the maximum and within pointsOnEachSide of it,
+    weighted by y ** 2 so the noisier low points count less. The 3x3 normal equations of all rows are solved at once.
+
+    Returns:
+        Arrays of (amplitude, centroid_frequency, peak_width), NaN for rows without a concave peak in their top points.
+    """
+    x = np.asarray(x, dtype=float)
+    magnitudes = np.atleast_2d(np.asarray(magnitudes, dtype=float))
+    rows, columns = magnitudes.shape
+    maxIndices = np.argmax(magnitudes, axis=1)
+    halfWidth = columns if pointsOnEachSide is None else pointsOnEachSide
+    offsets = np.arange(-halfWidth, halfWidth + 1)
+    indices = maxIndices[:, np.newaxis] + offsets
+    inSweep = (indices >= 0) & (indices < columns)
+    indices = np.clip(indices, 0, columns - 1)
+    y = np.take_along_axis(magnitudes, indices, axis=1)
+    peaks = magnitudes[np.arange(rows), maxIndices]
+
+    # Grow outwards from the maximum while the points stay above half of it.
+    isTop = inSweep & (y > peaks[:, np.newaxis] / 2)
+    isTop[:, halfWidth + 1:] = np.cumprod(isTop[:, halfWidth + 1:], axis=1)
+    isTop[:, :halfWidth] = np.cumprod(isTop[:, halfWidth - 1::-1], axis=1)[:, ::-1]
+
+    # Centre x on each maximum so the normal equations stay well conditioned at 100+ MHz.
+    t = x[indices] - x[maxIndices][:, np.newaxis]
+    weights = np.where(isTop, y, 0) ** 2
+    logY = np.log(np.where(isTop, y, 1))
+    powers = np.stack([np.ones_like(t), t, t ** 2], axis=2)
+    normalMatrix = np.einsum('rk,rki,rkj->rij', weights, powers, powers)
+    normalVector = np.einsum('rk,rki,rk->ri', weights, powers, logY)
+
+    valid = (isTop.sum(axis=1) >= 3) & (peaks > 0)
+    normalMatrix[~valid] = np.eye(3)
+    normalVector[~valid] = 0
+    a, b, c = np.linalg.solve(normalMatrix, normalVector[:, :, np.newaxis])[:, :, 0].T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vertex = -b / (2 * c)
+        topOffsets = np.where(isTop, t, np.nan)
+        valid &= (c < 0) & (vertex >= np.nanmin(topOffsets, axis=1)) & (vertex <= np.nanmax(topOffsets, axis=1))
+        centroids = np.where(valid, x[maxIndices] + vertex, np.nan)
+        widths = np.where(valid, np.sqrt(-1 / (2 * c)), np.nan)
+        amplitudes = np.where(valid, np.exp(a - b ** 2 / (4 * c)), np.nan)
+    return amplitudes, centroids, widths
+
+
+PEAK_FINDERS = {
+    PeakFit.GAUSSIAN: findMaxGaussian,
+    PeakFit.LOG_PARABOLA: findMaxLogParabola,
+}
+
+
+def findPeak(x, y, pointsOnEachSide: Optional[int] = 50, peakFinder: str = PeakFit.GAUSSIAN, p0=None) -> Tuple[float, float, float]:
+    """
+    Find the peak with the named engine of PEAK_FINDERS, as chosen per use case by SibProperties.peakFinder.
+
+    Returns:
+        Tuple of (amplitude, centroid_frequency, peak_width)
+    """
+    return PEAK_FINDERS[peakFinder](x, y, pointsOnEachSide, p0)
+
+
+def peakWindow(x: np.ndarray, y: np.ndarray, pointsOnEachSide: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """ The points within pointsOnEachSide of the maximum of y, or all points if pointsOnEachSide is None. """
+    max_idx = np.argmax(y)
     if pointsOnEachSide is None:
         # Use all points
-        xAroundPeak = x
-        yAroundPeak = y
+        return x, y
     elif pointsOnEachSide < max_idx < len(y) - pointsOnEachSide:
-        xAroundPeak = x[max_idx - pointsOnEachSide:max_idx + pointsOnEachSide]
-        yAroundPeak = y[max_idx - pointsOnEachSide:max_idx + pointsOnEachSide]
+        return x[max_idx - pointsOnEachSide:max_idx + pointsOnEachSide], y[max_idx - pointsOnEachSide:max_idx + pointsOnEachSide]
     elif max_idx > pointsOnEachSide and max_idx > len(y) - pointsOnEachSide:
-        xAroundPeak = x[max_idx - pointsOnEachSide:max_idx]
-        yAroundPeak = y[max_idx - pointsOnEachSide:max_idx]
+        return x[max_idx - pointsOnEachSide:max_idx], y[max_idx - pointsOnEachSide:max_idx]
     else:
-        xAroundPeak = x[max_idx:max_idx + pointsOnEachSide]
-        yAroundPeak = y[max_idx:max_idx + pointsOnEachSide]
+        return x[max_idx:max_idx + pointsOnEachSide], y[max_idx:max_idx + pointsOnEachSide]
 
-    popt, _ = curve_fit(
-        gaussian,
-        xAroundPeak,
-        yAroundPeak,
-        p0=(max(y), x[max_idx], 1),
-        bounds=([min(y), min(xAroundPeak), 0], [max(y), max(xAroundPeak), np.inf]),
-    )
 
-    amplitude = popt[0]
-    centroid = popt[1]
-    peakWidth = popt[2]
+def fitGaussianStd(x, y, p0=None) -> Tuple[float, float, float, Optional[tuple]]:
+    """
+    Fit a Gaussian to the whole of y, then refit it to the points within half a standard deviation of the centroid.
 
-    return amplitude, centroid, peakWidth
+    Args:
+        p0: Optional (amplitude, centroid, std) initial guess for the first fit, e.g. the previous scan's fit.
+
+    Returns:
+        Tuple of (centroid, std, rSquared of the second fit, popt of the first fit), all NaN and None on failure.
+    """
+    try:
+        lowerBounds = [np.nanmin(y), np.nanmin(x), 0]
+        upperBounds = [np.inf, np.nanmax(x), np.inf]
+        if p0 is None or not lowerBounds[1] <= p0[1] <= upperBounds[1] or not p0[2] > 0:
+            p0 = (np.nanmax(y), x[np.nanargmax(y)], 1)
+        else:
+            p0 = tuple(np.clip(p0, lowerBounds, upperBounds))
+        popt, _ = curve_fit(
+            gaussian,
+            x,
+            y,
+            p0=p0,
+            bounds=(lowerBounds, upperBounds),
+            nan_policy="omit"
+        )
+        firstPopt = tuple(popt)
+        amplitude = popt[0]
+        centroid = popt[1]
+        std = popt[2]
+        indeces = [index for index, xVal in enumerate(x) if centroid + std/2 > xVal > centroid - std/2]
+        yNearPeak = [y[ind] for ind in indeces]
+        xNearPeak = [x[ind] for ind in indeces]
+        if xNearPeak and yNearPeak != []:
+            popt, _ = curve_fit(
+                gaussian,
+                xNearPeak,
+                yNearPeak,
+                p0=(np.nanmax(yNearPeak), xNearPeak[np.nanargmax(yNearPeak)], 1),
+                bounds=([np.nanmin(yNearPeak), np.nanmin(xNearPeak), 0], [np.inf, np.nanmax(xNearPeak), np.inf]),
+                nan_policy="omit"
+            )
+            amplitude = popt[0]
+            centroid = popt[1]
+            std = popt[2]
+            residuals = np.array(yNearPeak) - np.array(gaussian(xNearPeak, *popt))
+            ss_res = np.nansum(residuals ** 2)
+            ss_tot = np.nansum((yNearPeak - np.nanmean(yNearPeak)) ** 2)
+            rSquared = 1 - (ss_res / ss_tot)
+            return centroid, std, rSquared, firstPopt
+        else:
+            return np.nan, np.nan, np.nan, None
+    except:
+        return np.nan, np.nan, np.nan, None
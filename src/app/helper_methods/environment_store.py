@@ -0,0 +1,150 @@
+import logging
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import threading
+
+ENVIRONMENT_FILE = "/etc/environment"
+ASSIGNMENT = re.compile(r"^\s*(?:export\s+)?(?P<name>[A-Za-z_][A-Za-z0-9_]*)=(?P<value>.*)$")
+# Copies the new file next to the target and renames it over the target, so a power loss leaves the old or new file
+REPLACE_FILE = 'install -m 644 "$1" "$2.new" && sync "$2.new" && mv -f "$2.new" "$2"'
+
+
+class EnvironmentStore:
+    """
+    The configuration flags of /etc/environment, parsed once and kept in memory.
+
+    Reads are served from memory and only reparse the file when its modification time or size changed, so something
+    editing the file outside the app is still picked up. Writes go through one privileged call for any number of flags,
+    which atomically replaces the file with a new version so it is never left empty or partially written.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, location: str = ENVIRONMENT_FILE):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, location: str = ENVIRONMENT_FILE):
+        if self._initialized:
+            return
+        self._initialized = True
+        self.location = location
+        self.values = {}
+        self.fileSignature = None
+        self.valuesLock = threading.Lock()
+
+    def getBool(self, name: str, defaultValue: bool) -> bool:
+        setting = self.getValue(name)
+        return defaultValue if setting is None else setting.lower() == 'true'
+
+    def getString(self, name: str, defaultValue: str) -> str:
+        setting = self.getValue(name)
+        return defaultValue if setting is None else setting
+
+    def getFloat(self, name: str, defaultValue: float) -> float:
+        setting = self.getValue(name)
+        if setting is None:
+            return defaultValue
+        try:
+            return float(setting)
+        except ValueError:
+            logging.warning(f"Invalid float value for {name}: '{setting}', using default {defaultValue}",
+                            extra={"id": "configuration"})
+            return defaultValue
+
+    def getValue(self, name: str):
+        """ The unquoted value of the flag, or None if it is not set. """
+        with self.valuesLock:
+            self._reloadIfChanged()
+            return self.values.get(name)
+
+    def setValues(self, settings: dict):
+        """ Sets every flag in settings, bools as true/false, replacing the file once. """
+        if platform.system() != "Linux":
+            return
+        settings = {name: _formatValue(value) for name, value in settings.items()}
+        with self.valuesLock:
+            try:
+                lines = self._readFile().splitlines()
+                remaining = dict(settings)
+                for index, line in enumerate(lines):
+                    assignment = ASSIGNMENT.match(line)
+                    if assignment and assignment["name"] in remaining:
+                        lines[index] = _formatAssignment(assignment["name"], remaining.pop(assignment["name"]))
+                lines.extend(_formatAssignment(name, value) for name, value in remaining.items())
+                self._replaceFile("\n".join(lines) + "\n")
+            except (OSError, ValueError, subprocess.CalledProcessError):
+                logging.exception(f"Failed to set configuration {settings}", extra={"id": "configuration"})
+                return
+            self.fileSignature = None
+            logging.info(f"Configuration set: {settings}", extra={"id": "configuration"})
+
+    def _reloadIfChanged(self):
+        try:
+            status = os.stat(self.location)
+            signature = (status.st_mtime_ns, status.st_size)
+        except OSError:
+            signature = None
+        if signature == self.fileSignature and self.fileSignature is not None:
+            return
+        values = {}
+        try:
+            for line in self._readFile().splitlines():
+                assignment = ASSIGNMENT.match(line)
+                if assignment:
+                    values[assignment["name"]] = _parseValue(assignment["value"])
+        except (OSError, subprocess.CalledProcessError):
+            logging.info(f"Failed to read configuration from {self.location}", extra={"id": "configuration"})
+        self.values = values
+        self.fileSignature = signature
+
+    def _replaceFile(self, contents: str):
+        """ Writes contents to a temporary file and has one privileged call move it over the file. """
+        with tempfile.NamedTemporaryFile("w", prefix="environment", delete=False) as newFile:
+            newFile.write(contents)
+            newFile.flush()
+            os.fsync(newFile.fileno())
+        try:
+            subprocess.run(["sudo", "sh", "-c", REPLACE_FILE, "sh", newFile.name, self.location],
+                           stdout=subprocess.DEVNULL, check=True)
+        finally:
+            os.remove(newFile.name)
+
+    def _readFile(self) -> str:
+        try:
+            with open(self.location) as environment:
+                return environment.read()
+        except FileNotFoundError:
+            return ""
+        except PermissionError:
+            return subprocess.run(["sudo", "cat", self.location], text=True, capture_output=True, check=True).stdout
+
+
+def _formatAssignment(name: str, value: str) -> str:
+    """ name="value", with backslashes and double quotes in the value escaped. """
+    if "\n" in value:
+        raise ValueError(f"{name} cannot be set to a value spanning several lines")
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{name}="{escaped}"'
+
+
+def _parseValue(value: str) -> str:
+    """ The value of an assignment without its quotes, undoing the escapes of _formatAssignment. """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value.strip('"\'')
+
+
+def _formatValue(value) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
@@ -15,6 +15,8 @@ class CommonFileManager:
         self.advancedSettingsDoc = rf"{resourcesDir}/media/advancedSettings.pdf"
         self.userGuideDoc = rf"{resourcesDir}/media/userGuideDoc.pdf"
         self.experimentLogDir = f'{getDesktopLocation()}/Backend'
+        self.uploadQueueDatabase = f'{self.experimentLogDir}/Upload Queue.sqlite'
+        self.releaseIndex = f'{self.experimentLogDir}/Release Index.json'
         self.tempSoftwareUpdateZip = fr'{os.path.dirname(srcDir)}/DesktopApp.zip'
         self.tempReleaseNotes = fr'{os.path.dirname(srcDir)}/temp'
         self.tempUpdateDirectory = fr'{os.path.dirname(srcDir)}/temp'
@@ -43,6 +45,16 @@ class CommonFileManager:
     def getExperimentLogDir(self):
         return self.experimentLogDir
 
+    def getUploadQueueDatabase(self):
+        if not os.path.exists(self.experimentLogDir):
+            os.makedirs(self.experimentLogDir)
+        return self.uploadQueueDatabase
+
+    def getReleaseIndex(self):
+        if not os.path.exists(self.experimentLogDir):
+            os.makedirs(self.experimentLogDir)
+        return self.releaseIndex
+
     def getDataSavePath(self):
         if not os.path.exists(self.dataSavePath):
             os.mkdir(self.dataSavePath)
@@ -15,6 +15,8 @@ class ReaderFileManager:
         self.calibrationGlobalLocation = f'{getDesktopLocation()}/Backend/Calibration/{readerNumber}/Calibration.csv'
         self.readerPlotJpg = f'{self.readerSavePath}/Result Figure.jpg'
         self.accelerationCsv = f'{self.readerSavePath}/Acceleration.csv'
+        self.rawScanSegments = f'{self.readerSavePath}/Raw Scans'
+        self.scanTimings = f'{self.readerSavePath}/Scan Timings.csv'
         self.scanDateMillis = datetimeToMillis(datetime.now())
 
     def getReaderSavePath(self) -> str:
@@ -50,6 +52,12 @@ class ReaderFileManager:
     def getCurrentScan(self) -> str:
         return f"{self.readerSavePath}/{self.scanDateMillis}.csv"
 
+    def getRawScanSegments(self) -> str:
+        return self.rawScanSegments
+
+    def getScanTimings(self) -> str:
+        return self.scanTimings
+
 
 def getDesktopLocation() -> str:
     """ This gets the path to the computer's desktop. """
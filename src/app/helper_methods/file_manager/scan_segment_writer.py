@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.helper_methods.scan_segment import encodeScanSegment
+from src.app.properties.common_properties import CommonProperties
+
+
+class ScanSegmentWriter:
+    """
+    Packs the raw scans of a reader into rolling segment files, see scan_segment.
+
+    A segment is named after the timestamp of its first scan and holds up to CommonProperties.scansPerSegment scans.
+    A new segment is also started when the frequency grid changes. The open segment is rewritten on every scan,
+    through a temporary file, so the file on disk is always a complete segment that can be uploaded.
+    """
+
+    def __init__(self, segmentFolder: str):
+        self.segmentFolder = segmentFolder
+        self.scansPerSegment = CommonProperties().scansPerSegment
+        self.encoding = CommonProperties().rawScanEncoding
+        self.segmentFile = None
+        self.frequency = None
+        self.timestamps = []
+        self.magnitudes = []
+
+    def append(self, timestamp: int, sweepData: SweepData) -> str:
+        """ Adds the scan to the open segment and returns the segment's file. """
+        frequency = np.asarray(sweepData.getFrequency(), dtype=float)
+        if len(self.timestamps) >= self.scansPerSegment or not np.array_equal(frequency, self.frequency):
+            os.makedirs(self.segmentFolder, exist_ok=True)
+            self.segmentFile = f"{self.segmentFolder}/{timestamp}.scans"
+            self.frequency = frequency
+            self.timestamps, self.magnitudes = [], []
+        self.timestamps.append(timestamp)
+        self.magnitudes.append(np.asarray(sweepData.getMagnitude(), dtype=float))
+        temporaryFile = f"{self.segmentFile}.tmp"
+        with open(temporaryFile, "wb") as segment:
+            segment.write(encodeScanSegment(self.frequency, self.timestamps, self.magnitudes, self.encoding))
+        os.replace(temporaryFile, self.segmentFile)
+        return self.segmentFile
@@ -0,0 +1,116 @@
+import csv
+import io
+import locale
+import os
+from itertools import zip_longest
+from typing import List, Sequence
+
+import numpy as np
+
+from src.app.helper_methods.model.result_set.column import Column
+
+
+class StreamingCsvWriter:
+    """
+    Keeps a column oriented CSV file in sync with its columns without rewriting it on every scan.
+
+    The file holds the same bytes csv.writer produces for the header followed by zip_longest(*columns, fillvalue=nan).
+    The last written columns and the byte offset of every row are kept, so a write only touches the file from the
+    first row that differs: new rows are appended, changed rows are truncated and rewritten in place. A rewrite from
+    the first row (or of a file that was changed on disk) is written to a temporary file and renamed over the original.
+    """
+
+    def __init__(self, path: str, headers: List[str]):
+        self.path = path
+        self.headers = headers
+        self.encoding = locale.getpreferredencoding(False)
+        self.rowsWritten = 0
+        self.fullRewrites = 0
+        self._columns = None
+        self._offsets = Column(np.int64)
+
+    def write(self, columns: List[Sequence]):
+        columns = [self._snapshot(column) for column in columns]
+        rowCount = max([len(column) for column in columns], default=0)
+        firstChanged = 0 if not self._fileIsCurrent() else self._firstChangedRow(columns)
+        if firstChanged == 0:
+            self._rewrite(columns, rowCount)
+        elif firstChanged < max(rowCount, len(self._offsets) - 1):
+            self._writeFrom(firstChanged, columns, rowCount)
+        self._columns = columns
+
+    """ Private functions """
+
+    def _fileIsCurrent(self) -> bool:
+        return self._columns is not None and os.path.exists(self.path) and os.path.getsize(self.path) == self._offsets[-1]
+
+    def _firstChangedRow(self, columns: List[np.ndarray]) -> int:
+        firstChanged = max([len(column) for column in columns + self._columns], default=0)
+        for new, old in zip(columns, self._columns):
+            common = min(len(new), len(old))
+            if len(new) != len(old):
+                firstChanged = min(firstChanged, common)
+            different = np.flatnonzero(~self._sameValues(new[:common], old[:common]))
+            if len(different) > 0:
+                firstChanged = min(firstChanged, int(different[0]))
+        return firstChanged
+
+    def _rewrite(self, columns: List[np.ndarray], rowCount: int):
+        self.fullRewrites += 1
+        header, _ = self._render([self.headers])
+        rows, lengths = self._render(self._rows(columns, 0))
+        self._offsets.truncate(0)
+        self._offsets.extend(len(header) + np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]))
+        temporaryPath = f"{self.path}.tmp"
+        with open(temporaryPath, 'wb') as f:
+            f.write(header)
+            f.write(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaryPath, self.path)
+        self.rowsWritten += rowCount
+
+    def _writeFrom(self, rowIndex: int, columns: List[np.ndarray], rowCount: int):
+        rows, lengths = self._render(self._rows(columns, rowIndex))
+        start = int(self._offsets[rowIndex])
+        self._offsets.truncate(rowIndex + 1)
+        self._offsets.extend(start + np.cumsum(lengths, dtype=np.int64))
+        with open(self.path, 'r+b') as f:
+            f.seek(start)
+            f.truncate()
+            f.write(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        self.rowsWritten += rowCount - rowIndex
+
+    def _render(self, rows) -> tuple:
+        """Encode rows exactly as csv.writer writes them, returning the bytes and the byte length of every row."""
+        buffer = io.StringIO(newline='')
+        writer = csv.writer(buffer)
+        positions = [0]
+        for row in rows:
+            writer.writerow(row)
+            positions.append(buffer.tell())
+        text = buffer.getvalue()
+        lengths = [len(text[start:stop].encode(self.encoding)) for start, stop in zip(positions, positions[1:])]
+        return text.encode(self.encoding), lengths
+
+    @staticmethod
+    def _rows(columns: List[np.ndarray], rowIndex: int):
+        return zip_longest(*[column[rowIndex:].tolist() for column in columns], fillvalue=np.nan)
+
+    @staticmethod
+    def _snapshot(column: Sequence) -> np.ndarray:
+        """Copy the column, keeping the Python types of list items since csv writes int and float differently."""
+        if isinstance(column, np.ndarray):
+            return column.copy()
+        return np.array(list(column), dtype=object)
+
+    @staticmethod
+    def _sameValues(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+        if new.dtype != old.dtype:
+            return np.zeros(len(new), dtype=bool)
+        same = new == old
+        if new.dtype.kind in 'fcO':
+            same |= (new != new) & (old != old)
+        return same
@@ -4,8 +4,6 @@ import logging
 import os
 import platform
 import random
-import re
-import shutil
 import string
 import subprocess
 import time
@@ -19,12 +17,15 @@ from src.app.helper_methods.custom_exceptions.common_exceptions import USBDriveN
 from src.app.helper_methods.custom_exceptions.sib_exception import NoSibFound
 from src.app.helper_methods.file_manager.common_file_manager import CommonFileManager
 from src.app.helper_methods.data_helpers import convertListToPercent
+from src.app.helper_methods.environment_store import EnvironmentStore
 from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.helper_methods.scan_segment import readScanSegment
 from src.app.properties.common_properties import CommonProperties
 from src.app.properties.hardware_properties import HardwareProperties
 from src.app.properties.usb_properties import USBProperties
 from src.app.use_case.configuration.sib_properties import SibProperties
 from src.app.widget import text_notification
+from src.app.widget.logger import writeRunLog
 
 
 def getSibPort() -> ListPortInfo:
@@ -93,103 +94,32 @@ def unmountUSBDrive():
 
 def getBoolEnvFlag(varName: str, defaultValue: bool) -> bool:
     """Read a boolean flag from /etc/environment"""
-    enabled = True
-    result = subprocess.run(
-        f"sudo grep '^{varName}=' /etc/environment || echo '{varName}={defaultValue}'",
-        shell=True, text=True, capture_output=True
-    )
-
-    if result.returncode == 0:
-        setting = result.stdout.strip().split('=', 1)[1].lower().strip('"\'')
-        enabled = setting == 'true'
-    else:
-        logging.info(f"Failed to get configuration for {varName}", extra={"id": "configuration"})
-    return enabled
+    return EnvironmentStore().getBool(varName, defaultValue)
 
 
 def setBoolEnvFlag(varName: str, newSetting: bool):
     """Set a boolean flag in /etc/environment"""
-    if platform.system() == "Linux":
-        boolValue = 'true' if newSetting else 'false'
-        varExists = subprocess.run(f"sudo grep -q '^{varName}=' /etc/environment", shell=True).returncode == 0
-        if varExists:
-            process = f'sudo sed -i "s/^{varName}=.*/{varName}=\\"{boolValue}\\"/" /etc/environment'
-        else:
-            process = f'echo \'{varName}="{boolValue}"\' | sudo tee -a /etc/environment'
-        result = subprocess.run(process, shell=True, check=True)
-        if result.returncode == 0:
-            logging.info(f"Configuration {varName} set to {boolValue}", extra={"id": "configuration"})
-        else:
-            logging.info(f"Failed to set configuration {varName} to {boolValue}", extra={"id": "configuration"})
+    EnvironmentStore().setValues({varName: newSetting})
 
 
 def getStringEnvFlag(varName: str, defaultValue: str) -> str:
-    """Read a boolean flag from /etc/environment"""
-    result = subprocess.run(
-        f"sudo grep '^{varName}=' /etc/environment || echo '{varName}={defaultValue}'",
-        shell=True, text=True, capture_output=True
-    )
-
-    if result.returncode == 0:
-        setting = result.stdout.strip().split('=', 1)[1].strip('"\'')
-    else:
-        setting = ""
-        logging.info(f"Failed to get configuration for {varName}", extra={"id": "configuration"})
-    return setting
+    """Read a string value from /etc/environment"""
+    return EnvironmentStore().getString(varName, defaultValue)
 
 
 def setStringEnvFlag(varName: str, newSetting: str):
-    """Set a boolean flag in /etc/environment"""
-    if platform.system() == "Linux":
-        varExists = subprocess.run(f"sudo grep -q '^{varName}=' /etc/environment", shell=True).returncode == 0
-        if varExists:
-            escaped_value = re.escape(newSetting)
-            process = f'sudo sed -i "s#^{varName}=.*#{varName}=\\"{escaped_value}\\"#" /etc/environment'
-        else:
-            process = f'echo \'{varName}="{newSetting}"\' | sudo tee -a /etc/environment'
-        result = subprocess.run(process, shell=True, check=True)
-        if result.returncode == 0:
-            logging.info(f"Configuration {varName} set to {newSetting}", extra={"id": "configuration"})
-        else:
-            logging.info(f"Failed to set configuration {varName} to {newSetting}", extra={"id": "configuration"})
+    """Set a string value in /etc/environment"""
+    EnvironmentStore().setValues({varName: newSetting})
 
 
 def getFloatEnvFlag(varName: str, defaultValue: float) -> float:
     """Read a float value from /etc/environment"""
-    value = defaultValue
-    result = subprocess.run(
-        f"sudo grep '^{varName}=' /etc/environment || echo '{varName}={defaultValue}'",
-        shell=True, text=True, capture_output=True
-    )
-
-    if result.returncode == 0:
-        setting = result.stdout.strip().split('=', 1)[1].strip('"\'')
-        try:
-            value = float(setting)
-        except ValueError:
-            logging.warning(f"Invalid float value for {varName}: '{setting}', using default {defaultValue}",
-                            extra={"id": "configuration"})
-            value = defaultValue
-    else:
-        logging.info(f"Failed to get configuration for {varName}", extra={"id": "configuration"})
-
-    return value
+    return EnvironmentStore().getFloat(varName, defaultValue)
 
 
 def setFloatEnvFlag(varName: str, newSetting: float):
     """Set a float value in /etc/environment"""
-    if platform.system() == "Linux":
-        floatValue = str(newSetting)
-        varExists = subprocess.run(f"sudo grep -q '^{varName}=' /etc/environment", shell=True).returncode == 0
-        if varExists:
-            process = f'sudo sed -i "s/^{varName}=.*/{varName}=\\"{floatValue}\\"/" /etc/environment'
-        else:
-            process = f'echo \'{varName}="{floatValue}"\' | sudo tee -a /etc/environment'
-        result = subprocess.run(process, shell=True, check=True)
-        if result.returncode == 0:
-            logging.info(f"Configuration {varName} set to {floatValue}", extra={"id": "configuration"})
-        else:
-            logging.info(f"Failed to set configuration {varName} to {floatValue}", extra={"id": "configuration"})
+    EnvironmentStore().setValues({varName: newSetting})
 
 
 def isMenuOptionPresent(menu_bar, menu_label):
@@ -298,8 +228,10 @@ def getTimezoneOptions():
     ]
 
 
-def copyExperimentLog(destinationDirectory: str):
-    shutil.copy(f"{CommonFileManager().getExperimentLogDir()}/log.txt", destinationDirectory)
+def copyExperimentLog(destinationDirectory: str, logId: str, sinceMillis: int):
+    """ Copies the records of the run logged by logId, or by the app as a whole, since sinceMillis to log.txt. """
+    logLocation = f"{CommonFileManager().getExperimentLogDir()}/log.txt"
+    writeRunLog(logLocation, f"{destinationDirectory}/log.txt", logId, sinceMillis)
 
 
 def createScanFile(outputFileName: str, sweepData: SweepData):
@@ -310,6 +242,18 @@ def createScanFile(outputFileName: str, sweepData: SweepData):
         writer.writerows(zip(sweepData.getFrequency(), volts))
 
 
+def convertScanSegments(segmentFolder: str, outputFolder: str) -> int:
+    """ Writes every scan in the segment files of segmentFolder to {timestamp}.csv as the reader saves them. """
+    os.makedirs(outputFolder, exist_ok=True)
+    scans = 0
+    for segmentName in sorted(os.listdir(segmentFolder)):
+        if segmentName.endswith(".scans"):
+            for timestamp, sweepData in readScanSegment(f"{segmentFolder}/{segmentName}"):
+                createScanFile(f"{outputFolder}/{timestamp}.csv", sweepData)
+                scans += 1
+    return scans
+
+
 if __name__ == "__main__":
     print(getTimezone())
     print(getTimezoneOptions())
@@ -0,0 +1,16 @@
+class PeakFit:
+    GAUSSIAN = "gaussian"
+    LOG_PARABOLA = "log-parabola"
+
+    def __init__(self, amplitude, centroid, width, method: str, fitSeconds: float, warmStarted: bool,
+                 fellBack: bool = False):
+        self.amplitude = amplitude
+        self.centroid = centroid
+        self.width = width
+        self.method = method
+        self.fitSeconds = fitSeconds
+        self.warmStarted = warmStarted
+        self.fellBack = fellBack
+
+    def getParameters(self) -> tuple:
+        return self.amplitude, self.centroid, self.width
@@ -0,0 +1,135 @@
+from typing import Dict
+
+import numpy as np
+
+
+class Column:
+    """
+    Append-only buffer backed by a preallocated NumPy array that doubles when full.
+
+    Behaves enough like the list it replaces (append, len, indexing, iteration) for existing callers, while
+    values() hands out a zero-copy view of the filled part. version counts reassignments, revision counts every change.
+    """
+
+    def __init__(self, dtype=np.float64, capacity: int = 256):
+        self.dtype = np.dtype(dtype)
+        self.version = 0
+        self.revision = 0
+        self._buffer = np.empty(capacity, dtype=self.dtype)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, key):
+        return self.values()[key]
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values(), dtype=dtype)
+
+    def __repr__(self) -> str:
+        return f"Column({self.values()!r})"
+
+    def values(self) -> np.ndarray:
+        return self._buffer[:self._length]
+
+    def append(self, value):
+        if self._length == len(self._buffer):
+            self._reserve(self._length + 1)
+        self._buffer[self._length] = value
+        self._length += 1
+        self.revision += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.dtype)
+        self._reserve(self._length + len(values))
+        self._buffer[self._length:self._length + len(values)] = values
+        self._length += len(values)
+        self.revision += 1
+
+    def assign(self, values):
+        """Replace the whole contents of the column."""
+        values = np.array(values.values() if isinstance(values, Column) else values, dtype=self.dtype)
+        self._length = 0
+        self.extend(values)
+        self.version += 1
+
+    def truncate(self, length: int):
+        if length < self._length:
+            self._length = length
+            self.revision += 1
+
+    def keepLast(self, count: int = 1):
+        self.assign(self.values()[-count:] if count else [])
+
+    def _reserve(self, length: int):
+        if length > len(self._buffer):
+            capacity = len(self._buffer)
+            while capacity < length:
+                capacity *= 2
+            buffer = np.empty(capacity, dtype=self.dtype)
+            buffer[:self._length] = self._buffer[:self._length]
+            self._buffer = buffer
+
+
+class ColumnAttribute:
+    """Exposes a Column as an instance attribute; assigning a sequence to the attribute loads it into the column."""
+
+    def __set_name__(self, owner, name):
+        self.attributeName = f"_{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.attributeName)
+
+    def __set__(self, instance, values):
+        getattr(instance, self.attributeName).assign(values)
+
+
+class MaskedColumns:
+    """
+    Compacted copies of the rows of several columns selected by a boolean mask column.
+
+    Only rows from the first changed mask entry onwards are re-gathered, so the views handed out stay valid until
+    the mask changes. Columns are re-gathered from scratch when any of them has been reassigned.
+    """
+
+    def __init__(self, mask: Column, columns: Dict[str, Column]):
+        self.mask = mask
+        self.columns = columns
+        self.indices = Column(np.int64)
+        self.selected = {name: Column(column.dtype) for name, column in columns.items()}
+        self._versions = self._columnVersions()
+
+    def update(self, changedFrom: int):
+        """Re-gather the selected rows at or after changedFrom."""
+        if self._versions != self._columnVersions():
+            changedFrom = 0
+        keep = int(np.searchsorted(self.indices.values(), changedFrom))
+        self.indices.truncate(keep)
+        newIndices = changedFrom + np.flatnonzero(self.mask.values()[changedFrom:])
+        self.indices.extend(newIndices)
+        for name, column in self.columns.items():
+            available = len(column)
+            self.selected[name].truncate(int(np.searchsorted(self.indices.values()[:keep], min(changedFrom, available))))
+            self.selected[name].extend(column.values()[newIndices[newIndices < available]])
+        self._versions = self._columnVersions()
+
+    def get(self, name: str) -> np.ndarray:
+        if self._versions != self._columnVersions():
+            self.update(0)
+        return self.selected[name].values()
+
+    def getIndices(self) -> np.ndarray:
+        return self.indices.values()
+
+    def getColumn(self, name: str) -> Column:
+        self.get(name)
+        return self.selected[name]
+
+    def _columnVersions(self) -> tuple:
+        return tuple(column.version for column in self.columns.values()) + (self.mask.version,)
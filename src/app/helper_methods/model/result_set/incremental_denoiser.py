@@ -0,0 +1,235 @@
+import logging
+from typing import List
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+
+class IncrementalDenoiser:
+    """
+    Tracks the DBSCAN core points of a (time, frequency) series one point at a time.
+
+    A point is kept when at least `minSamples` standardized points (itself included) lie within `eps` of it,
+    which is exactly what calculateDenoiseIndices keeps. Neighbour counts are stored under a reference scale
+    and bracketed by `scaleTolerance`, so appending a point only updates the points within reach of it. Points
+    whose label cannot be decided from the bracket are re-checked exactly against the current scale. The counts
+    are rebuilt only when the DBSCAN parameters change or the scale drifts outside the tolerance.
+    """
+
+    def __init__(self, scaleTolerance: float = 0.05, parityCheck: bool = False):
+        self.scaleTolerance = scaleTolerance
+        self.parityCheck = parityCheck
+        self.parityMismatches = 0
+        self.fullRecounts = 0
+        self._reset()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def rebuild(self, x: List[float], y: List[float]):
+        """Discard the current state and re-seed the denoiser from an existing history."""
+        self._reset()
+        for xValue, yValue in zip(x, y):
+            self._appendPoint(xValue, yValue)
+        if self._n > 0:
+            self._recount()
+
+    def append(self, x: float, y: float):
+        """Add a point and re-label the points it can affect."""
+        self._appendPoint(x, y)
+        eps, minSamples = getDenoiseParameters(self._n)
+        currentScale = self._currentScale()
+        if (eps, minSamples) != self._parameters or not self._isSorted or not self._withinTolerance(currentScale):
+            self._recount()
+        else:
+            self._countNewPoint()
+            self._resolveAmbiguous(currentScale)
+        if self.parityCheck:
+            self._checkParity()
+
+    def getDenoiseIndices(self) -> List[int]:
+        return np.flatnonzero(self._core[:self._n]).tolist()
+
+    def getCoreMask(self) -> np.ndarray:
+        return self._core[:self._n]
+
+    def takeChangedFrom(self) -> int:
+        """Index of the first point whose label changed or was added since the last call."""
+        changedFrom, self._changedFrom = self._changedFrom, self._n
+        return changedFrom
+
+    """ Private functions """
+
+    def _reset(self):
+        self._n = 0
+        self._x = np.empty(64)
+        self._y = np.empty(64)
+        self._sureCount = np.zeros(64, dtype=np.int64)
+        self._possibleCount = np.zeros(64, dtype=np.int64)
+        self._core = np.zeros(64, dtype=bool)
+        self._ambiguous = set()
+        self._isSorted = True
+        self._parameters = None
+        self._referenceScale = None
+        self._changedFrom = 0
+        self._meanX, self._m2X, self._meanY, self._m2Y = 0.0, 0.0, 0.0, 0.0
+
+    def _appendPoint(self, x: float, y: float):
+        if np.isnan(y):
+            y = 0
+        if self._n == len(self._x):
+            self._grow()
+        if self._n > 0 and x < self._x[self._n - 1]:
+            self._isSorted = False
+        self._x[self._n] = x
+        self._y[self._n] = y
+        self._sureCount[self._n] = 0
+        self._possibleCount[self._n] = 0
+        self._core[self._n] = False
+        self._markChanged(self._n)
+        self._n += 1
+        deltaX = x - self._meanX
+        self._meanX += deltaX / self._n
+        self._m2X += deltaX * (x - self._meanX)
+        deltaY = y - self._meanY
+        self._meanY += deltaY / self._n
+        self._m2Y += deltaY * (y - self._meanY)
+
+    def _grow(self):
+        capacity = 2 * len(self._x)
+        self._x = np.resize(self._x, capacity)
+        self._y = np.resize(self._y, capacity)
+        self._sureCount = np.resize(self._sureCount, capacity)
+        self._possibleCount = np.resize(self._possibleCount, capacity)
+        self._core = np.resize(self._core, capacity)
+
+    def _currentScale(self) -> tuple:
+        """Standard deviations as StandardScaler would use them, with near-constant features scaled by 1."""
+        return (
+            self._featureScale(self._m2X / self._n, self._meanX),
+            self._featureScale(self._m2Y / self._n, self._meanY),
+        )
+
+    def _featureScale(self, variance: float, mean: float) -> float:
+        machineEps = np.finfo(np.float64).eps
+        if variance <= self._n * machineEps * variance + (self._n * mean * machineEps) ** 2:
+            return 1.0
+        return float(np.sqrt(variance))
+
+    def _withinTolerance(self, currentScale: tuple) -> bool:
+        ratios = [reference / current for reference, current in zip(self._referenceScale, currentScale)]
+        return min(ratios) >= 1 - self.scaleTolerance and max(ratios) <= 1 + self.scaleTolerance
+
+    def _radii(self) -> tuple:
+        """Reference-scale radii that are certainly / possibly within eps at any scale inside the tolerance."""
+        eps, _ = self._parameters
+        return eps / (1 + self.scaleTolerance), eps / (1 - self.scaleTolerance)
+
+    def _scaled(self, start: int, stop: int, scale: tuple) -> np.ndarray:
+        return np.column_stack([self._x[start:stop] / scale[0], self._y[start:stop] / scale[1]])
+
+    def _recount(self):
+        """Rebuild every neighbour count under the current scale."""
+        self.fullRecounts += 1
+        self._parameters = getDenoiseParameters(self._n)
+        self._referenceScale = self._currentScale()
+        if not self._isSorted:
+            # The windowed lookups rely on time being ordered, fall back to the batch path.
+            self._core[:self._n] = False
+            self._core[calculateDenoiseIndices(self._x[:self._n], self._y[:self._n])] = True
+            self._markChanged(0)
+            return
+        sureRadius, possibleRadius = self._radii()
+        data = self._scaled(0, self._n, self._referenceScale)
+        distances = NearestNeighbors(radius=possibleRadius).fit(data).radius_neighbors(data, return_distance=True)[0]
+        self._possibleCount[:self._n] = [len(neighbourDistances) for neighbourDistances in distances]
+        self._sureCount[:self._n] = [np.count_nonzero(neighbourDistances <= sureRadius) for neighbourDistances in distances]
+        self._ambiguous = set()
+        self._relabel(np.arange(self._n))
+        self._resolveAmbiguous(self._referenceScale)
+
+    def _countNewPoint(self):
+        """Add the newest point to the counts of every point within the possible radius of it."""
+        sureRadius, possibleRadius = self._radii()
+        newIndex = self._n - 1
+        start = int(np.searchsorted(self._x[:newIndex], self._x[newIndex] - possibleRadius * self._referenceScale[0]))
+        window = self._scaled(start, self._n, self._referenceScale)
+        distances = np.sqrt(np.sum((window - window[-1]) ** 2, axis=1))
+        isSure = distances <= sureRadius
+        isPossible = distances <= possibleRadius
+        self._sureCount[start:newIndex] += isSure[:-1]
+        self._possibleCount[start:newIndex] += isPossible[:-1]
+        self._sureCount[newIndex] = np.count_nonzero(isSure)
+        self._possibleCount[newIndex] = np.count_nonzero(isPossible)
+        self._relabel(start + np.flatnonzero(isPossible))
+
+    def _relabel(self, indices: np.ndarray):
+        _, minSamples = self._parameters
+        isCore = self._sureCount[indices] >= minSamples
+        changed = indices[self._core[indices] != isCore]
+        if len(changed) > 0:
+            self._markChanged(int(changed.min()))
+        self._core[indices] = isCore
+        ambiguous = (self._sureCount[indices] < minSamples) & (self._possibleCount[indices] >= minSamples)
+        self._ambiguous.difference_update(indices[~ambiguous].tolist())
+        self._ambiguous.update(indices[ambiguous].tolist())
+
+    def _resolveAmbiguous(self, currentScale: tuple):
+        """Count the neighbours of undecided points exactly under the current scale."""
+        eps, minSamples = self._parameters
+        xValues = self._x[:self._n]
+        for index in self._ambiguous:
+            start = int(np.searchsorted(xValues, xValues[index] - eps * currentScale[0], side='left'))
+            stop = int(np.searchsorted(xValues, xValues[index] + eps * currentScale[0], side='right'))
+            window = self._scaled(start, stop, currentScale)
+            point = window[index - start]
+            neighbours = np.count_nonzero(np.sqrt(np.sum((window - point) ** 2, axis=1)) <= eps)
+            if self._core[index] != (neighbours >= minSamples):
+                self._core[index] = neighbours >= minSamples
+                self._markChanged(index)
+
+    def _markChanged(self, index: int):
+        self._changedFrom = min(self._changedFrom, index)
+
+    def _checkParity(self):
+        batchIndices = calculateDenoiseIndices(self._x[:self._n], self._y[:self._n])
+        if batchIndices != self.getDenoiseIndices():
+            self.parityMismatches += 1
+            logging.warning(
+                f"Incremental denoising diverged from DBSCAN at {self._n} points, recounting.",
+                extra={"id": "denoise"})
+            self._recount()
+            self._core[:self._n] = False
+            self._core[batchIndices] = True
+            self._markChanged(0)
+
+
+def calculateDenoiseIndices(x: List[float], y: List[float]) -> List[int]:
+    """Calculate indices of non-noise points using DBSCAN clustering"""
+    threshold, points = getDenoiseParameters(len(x))
+    x = list(x)
+    y = list(y)
+    ycopy = y.copy()
+    for y_index in range(len(ycopy)):
+        if np.isnan(ycopy[y_index]):
+            ycopy[y_index] = 0
+    data = np.column_stack([x, ycopy])
+    dbsc = DBSCAN(eps=threshold, min_samples=points).fit(StandardScaler().fit(data).transform(data))
+    core_samples = np.zeros_like(dbsc.labels_, dtype=bool)
+    core_samples[dbsc.core_sample_indices_] = True
+    denoiseIndices = [i for i in range(len(core_samples)) if core_samples[i]]
+    return denoiseIndices
+
+
+def getDenoiseParameters(numberOfTimePoints: int) -> tuple:
+    """Get DBSCAN parameters based on dataset size"""
+    if numberOfTimePoints > 1000:
+        return 0.2, 20
+    elif numberOfTimePoints > 100:
+        return 0.5, 10
+    elif numberOfTimePoints > 20:
+        return 0.6, 2
+    else:
+        return 1, 1
@@ -0,0 +1,61 @@
+import numpy as np
+from scipy.signal import savgol_coeffs
+
+from src.app.helper_methods.model.result_set.column import Column
+
+
+class IncrementalSavgol:
+    """
+    Keeps an output Column equal to savgol_filter(source, windowLength, polyorder) (mode 'interp') as the source grows.
+
+    The filter only changes at the end when a value is appended: one point moves from the trailing edge into the
+    interior, where it is the dot product with the filter coefficients, and the trailing half window is re-evaluated
+    from the polynomial fitted to the last window, a fixed projection matrix. Earlier values are never recomputed
+    unless the source or output column is reassigned. Up to windowLength values the output is a copy of the source.
+
+    Unlike savgol_filter, which raises on NaNs, values whose window contains a NaN are NaN.
+    """
+
+    def __init__(self, windowLength: int = 151, polyorder: int = 2):
+        self.windowLength = windowLength
+        self.halfWindow = windowLength // 2
+        self.coefficients = savgol_coeffs(windowLength, polyorder)[::-1]
+        positions = np.arange(windowLength)
+        fit = np.linalg.pinv(np.vander(positions, polyorder + 1))
+        self.headProjection = np.vander(positions[:self.halfWindow], polyorder + 1) @ fit
+        self.tailProjection = np.vander(positions[-self.halfWindow:], polyorder + 1) @ fit
+        self.sourceVersion = None
+        self.outputVersion = None
+        self.sourceLength = 0
+
+    def update(self, source: Column, output: Column):
+        values = source.values()
+        isCurrent = source.version == self.sourceVersion and output.version == self.outputVersion \
+            and len(values) == self.sourceLength + 1 and len(output) == self.sourceLength
+        if len(values) <= self.windowLength:
+            if isCurrent:
+                output.append(values[-1])
+            else:
+                output.assign(values)
+        elif isCurrent and self.sourceLength > self.windowLength:
+            self._appendTail(values, output)
+        else:
+            output.assign(self._filter(values))
+        self.sourceVersion = source.version
+        self.outputVersion = output.version
+        self.sourceLength = len(values)
+
+    """ Private functions """
+
+    def _appendTail(self, values: np.ndarray, output: Column):
+        newInterior = len(values) - 1 - self.halfWindow
+        output.truncate(newInterior)
+        output.append(self.coefficients @ values[newInterior - self.halfWindow:newInterior + self.halfWindow + 1])
+        output.extend(self.tailProjection @ values[-self.windowLength:])
+
+    def _filter(self, values: np.ndarray) -> np.ndarray:
+        filtered = np.empty(len(values))
+        filtered[:self.halfWindow] = self.headProjection @ values[:self.windowLength]
+        filtered[self.halfWindow:-self.halfWindow] = np.convolve(values, self.coefficients[::-1], mode='valid')
+        filtered[-self.halfWindow:] = self.tailProjection @ values[-self.windowLength:]
+        return filtered
@@ -2,46 +2,93 @@ from datetime import datetime
 from typing import List
 
 import numpy as np
-from scipy.signal import savgol_filter
-from sklearn.cluster import DBSCAN
-from sklearn.preprocessing import StandardScaler
 
+from src.app.helper_methods.data_helpers import frequencyToIndex
 from src.app.helper_methods.datetime_helpers import datetimeToMillis
+from src.app.helper_methods.model.result_set.column import Column, ColumnAttribute, MaskedColumns
+from src.app.helper_methods.model.result_set.incremental_denoiser import IncrementalDenoiser, \
+    calculateDenoiseIndices, getDenoiseParameters
+from src.app.helper_methods.model.result_set.incremental_savgol import IncrementalSavgol
 from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
+from src.app.helper_methods.model.result_set.rolling_mean import RollingMean
+from src.app.properties.common_properties import CommonProperties
 from src.app.properties.harvest_properties import HarvestProperties
 
 
 class ResultSet:
+    time = ColumnAttribute()
+    maxFrequency = ColumnAttribute()
+    maxVoltsSmooth = ColumnAttribute()
+    maxFrequencySmooth = ColumnAttribute()
+    filenames = ColumnAttribute()
+    timestamps = ColumnAttribute()
+    peakWidthsSmooth = ColumnAttribute()
+    derivative = ColumnAttribute()
+    derivativeMean = ColumnAttribute()
+    smoothDerivativeMean = ColumnAttribute()
+
     def __init__(self):
         self.startTime = datetimeToMillis(datetime.now())
-        self.time = []
-        self.maxFrequency = []
-        self.maxVoltsSmooth = []
-        self.maxFrequencySmooth = []
-        self.filenames = []
-        self.timestamps = []
-        self.peakWidthsSmooth = []
-        self.derivative = []
-        self.derivativeMean = []
-        self.smoothDerivativeMean = []
-
-        self.denoiseIndices = []
-        self.denoiseSmoothIndices = []
+        self._time = Column()
+        self._maxFrequency = Column()
+        self._maxVoltsSmooth = Column()
+        self._maxFrequencySmooth = Column()
+        self._filenames = Column(object)
+        self._timestamps = Column(object)
+        self._peakWidthsSmooth = Column()
+        self._derivative = Column()
+        self._derivativeMean = Column()
+        self._smoothDerivativeMean = Column()
+
+        self._denoiseMask = Column(bool)
+        self._denoiseSmoothMask = Column(bool)
+        self._denoised = MaskedColumns(self._denoiseMask, {
+            "time": self._time,
+            "frequency": self._maxFrequency,
+            "filenames": self._filenames,
+            "timestamps": self._timestamps,
+        })
+        self._denoisedSmooth = MaskedColumns(self._denoiseSmoothMask, {
+            "time": self._time,
+            "frequency": self._maxFrequencySmooth,
+            "timestamps": self._timestamps,
+        })
+        self.denoiser = self._createDenoiser()
+        self.denoiserSmooth = self._createDenoiser()
+        self.derivativeWindow = RollingMean(HarvestProperties().derivativePoints)
+        self.derivativeSmoother = IncrementalSavgol(151, 2)
+        self._sgiMemo = {}
+
+    @property
+    def denoiseIndices(self) -> List[int]:
+        return self._denoised.getIndices().tolist()
+
+    @denoiseIndices.setter
+    def denoiseIndices(self, indices: List[int]):
+        self._setDenoiseMask(self._denoiseMask, self.denoiser, indices)
+
+    @property
+    def denoiseSmoothIndices(self) -> List[int]:
+        return self._denoisedSmooth.getIndices().tolist()
+
+    @denoiseSmoothIndices.setter
+    def denoiseSmoothIndices(self, indices: List[int]):
+        self._setDenoiseMask(self._denoiseSmoothMask, self.denoiserSmooth, indices)
 
     def getStartTime(self) -> int:
         return self.startTime
 
-    def getTime(self) -> List[float]:
-        return self.time
+    def getTime(self) -> np.ndarray:
+        return self._time.values()
 
-    def getPeakWidthsSmooth(self) -> List[float]:
-        return self.peakWidthsSmooth
+    def getPeakWidthsSmooth(self) -> np.ndarray:
+        return self._peakWidthsSmooth.values()
 
-    def getMaxFrequency(self) -> List[float]:
-        return self.maxFrequency
+    def getMaxFrequency(self) -> np.ndarray:
+        return self._maxFrequency.values()
 
-    def getMaxVoltsSmooth(self) -> List[float]:
-        return self.maxVoltsSmooth
+    def getMaxVoltsSmooth(self) -> np.ndarray:
+        return self._maxVoltsSmooth.values()
 
     def getCurrentVolts(self) -> float:
         if len(self.maxVoltsSmooth) > 0:
@@ -49,8 +96,8 @@ class ResultSet:
         else:
             return np.nan
 
-    def getMaxFrequencySmooth(self) -> List[float]:
-        return self.maxFrequencySmooth
+    def getMaxFrequencySmooth(self) -> np.ndarray:
+        return self._maxFrequencySmooth.values()
 
     def getCurrentFrequency(self) -> float:
         if len(self.maxFrequencySmooth) > 0:
@@ -58,56 +105,67 @@ class ResultSet:
         else:
             return np.nan
 
-    def getFilenames(self) -> List[str]:
-        return self.filenames
+    def getFilenames(self) -> np.ndarray:
+        return self._filenames.values()
 
-    def getDerivativeMean(self) -> List[float]:
-        return self.smoothDerivativeMean
+    def getDerivativeMean(self) -> np.ndarray:
+        return self._smoothDerivativeMean.values()
 
-    def getTimestamps(self) -> List[int]:
-        return self.timestamps
+    def getTimestamps(self) -> np.ndarray:
+        return self._timestamps.values()
 
-    def getDenoiseTime(self) -> List[float]:
-        """Get denoised time values by filtering the time array using denoiseIndices"""
-        return [self.time[i] for i in self.denoiseIndices if i < len(self.time)]
+    def getDenoiseTime(self) -> np.ndarray:
+        """Get denoised time values, the time points kept by the denoiser"""
+        return self._denoised.get("time")
 
-    def getDenoiseTimeSmooth(self) -> List[float]:
-        """Get denoised smooth time values by filtering the time array using denoiseSmoothIndices"""
-        return [self.time[i] for i in self.denoiseSmoothIndices if i < len(self.time)]
+    def getDenoiseTimeSmooth(self) -> np.ndarray:
+        """Get denoised smooth time values, the time points kept by the smooth denoiser"""
+        return self._denoisedSmooth.get("time")
 
-    def getDenoiseFrequency(self) -> List[float]:
-        """Get denoised frequency values by filtering the maxFrequency array using denoiseIndices"""
-        return [self.maxFrequency[i] for i in self.denoiseIndices if i < len(self.maxFrequency)]
+    def getDenoiseFrequency(self) -> np.ndarray:
+        """Get denoised frequency values, the maxFrequency points kept by the denoiser"""
+        return self._denoised.get("frequency")
 
-    def getDenoiseFrequencySmooth(self) -> List[float]:
-        """Get denoised smooth frequency values by filtering the maxFrequencySmooth array using denoiseSmoothIndices"""
-        return [self.maxFrequencySmooth[i] for i in self.denoiseSmoothIndices if i < len(self.maxFrequencySmooth)]
+    def getDenoiseFrequencySmooth(self) -> np.ndarray:
+        """Get denoised smooth frequency values, the maxFrequencySmooth points kept by the smooth denoiser"""
+        return self._denoisedSmooth.get("frequency")
 
-    def getDenoiseFilenames(self) -> List[str]:
+    def getDenoiseFilenames(self) -> np.ndarray:
         """Get filenames corresponding to denoised data points"""
-        return [self.filenames[i] for i in self.denoiseIndices if i < len(self.filenames)]
+        return self._denoised.get("filenames")
 
-    def getDenoiseTimestamps(self) -> List[int]:
+    def getDenoiseTimestamps(self) -> np.ndarray:
         """Get timestamps corresponding to denoised data points"""
-        return [self.timestamps[i] for i in self.denoiseIndices if i < len(self.timestamps)]
+        return self._denoised.get("timestamps")
 
-    def getDenoiseSmoothTimestamps(self) -> List[int]:
+    def getDenoiseSmoothTimestamps(self) -> np.ndarray:
         """Get timestamps corresponding to denoised smooth data points"""
-        return [self.timestamps[i] for i in self.denoiseSmoothIndices if i < len(self.timestamps)]
+        return self._denoisedSmooth.get("timestamps")
+
+    def getSgi(self, zeroPoint) -> np.ndarray:
+        """SGI of every maxFrequency point, see _memoizedSgi."""
+        return self._memoizedSgi("maxFrequency", zeroPoint, self._maxFrequency)
+
+    def getDenoiseSgi(self, zeroPoint) -> np.ndarray:
+        """SGI of the denoised maxFrequency points, see _memoizedSgi."""
+        return self._memoizedSgi("denoised", zeroPoint, self._denoised.getColumn("frequency"))
+
+    def getDenoiseSgiSmooth(self, zeroPoint) -> np.ndarray:
+        """SGI of the denoised maxFrequencySmooth points, see _memoizedSgi."""
+        return self._memoizedSgi("denoisedSmooth", zeroPoint, self._denoisedSmooth.getColumn("frequency"))
 
     def resetRun(self):
-        self.time = self.time[-1:]
-        self.maxVoltsSmooth = self.maxVoltsSmooth[-1:]
-        self.maxFrequency = self.maxFrequency[-1:]
-        self.maxFrequencySmooth = self.maxFrequencySmooth[-1:]
-        self.filenames = self.filenames[-1:]
-        self.timestamps = self.timestamps[-1:]
-        self.peakWidthsSmooth = self.peakWidthsSmooth[-1:]
-        self.derivative = self.derivative[-1:]
-        self.derivativeMean = self.derivativeMean[-1:]
-        self.smoothDerivativeMean = self.derivativeMean[-1:]
-        self.denoiseIndices = self.denoiseIndices[-1:]
-        self.denoiseSmoothIndices = self.denoiseSmoothIndices[-1:]
+        for column in [self._time, self._maxVoltsSmooth, self._maxFrequency, self._maxFrequencySmooth,
+                       self._filenames, self._timestamps, self._peakWidthsSmooth, self._derivative]:
+            column.keepLast()
+        self._derivativeMean.keepLast()
+        self.smoothDerivativeMean = self._derivativeMean
+        self.denoiser.rebuild(self.time, self.maxFrequency)
+        self.denoiserSmooth.rebuild(self.time, self.maxFrequencySmooth)
+        self._denoiseMask.assign(self.denoiser.getCoreMask())
+        self._denoiseSmoothMask.assign(self.denoiserSmooth.getCoreMask())
+        self.denoiser.takeChangedFrom()
+        self.denoiserSmooth.takeChangedFrom()
 
     def setValues(self, values: ResultSetDataPoint):
         self.time.append(values.time)
@@ -116,50 +174,64 @@ class ResultSet:
         self.maxFrequencySmooth.append(values.maxFrequencySmooth)
         self.filenames.append(values.filename)
         self.timestamps.append(values.timestamp)
-        self.denoiseIndices = self._calculateDenoiseIndices(self.time, self.maxFrequency)
-        self.denoiseSmoothIndices = self._calculateDenoiseIndices(self.time, self.maxFrequencySmooth)
+        self._updateDenoised(self.denoiser, self._denoiseMask, self._denoised, self.maxFrequency)
+        self._updateDenoised(self.denoiserSmooth, self._denoiseSmoothMask, self._denoisedSmooth, self.maxFrequencySmooth)
         self.peakWidthsSmooth.append(values.peakWidthSmooth)
         self.derivative.append(values.derivative)
         if len(self.derivative) > HarvestProperties().derivativePoints:
-            self.derivativeMean.append(self.takeDerivativeMean(self.derivative))
-            if len(self.derivativeMean) > 151:
-                self.smoothDerivativeMean = savgol_filter(self.derivativeMean, 151, 2)
-            else:
-                self.smoothDerivativeMean = self.derivativeMean
+            self.derivativeMean.append(self.derivativeWindow.update(self._derivative))
         else:
             self.derivativeMean.append(np.nan)
-            self.smoothDerivativeMean.append(np.nan)
+        self.derivativeSmoother.update(self._derivativeMean, self._smoothDerivativeMean)
+
+    def _memoizedSgi(self, series: str, zeroPoint, frequency: Column) -> np.ndarray:
+        """
+        frequencyToIndex of the series, converted once per (zeroPoint, series revision) so the plotter, KPI form,
+        analyzed files and derivative of one scan share one read-only array.
+        """
+        key = (zeroPoint, id(frequency), frequency.revision)
+        cached = self._sgiMemo.get(series)
+        if cached is None or cached[0] != key:
+            values = frequency.values()
+            sgi = frequencyToIndex(zeroPoint, values)
+            if sgi is not values:
+                sgi.flags.writeable = False
+            cached = (key, sgi)
+            self._sgiMemo[series] = cached
+        return cached[1]
 
     @staticmethod
-    def takeDerivativeMean(rawValues: List[float]):
-        return np.nanmean(rawValues[-HarvestProperties().derivativePoints:])
+    def _createDenoiser() -> IncrementalDenoiser:
+        properties = CommonProperties()
+        return IncrementalDenoiser(properties.denoiseScaleTolerance, properties.denoiseParityCheck)
+
+    def _updateDenoised(self, denoiser: IncrementalDenoiser, mask: Column, denoised: MaskedColumns, y: Column):
+        """Feed the newest point to the denoiser and re-gather the denoised rows from the first changed label."""
+        x = self.time
+        if len(denoiser) != len(x) - 1:
+            # The history was replaced, re-seed the denoiser from it.
+            denoiser.rebuild(x[:-1], y[:-1])
+        denoiser.append(x[-1], y[-1])
+        changedFrom = denoiser.takeChangedFrom()
+        mask.truncate(changedFrom)
+        mask.extend(denoiser.getCoreMask()[changedFrom:])
+        denoised.update(changedFrom)
+
+    @staticmethod
+    def _setDenoiseMask(mask: Column, denoiser: IncrementalDenoiser, indices: List[int]):
+        """Keep exactly the given rows; the denoiser is re-seeded from the history on the next scan."""
+        values = np.zeros(max(indices, default=-1) + 1, dtype=bool)
+        values[list(indices)] = True
+        mask.assign(values)
+        denoiser.rebuild([], [])
 
     @staticmethod
     def _calculateDenoiseIndices(x: List[float], y: List[float]) -> List[int]:
-        """Calculate indices of non-noise points using DBSCAN clustering"""
-        threshold, points = ResultSet._getDenoiseParameters(x)
-        x = list(x)
-        y = list(y)
-        ycopy = y.copy()
-        for y_index in range(len(ycopy)):
-            if np.isnan(ycopy[y_index]):
-                ycopy[y_index] = 0
-        data = np.column_stack([x, ycopy])
-        dbsc = DBSCAN(eps=threshold, min_samples=points).fit(StandardScaler().fit(data).transform(data))
-        core_samples = np.zeros_like(dbsc.labels_, dtype=bool)
-        core_samples[dbsc.core_sample_indices_] = True
-        denoiseIndices = [i for i in range(len(core_samples)) if core_samples[i]]
-        return denoiseIndices
+        """Calculate indices of non-noise points using DBSCAN clustering over the whole history"""
+        return calculateDenoiseIndices(x, y)
 
     @staticmethod
     def _getDenoiseParameters(numberOfTimePoints: List[float]) -> tuple:
         """Get DBSCAN parameters based on dataset size"""
-        if len(numberOfTimePoints) > 1000:
-            return 0.2, 20
-        elif len(numberOfTimePoints) > 100:
-            return 0.5, 10
-        elif len(numberOfTimePoints) > 20:
-            return 0.6, 2
-        else:
-            return 1, 1
+        return getDenoiseParameters(len(numberOfTimePoints))
 
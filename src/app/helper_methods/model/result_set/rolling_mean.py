@@ -0,0 +1,44 @@
+from collections import deque
+
+from src.app.helper_methods.model.result_set.column import Column
+from src.app.helper_methods.model.result_set.running_sum import RunningSum
+
+
+class RollingMean:
+    """
+    NaN-aware mean of the last `window` values of a Column, kept as a ring buffer with a running sum and count.
+
+    Appending one value to the column updates it in O(1); if the column was reassigned or grew by more than one
+    value since the last update, the window is refilled from the column.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.runningSum = RunningSum(window)
+        self.columnVersion = None
+        self.columnLength = 0
+
+    def update(self, column: Column) -> float:
+        if column.version == self.columnVersion and len(column) == self.columnLength + 1:
+            self._push(column[-1])
+        else:
+            self._refill(column.values()[-self.window:])
+        self.columnVersion = column.version
+        self.columnLength = len(column)
+        return self.runningSum.mean()
+
+    """ Private functions """
+
+    def _push(self, value: float):
+        value = float(value)
+        if len(self.values) == self.window:
+            self.runningSum.remove(self.values[0])
+        self.values.append(value)
+        self.runningSum.add(value)
+        self.runningSum.updated(self.values)
+
+    def _refill(self, values):
+        self.values.clear()
+        self.values.extend(float(value) for value in values)
+        self.runningSum.reset(self.values)
@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+
+
+class RunningSum:
+    """
+    NaN-skipping sum and count of the values in a sliding window, updated as values enter and leave it.
+
+    Every `window` updates the sum is added up again from the values in the window, so rounding of the running sum
+    cannot build up over a long run.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.total = 0.0
+        self.count = 0
+        self.updatesSinceResync = 0
+
+    def add(self, value: float):
+        if not math.isnan(value):
+            self.total += value
+            self.count += 1
+
+    def remove(self, value: float):
+        if not math.isnan(value):
+            self.total -= value
+            self.count -= 1
+
+    def reset(self, values):
+        """Sum the values again, which are all the values in the window."""
+        finite = [value for value in values if not math.isnan(value)]
+        self.total = math.fsum(finite)
+        self.count = len(finite)
+        self.updatesSinceResync = 0
+
+    def updated(self, values):
+        """Count one update of the window, now holding values, and resync the sum if it is due."""
+        self.updatesSinceResync += 1
+        if self.updatesSinceResync >= self.window:
+            self.reset(values)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
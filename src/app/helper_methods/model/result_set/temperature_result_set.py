@@ -1,9 +1,5 @@
-import csv
-from itertools import zip_longest
-
-import numpy as np
-
 from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
+from src.app.helper_methods.file_manager.streaming_csv_writer import StreamingCsvWriter
 from src.app.helper_methods.helper_functions import getCpuTemp
 
 
@@ -13,6 +9,10 @@ class TemperatureResultSet:
         self.temperaturesColumn = "Temperature (C)"
         self.readerFileManager = readerFileManager
         self.timestamps, self.temperatures = [], []
+        self.writer = StreamingCsvWriter(
+            self.readerFileManager.getTemperatureCsv(),
+            [self.timestampsColumn, self.temperaturesColumn],
+        )
 
     def appendTemp(self, timestamp: int):
         self.timestamps.append(timestamp)
@@ -20,13 +20,4 @@ class TemperatureResultSet:
         self.writeToFile()
 
     def writeToFile(self):
-        with open(self.readerFileManager.getTemperatureCsv(), 'w', newline='') as f:
-            writer = csv.writer(f)
-            rowHeaders = []
-            rowData = []
-            rowHeaders.append(self.timestampsColumn)
-            rowData.append(self.timestamps)
-            rowHeaders.append(self.temperaturesColumn)
-            rowData.append(self.temperatures)
-            writer.writerow(rowHeaders)
-            writer.writerows(zip_longest(*rowData, fillvalue=np.nan))
\ No newline at end of file
+        self.writer.write([self.timestamps, self.temperatures])
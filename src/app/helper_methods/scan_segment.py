@@ -0,0 +1,118 @@
+"""
+Compact binary format for raw scans, uploaded in place of one CSV per scan.
+
+A segment file holds consecutive scans that share one frequency grid:
+    b"SKSG", codec (0 gzip, 1 zstd), then compressed:
+    version u8, encoding u8, points u32, scans u32, frequency f64[points], timestamps i64[scans], magnitudes
+Magnitudes are stored either as FLOAT32, byte-shuffled so the compressor sees the slowly changing sign/exponent bytes
+of every point together, or as PACKED_12_BIT: quantized over the segment's range (offset and scale f64) with 4095 for
+NaN, two values per 3 bytes. All numbers are little endian.
+"""
+import gzip
+import struct
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from src.app.helper_methods.model.sweep_data import SweepData
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"SKSG"
+VERSION = 1
+GZIP, ZSTD = 0, 1
+FLOAT32, PACKED_12_BIT = "float32", "packed12"
+ENCODINGS = [FLOAT32, PACKED_12_BIT]
+HEADER = struct.Struct("<BBII")
+MISSING_CODE = 4095
+
+
+def encodeScanSegment(frequency, timestamps, magnitudes, encoding: str = FLOAT32) -> bytes:
+    """ A segment of the scans in the rows of magnitudes, measured at frequency and taken at the timestamps (ms). """
+    frequency = np.asarray(frequency, dtype='<f8')
+    magnitudes = np.asarray(magnitudes, dtype=float).reshape(len(timestamps), len(frequency))
+    payload = [
+        HEADER.pack(VERSION, ENCODINGS.index(encoding), len(frequency), len(timestamps)),
+        frequency.tobytes(),
+        np.asarray(timestamps, dtype='<i8').tobytes(),
+    ]
+    if encoding == FLOAT32:
+        payload.append(magnitudes.astype('<f4').view(np.uint8).reshape(-1, 4).T.tobytes())
+    else:
+        offset, scale = quantizationRange(magnitudes)
+        codes = np.full(magnitudes.shape, MISSING_CODE, dtype=np.uint16)
+        finite = np.isfinite(magnitudes)
+        codes[finite] = np.rint((magnitudes[finite] - offset) / scale)
+        payload.append(struct.pack("<dd", offset, scale))
+        payload.append(packTwelveBits(codes.ravel()))
+    if zstandard is not None:
+        return MAGIC + bytes([ZSTD]) + zstandard.ZstdCompressor(level=10).compress(b"".join(payload))
+    return MAGIC + bytes([GZIP]) + gzip.compress(b"".join(payload), compresslevel=9, mtime=0)
+
+
+def decodeScanSegment(data: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ The (frequency, timestamps, magnitudes) of a segment, with one row of magnitudes per scan. """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a scan segment")
+    if data[4] == ZSTD:
+        if zstandard is None:
+            raise ValueError("Decoding this scan segment requires the zstandard package")
+        payload = zstandard.ZstdDecompressor().decompress(data[5:])
+    else:
+        payload = gzip.decompress(data[5:])
+    version, encoding, points, scans = HEADER.unpack_from(payload)
+    if version != VERSION:
+        raise ValueError(f"Unsupported scan segment version {version}")
+    position = HEADER.size
+    frequency = np.frombuffer(payload, '<f8', points, position)
+    position += frequency.nbytes
+    timestamps = np.frombuffer(payload, '<i8', scans, position)
+    position += timestamps.nbytes
+    if ENCODINGS[encoding] == FLOAT32:
+        shuffled = np.frombuffer(payload, np.uint8, 4 * points * scans, position).reshape(4, -1)
+        magnitudes = np.ascontiguousarray(shuffled.T).view('<f4').astype(float)
+    else:
+        offset, scale = struct.unpack_from("<dd", payload, position)
+        codes = unpackTwelveBits(payload[position + 16:], points * scans)
+        magnitudes = np.where(codes == MISSING_CODE, np.nan, offset + codes * scale)
+    return frequency.copy(), timestamps.copy(), magnitudes.reshape(scans, points)
+
+
+def readScanSegment(filename: str) -> Iterator[Tuple[int, SweepData]]:
+    """ The (timestamp, SweepData) of every scan in a segment file, in the order they were taken. """
+    with open(filename, "rb") as segmentFile:
+        frequency, timestamps, magnitudes = decodeScanSegment(segmentFile.read())
+    for timestamp, magnitude in zip(timestamps, magnitudes):
+        yield int(timestamp), SweepData(frequency, magnitude)
+
+
+def quantizationRange(magnitudes: np.ndarray) -> Tuple[float, float]:
+    """ The offset and step of 12 bit codes 0 to 4094 spanning the finite magnitudes. """
+    finite = magnitudes[np.isfinite(magnitudes)]
+    if len(finite) == 0:
+        return 0.0, 1.0
+    low, high = float(finite.min()), float(finite.max())
+    return low, (high - low) / (MISSING_CODE - 1) or 1.0
+
+
+def packTwelveBits(codes: np.ndarray) -> bytes:
+    codes = np.asarray(codes, dtype=np.uint16)
+    if len(codes) % 2:
+        codes = np.append(codes, 0)
+    first, second = codes[0::2], codes[1::2]
+    packed = np.empty((len(first), 3), dtype=np.uint8)
+    packed[:, 0] = first >> 4
+    packed[:, 1] = ((first & 0xF) << 4) | (second >> 8)
+    packed[:, 2] = second & 0xFF
+    return packed.tobytes()
+
+
+def unpackTwelveBits(data: bytes, count: int) -> np.ndarray:
+    packed = np.frombuffer(data, np.uint8, 3 * ((count + 1) // 2)).reshape(-1, 3).astype(np.uint16)
+    codes = np.empty(2 * len(packed), dtype=np.uint16)
+    codes[0::2] = (packed[:, 0] << 4) | (packed[:, 1] >> 4)
+    codes[1::2] = ((packed[:, 1] & 0xF) << 8) | packed[:, 2]
+    return codes[:count]
@@ -40,5 +40,7 @@ class Main(CommonModules):
             self.GuiManager.callMainLoop()
 
 
-mpl.use('TkAgg')
-Main()
+# Guarded so the spawned Gaussian fitting processes can import this module without starting the app.
+if __name__ == "__main__":
+    mpl.use('TkAgg')
+    Main()
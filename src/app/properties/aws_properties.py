@@ -4,3 +4,10 @@ class AwsProperties:
         self.notesUploadRate = 60  # Minutes
         self.issueLogDownloadRate = 15  # Minutes
         self.rawDataUploadRate = 180  # Minutes
+        self.uploadRetrySeconds = 5  # First retry delay of a failed upload, doubled on every further failure
+        self.maxUploadRetrySeconds = 900  # Longest delay between upload retries
+        self.rowFlushSeconds = 300  # Longest time a run row update only changing the saturation date is held back
+        self.downloadChunkMegabytes = 8  # Size of the byte ranges software updates are downloaded in
+        self.downloadConcurrency = 4  # Byte ranges of a download fetched at the same time
+        self.downloadAttempts = 4  # Tries of a byte range before the download stops, to be resumed later
+        self.downloadRetrySeconds = 2  # First retry delay of a failed byte range, doubled on every further failure
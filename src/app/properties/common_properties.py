@@ -1,5 +1,20 @@
 class CommonProperties:
     def __init__(self):
         self.denoiseSet = True
+        self.denoiseScaleTolerance = 0.05  # Relative scaler drift before the denoiser recounts every point
+        self.denoiseParityCheck = False  # Compare the incremental denoiser against full DBSCAN on every scan
         self.disableSaveFullFiles = False
+        self.analysisWorkers = 4  # Threads shared by all readers for scan analysis, one per core on the Pi
+        self.fittingProcesses = 2  # Processes for Gaussian fits, 0 fits on the analysis threads instead
+        self.fitTimingHistory = 1000  # Number of recent fits kept for the fit timing metrics
+        self.figureExportSeconds = 600  # Minimum time between renders of a reader's Result Figure.jpg during a run
+        self.figureExportDpi = 100  # Resolution of Result Figure.jpg during a run
+        self.finalFigureDpi = 500  # Resolution of Result Figure.jpg rendered at the end of a run
+        self.figureTimingHistory = 200  # Number of recent figure renders kept for the render timing metrics
+        self.scansPerSegment = 36  # Raw scans packed into each uploaded segment file before a new one is started
+        self.rawScanEncoding = "float32"  # Raw scan magnitudes in segments, "float32" or "packed12" (12 bit, lossy)
+        self.scanTimingHistory = 200  # Number of recent scans kept for the scan stage timing percentiles
+        self.showScanDiagnostics = False  # Show the scan stage timings at the bottom of each reader's page
+        self.logMaxMegabytes = 10  # Size of log.txt before it is rotated to log.txt.1
+        self.logBackups = 5  # Rotated logs kept
         self.lotIdLength = 5
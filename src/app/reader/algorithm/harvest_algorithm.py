@@ -2,13 +2,12 @@ import datetime
 import logging
 
 import numpy as np
-from scipy.optimize import curve_fit
 
-from src.app.helper_methods.data_helpers import gaussian
 from src.app.helper_methods.datetime_helpers import datetimeToMillis
 from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
 from src.app.properties.harvest_properties import HarvestProperties
 from src.app.reader.algorithm.algorithm_interface import AlgorithmInterface
+from src.app.reader.analyzer.gaussian_fitting_service import GaussianFittingService
 
 
 class HarvestAlgorithm(AlgorithmInterface):
@@ -20,6 +19,7 @@ class HarvestAlgorithm(AlgorithmInterface):
         self.historicalHarvestTime = []
         self.currentHarvestPrediction = np.nan
         self.differentPredictions = []
+        self.previousFit = None
 
     def check(self, resultSet):
         center, std, rSquared, harvestTime = np.nan, np.nan, np.nan, np.nan
@@ -34,7 +34,9 @@ class HarvestAlgorithm(AlgorithmInterface):
     """ End of publicly visible functions required for algorithms. """
 
     def harvestAlgorithm(self, timestamps, time, derivative):
-        centroid, std, rSquared = self.findGaussianStd(time, derivative)
+        centroid, std, rSquared, popt = GaussianFittingService().fitHarvestGaussian(time, derivative, self.previousFit)
+        if popt is not None:
+            self.previousFit = popt
         if len(time) != len(derivative):
             logging.warning(
                 f"Cannot estimate harvest window, len(time)={len(time)} != len(derivative)={len(derivative)}",
@@ -74,43 +76,3 @@ class HarvestAlgorithm(AlgorithmInterface):
     @staticmethod
     def distanceFromYEqualsX(x, y):
         return abs(x - y) / (2 ** 0.5)
-
-    @staticmethod
-    def findGaussianStd(x, y):
-        try:
-            popt, _ = curve_fit(
-                gaussian,
-                x,
-                y,
-                p0=(np.nanmax(y), x[np.nanargmax(y)], 1),
-                bounds=([np.nanmin(y), np.nanmin(x), 0], [np.inf, np.nanmax(x), np.inf]),
-                nan_policy="omit"
-            )
-            amplitude = popt[0]
-            centroid = popt[1]
-            std = popt[2]
-            indeces = [index for index, xVal in enumerate(x) if centroid + std/2 > xVal > centroid - std/2]
-            yNearPeak = [y[ind] for ind in indeces]
-            xNearPeak = [x[ind] for ind in indeces]
-            if xNearPeak and yNearPeak != []:
-                popt, _ = curve_fit(
-                    gaussian,
-                    xNearPeak,
-                    yNearPeak,
-                    p0=(np.nanmax(yNearPeak), xNearPeak[np.nanargmax(yNearPeak)], 1),
-                    bounds=([np.nanmin(yNearPeak), np.nanmin(xNearPeak), 0], [np.inf, np.nanmax(xNearPeak), np.inf]),
-                    nan_policy="omit"
-                )
-                amplitude = popt[0]
-                centroid = popt[1]
-                std = popt[2]
-                residuals = np.array(yNearPeak) - np.array(gaussian(xNearPeak, *popt))
-                ss_res = np.nansum(residuals ** 2)
-                ss_tot = np.nansum((yNearPeak - np.nanmean(yNearPeak)) ** 2)
-                rSquared = 1 - (ss_res / ss_tot)
-                return centroid, std, rSquared
-            else:
-                return np.nan, np.nan, np.nan
-        except:
-            return np.nan, np.nan, np.nan
-
@@ -1,20 +1,24 @@
-import csv
 import logging
 import os.path
-from itertools import zip_longest
+from typing import Tuple
 
 import numpy as np
 from scipy.signal import savgol_filter
 
 from src.app.helper_methods.custom_exceptions.analysis_exception import ScanAnalysisException
-from src.app.helper_methods.data_helpers import frequencyToIndex, findMaxGaussian
+from src.app.helper_methods.data_helpers import sgiCsvColumn
 from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
+from src.app.helper_methods.file_manager.streaming_csv_writer import StreamingCsvWriter
+from src.app.helper_methods.model.peak_fit import PeakFit
 from src.app.helper_methods.model.result_set.result_set import ResultSet
 from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
 from src.app.helper_methods.model.result_set.temperature_result_set import TemperatureResultSet
 from src.app.helper_methods.model.sweep_data import SweepData
 from src.app.properties.harvest_properties import HarvestProperties
 from src.app.reader.algorithm.harvest_algorithm import HarvestAlgorithm
+from src.app.reader.analyzer.gaussian_fitting_service import GaussianFittingService
+from src.app.reader.analyzer.rolling_derivative import RollingDerivative
+from src.app.reader.helpers.scan_timer import timedSpan
 from src.app.use_case.use_case_factory import ContextFactory
 
 
@@ -25,7 +29,18 @@ class Analyzer:
         self.sweepData = SweepData([], [])
         self.FileManager = FileManager
         self.HarvestAlgorithm = harvestAlgorithm
+        self.SibProperties = ContextFactory().getSibProperties()
         self.TemperatureResultSet = TemperatureResultSet(FileManager)
+        self.previousPeakFits = [None, None]
+        self.DerivativeEstimator = RollingDerivative(HarvestProperties().derivativePoints)
+        self.AnalyzedWriter = StreamingCsvWriter(
+            FileManager.getAnalyzed(),
+            ['Filename', 'Time (hours)', 'Timestamp', 'Skroot Growth Index (SGI)', 'Frequency (MHz)'],
+        )
+        self.SmoothAnalyzedWriter = StreamingCsvWriter(
+            FileManager.getSmoothAnalyzed(),
+            ['Timestamp', 'Time (hours)', 'Skroot Growth Index (SGI)', 'Derivative', 'Estimated Harvest Time (hrs)'],
+        )
 
     def analyzeScan(self, sweepData: SweepData, shouldDenoise):
         self.sweepData = sweepData
@@ -34,28 +49,31 @@ class Analyzer:
         resultSet.setFilename(os.path.basename(self.FileManager.getCurrentScan()))
         resultSet.setTimestamp(self.FileManager.getCurrentScanDate())
         try:
-            peakHeight, maxFreq, peakWidth = self.findMaxGaussian(sweepData.frequency, sweepData.magnitude)
-            resultSet.setMaxFrequency(maxFreq)
-            maxMag, maxFreq, peakWidth = self.findMaximumDataSmooth(sweepData)
+            with timedSpan("peakFit"):
+                rawPeakFit, smoothPeakFit = self.fitPeaks(sweepData)
+            resultSet.setMaxFrequency(rawPeakFit.centroid)
+            maxMag, maxFreq, peakWidth = smoothPeakFit.getParameters()
             resultSet.setMaxVoltsSmooth(maxMag)
             resultSet.setMaxFrequencySmooth(maxFreq)
             resultSet.setPeakWidthSmooth(peakWidth)
-            if shouldDenoise and len(self.ResultSet.getTime()) > 0:
-                derivative = self.calculateDerivativeValues(
-                    self.ResultSet.getDenoiseTimeSmooth(),
-                    frequencyToIndex(self.zeroPoint, self.ResultSet.getDenoiseFrequencySmooth()),
-                )
-            else:
-                derivative = self.calculateDerivativeValues(
-                    self.ResultSet.getTime(),
-                    frequencyToIndex(self.zeroPoint, self.ResultSet.getMaxFrequency()),
-                )
+            with timedSpan("derivative"):
+                if shouldDenoise and len(self.ResultSet.getTime()) > 0:
+                    derivative = self.calculateDerivativeValues(
+                        self.ResultSet.getDenoiseTimeSmooth(),
+                        self.ResultSet.getDenoiseSgiSmooth(self.zeroPoint),
+                    )
+                else:
+                    derivative = self.calculateDerivativeValues(
+                        self.ResultSet.getTime(),
+                        self.ResultSet.getSgi(self.zeroPoint),
+                    )
             resultSet.setDerivative(derivative)
             self.TemperatureResultSet.appendTemp(resultSet.timestamp)
         except:
             raise ScanAnalysisException()
         finally:
-            self.ResultSet.setValues(resultSet)
+            with timedSpan("denoise"):
+                self.ResultSet.setValues(resultSet)
 
     def recordFailedScan(self):
         self.sweepData = SweepData([], [])
@@ -66,38 +84,20 @@ class Analyzer:
         self.ResultSet.setValues(resultSet)
 
     def createAnalyzedFiles(self):
-        with open(self.FileManager.getAnalyzed(), 'w', newline='') as f:
-            writer = csv.writer(f)
-            rowHeaders = []
-            rowData = []
-            rowHeaders.append('Filename')
-            rowData.append(self.ResultSet.getDenoiseFilenames())
-            rowHeaders.append('Time (hours)')
-            rowData.append(self.ResultSet.getDenoiseTime())
-            rowHeaders.append('Timestamp')
-            rowData.append(self.ResultSet.getDenoiseTimestamps())
-            rowHeaders.append('Skroot Growth Index (SGI)')
-            rowData.append(frequencyToIndex(self.zeroPoint, self.ResultSet.getDenoiseFrequency()))
-            rowHeaders.append('Frequency (MHz)')
-            rowData.append(self.ResultSet.getDenoiseFrequency())
-            writer.writerow(rowHeaders)
-            writer.writerows(zip_longest(*rowData, fillvalue=np.nan))
-        with open(self.FileManager.getSmoothAnalyzed(), 'w', newline='') as f:
-            writer = csv.writer(f)
-            rowHeaders = []
-            rowData = []
-            rowHeaders.append('Timestamp')
-            rowData.append(self.ResultSet.getDenoiseSmoothTimestamps())
-            rowHeaders.append('Time (hours)')
-            rowData.append(self.ResultSet.getDenoiseTimeSmooth())
-            rowHeaders.append('Skroot Growth Index (SGI)')
-            rowData.append(frequencyToIndex(self.zeroPoint, self.ResultSet.getDenoiseFrequencySmooth()))
-            rowHeaders.append('Derivative')
-            rowData.append(self.ResultSet.getDerivativeMean())
-            rowHeaders.append('Estimated Harvest Time (hrs)')
-            rowData.append(self.HarvestAlgorithm.historicalHarvestTime)
-            writer.writerow(rowHeaders)
-            writer.writerows(zip_longest(*rowData, fillvalue=np.nan))
+        self.AnalyzedWriter.write([
+            self.ResultSet.getDenoiseFilenames(),
+            self.ResultSet.getDenoiseTime(),
+            self.ResultSet.getDenoiseTimestamps(),
+            sgiCsvColumn(self.ResultSet.getDenoiseSgi(self.zeroPoint)),
+            self.ResultSet.getDenoiseFrequency(),
+        ])
+        self.SmoothAnalyzedWriter.write([
+            self.ResultSet.getDenoiseSmoothTimestamps(),
+            self.ResultSet.getDenoiseTimeSmooth(),
+            sgiCsvColumn(self.ResultSet.getDenoiseSgiSmooth(self.zeroPoint)),
+            self.ResultSet.getDerivativeMean(),
+            self.HarvestAlgorithm.historicalHarvestTime,
+        ])
 
     def setZeroPoint(self, zeroPoint):
         self.zeroPoint = zeroPoint
@@ -107,39 +107,34 @@ class Analyzer:
 
     """ End of required public functions on future interface. """
 
-    def findMaximumDataSmooth(self, sweepData):
+    def fitPeaks(self, sweepData: SweepData) -> Tuple[PeakFit, PeakFit]:
+        """Find the raw and smoothed peaks with the use case's peak finder in one task of the fitting service."""
+        pointsOnEachSide = self.pointsOnEachSide()
+        peakFinder = self.SibProperties.peakFinder
+        smoothFrequency, smoothMagnitude = self.smoothSweep(sweepData)
+        rawPeakFit, smoothPeakFit = GaussianFittingService().fitPeaks([
+            (np.asarray(sweepData.frequency), np.asarray(sweepData.magnitude), pointsOnEachSide,
+             self.previousPeakFits[0], peakFinder),
+            (np.asarray(smoothFrequency), np.asarray(smoothMagnitude), pointsOnEachSide,
+             self.previousPeakFits[1], peakFinder),
+        ])
+        self.previousPeakFits = [rawPeakFit.getParameters(), smoothPeakFit.getParameters()]
+        return rawPeakFit, smoothPeakFit
+
+    @staticmethod
+    def smoothSweep(sweepData: SweepData) -> tuple:
         if len(sweepData.getMagnitude()) > 101:
-            smoothedSweepData = SweepData(sweepData.getFrequency(), savgol_filter(sweepData.getMagnitude(), 101, 2))
-            return self.findMaxGaussian(smoothedSweepData.frequency, smoothedSweepData.magnitude)
+            return sweepData.getFrequency(), savgol_filter(sweepData.getMagnitude(), 101, 2)
         else:
-            return self.findMaxGaussian(sweepData.frequency, sweepData.magnitude)
+            return sweepData.frequency, sweepData.magnitude
 
-    @staticmethod
-    def findMaxGaussian(x, y) -> (float, float, float):
-        """
-        Find the peak using Gaussian curve fitting.
-        Uses the shared findMaxGaussian helper with default 50 points on each side.
-        """
-        return findMaxGaussian(x, y, pointsOnEachSide=round(5 * (1 / ContextFactory().getSibProperties().stepSize)))   # 5 MHz on each side
+    def pointsOnEachSide(self) -> int:
+        return round(5 * (1 / self.SibProperties.stepSize))   # 5 MHz on each side
 
-    @staticmethod
-    def calculateDerivativeValues(time, sgi) -> float:
+    def calculateDerivativeValues(self, time, sgi) -> float:
         derivativeValue = np.nan
         try:
-            chunk_size = HarvestProperties().derivativePoints
-            if len(time) > chunk_size:
-                timeChunk = time[-chunk_size:]
-                sgiChunk = sgi[-chunk_size:]
-
-                timeChanges = []
-                sgiChanges = []
-                for index in range(len(timeChunk)-1):
-                    sgiChanges.append(sgiChunk[index+1] - sgiChunk[index])
-                    timeChanges.append(timeChunk[index+1] - timeChunk[index])
-                quartile1 = np.nanquantile(sgiChanges, 0.25)
-                quartile3 = np.nanquantile(sgiChanges, 0.75)
-                finalSgiChanges = [sgi for sgi in sgiChanges if quartile1 < sgi < quartile3]
-                derivativeValue = np.nanmean(finalSgiChanges) / np.nanmean(timeChanges)
+            derivativeValue = self.DerivativeEstimator.update(time, sgi)
         except:
             logging.exception("Failed to get derivative values", extra={"id": "global"})
         finally:
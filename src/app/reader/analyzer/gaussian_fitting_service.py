@@ -0,0 +1,245 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.app.helper_methods.data_helpers import fitGaussianPeak, findMaxLogParabola, fitGaussianStd, \
+    findMaxGaussian
+from src.app.helper_methods.model.peak_fit import PeakFit
+from src.app.properties.common_properties import CommonProperties
+
+
+class GaussianFittingService:
+    """
+    Singleton that runs the Gaussian fits of every reader off the reader threads.
+
+    Once started, fits run in a process pool so curve_fit does not hold the GIL of the GUI and serial I/O threads.
+    The peak fits of one scan are sent to the pool as a single task, and scans of different readers run in parallel
+    while a fitting process is free. Scans that arrive while every process is busy wait together and are then sent as
+    one task, so a burst of readers finishing at once pays one round trip. Callers pass the previous scan's parameters
+    as the initial guess and the SibProperties.peakFinder engine. A Gaussian fit that is ill-conditioned falls back to
+    the closed-form log-parabola estimate and vice versa. Until start() is called (e.g. post-processing) fits run in
+    the caller. If a fitting process dies the pool is rebuilt once and the fit retried, so one crash does not fail
+    every later scan.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.timings = deque(maxlen=CommonProperties().fitTimingHistory)
+        self._timingsLock = threading.Lock()
+        self._waitingFits: List[_WaitingFits] = []
+        self._fitsInFlight = 0
+        self._fitsCondition = threading.Condition()
+
+    def start(self):
+        """Start the process pool. Workers are spawned rather than forked since the app runs Tk and I/O threads."""
+        with self._lock:
+            if self.pool is None:
+                self.pool = self._createPool()
+
+    def shutdown(self):
+        with self._lock:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+                self.pool = None
+
+    def fitPeaks(self, requests: List[Tuple]) -> List[PeakFit]:
+        """
+        Fit the peak of every (x, y, pointsOnEachSide, p0, peakFinder) request in one task. p0 is the previous scan's
+        (amplitude, centroid, width) for the same reader, or None. peakFinder is SibProperties.peakFinder.
+        """
+        roundTripStart = time.perf_counter()
+        fits = fitPeakBatch(requests) if self.pool is None else self._fitWithOtherReaders(requests)
+        roundTripSeconds = time.perf_counter() - roundTripStart
+        for fit in fits:
+            self._recordTiming("peak", fit.method, fit.fellBack, fit.fitSeconds, roundTripSeconds, fit.warmStarted)
+        return fits
+
+    def fitHarvestGaussian(self, x, y, p0=None) -> Tuple[float, float, float, Optional[tuple]]:
+        """fitGaussianStd in the pool, returning (centroid, std, rSquared, popt)."""
+        roundTripStart = time.perf_counter()
+        result, fitSeconds = self._run(timedHarvestFit, np.asarray(x, dtype=float), np.asarray(y, dtype=float), p0)
+        failed = result[3] is None
+        self._recordTiming("harvest", PeakFit.GAUSSIAN, failed, fitSeconds, time.perf_counter() - roundTripStart,
+                           p0 is not None)
+        return result
+
+    def getMetrics(self) -> dict:
+        """Per kind of fit: the number of fits, fallbacks and warm starts, and fit and round trip times in ms."""
+        with self._timingsLock:
+            timings = list(self.timings)
+        metrics = {}
+        for kind in sorted({timing[0] for timing in timings}):
+            ofKind = [timing for timing in timings if timing[0] == kind]
+            fitMs = np.array([timing[3] for timing in ofKind]) * 1000
+            roundTripMs = np.array([timing[4] for timing in ofKind]) * 1000
+            metrics[kind] = {
+                "fits": len(ofKind),
+                "fallbacks": sum(timing[2] for timing in ofKind),
+                "warmStarts": sum(timing[5] for timing in ofKind),
+                "meanFitMs": float(np.mean(fitMs)),
+                "maxFitMs": float(np.max(fitMs)),
+                "meanRoundTripMs": float(np.mean(roundTripMs)),
+            }
+        return metrics
+
+    """ Private functions """
+
+    @staticmethod
+    def _createPool() -> Optional[ProcessPoolExecutor]:
+        if CommonProperties().fittingProcesses <= 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=CommonProperties().fittingProcesses,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _run(self, function, *args):
+        pool = self.pool
+        if pool is None:
+            return function(*args)
+        try:
+            return pool.submit(function, *args).result()
+        except BrokenProcessPool:
+            logging.exception("A fitting process died, restarting the fitting pool", extra={"id": "Gaussian Fitting"})
+        pool = self._replaceBrokenPool(pool)
+        if pool is None:
+            return function(*args)
+        return pool.submit(function, *args).result()
+
+    def _fitWithOtherReaders(self, requests: List[Tuple]) -> List[PeakFit]:
+        """
+        Send the requests to the pool while fewer tasks than fitting processes are in flight, together with the
+        requests of every other reader waiting by then. Otherwise wait until a process is free or another reader has
+        sent them.
+        """
+        waiting = _WaitingFits(requests)
+        with self._fitsCondition:
+            self._waitingFits.append(waiting)
+            while not waiting.sent and self._fitsInFlight >= max(CommonProperties().fittingProcesses, 1):
+                self._fitsCondition.wait()
+            if not waiting.sent:
+                batch, self._waitingFits = self._waitingFits, []
+                for waitingFits in batch:
+                    waitingFits.sent = True
+                self._fitsInFlight += 1
+            else:
+                batch = []
+        if batch:
+            try:
+                results = self._run(fitPeakBatches, [waitingFits.requests for waitingFits in batch])
+            except Exception as error:
+                results = [error] * len(batch)
+            with self._fitsCondition:
+                for waitingFits, result in zip(batch, results):
+                    waitingFits.result = result
+                    waitingFits.done = True
+                self._fitsInFlight -= 1
+                self._fitsCondition.notify_all()
+        with self._fitsCondition:
+            while not waiting.done:
+                self._fitsCondition.wait()
+        if isinstance(waiting.result, Exception):
+            raise waiting.result
+        return waiting.result
+
+    def _replaceBrokenPool(self, brokenPool: ProcessPoolExecutor) -> Optional[ProcessPoolExecutor]:
+        """Replace the broken pool, unless another reader already did or the service was shut down meanwhile."""
+        with self._lock:
+            if self.pool is brokenPool:
+                brokenPool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._createPool()
+            return self.pool
+
+    def _recordTiming(self, kind: str, method: str, fellBack: bool, fitSeconds: float, roundTripSeconds: float,
+                      warmStarted: bool):
+        with self._timingsLock:
+            self.timings.append((kind, method, fellBack, fitSeconds, roundTripSeconds, warmStarted))
+        if fellBack:
+            logging.info(f"Ill-conditioned {kind} fit, fell back to {method}.", extra={"id": "Gaussian Fitting"})
+
+
+class _WaitingFits:
+    """The peak fit requests of one scan, waiting to be sent to the pool with those of other readers."""
+
+    def __init__(self, requests: List[Tuple]):
+        self.requests = requests
+        self.sent = False
+        self.done = False
+        self.result = None
+
+
+def fitPeakBatch(requests: List[Tuple]) -> List[PeakFit]:
+    return [fitPeak(*request) for request in requests]
+
+
+def fitPeakBatches(batches: List[List[Tuple]]) -> list:
+    """fitPeakBatch of the scan of every reader, returning the exception of a scan that failed instead of its fits."""
+    results = []
+    for requests in batches:
+        try:
+            results.append(fitPeakBatch(requests))
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+def fitPeak(x, y, pointsOnEachSide: Optional[int], p0=None, peakFinder: str = PeakFit.GAUSSIAN) -> PeakFit:
+    """
+    Find the peak with the peakFinder engine, falling back to the other engine if it finds none.
+
+    The Gaussian fit also falls back to findMaxLogParabola when its covariance cannot be estimated, and is still used
+    if the log-parabola finds no peak either.
+    """
+    start = time.perf_counter()
+    if peakFinder == PeakFit.LOG_PARABOLA:
+        try:
+            return PeakFit(*findMaxLogParabola(x, y, pointsOnEachSide), PeakFit.LOG_PARABOLA,
+                           time.perf_counter() - start, False)
+        except ValueError:
+            amplitude, centroid, width = findMaxGaussian(x, y, pointsOnEachSide, p0)
+            return PeakFit(amplitude, centroid, width, PeakFit.GAUSSIAN, time.perf_counter() - start, p0 is not None,
+                           fellBack=True)
+    popt = None
+    try:
+        popt, pcov = fitGaussianPeak(x, y, pointsOnEachSide, p0)
+        if np.all(np.isfinite(np.diag(pcov))) and popt[2] > 0:
+            return PeakFit(*popt, PeakFit.GAUSSIAN, time.perf_counter() - start, p0 is not None)
+    except (RuntimeError, ValueError):
+        pass
+    try:
+        amplitude, centroid, width = findMaxLogParabola(x, y, pointsOnEachSide)
+    except ValueError:
+        if popt is None:
+            raise
+        amplitude, centroid, width = popt
+        return PeakFit(amplitude, centroid, width, PeakFit.GAUSSIAN, time.perf_counter() - start, p0 is not None)
+    return PeakFit(amplitude, centroid, width, PeakFit.LOG_PARABOLA, time.perf_counter() - start, p0 is not None,
+                   fellBack=True)
+
+
+def timedHarvestFit(x, y, p0=None) -> Tuple[tuple, float]:
+    start = time.perf_counter()
+    result = fitGaussianStd(x, y, p0)
+    return result, time.perf_counter() - start
@@ -0,0 +1,107 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import numpy as np
+
+from src.app.helper_methods.model.result_set.running_sum import RunningSum
+
+
+class RollingDerivative:
+    """
+    Streaming form of the SGI derivative: the mean of the interquartile SGI changes over the mean time change between
+    consecutive points of the last `window` points, with quartiles interpolated like np.nanquantile.
+
+    The changes are kept in ring buffers, the finite SGI changes also in sorted order and the time changes as a
+    running sum. When the series only gained a point since the last update, one change enters and one leaves, and
+    the sorted window is updated by bisection. When the tail of the series changed otherwise, for example after the
+    denoiser relabelled points or the zero point was set, the window is rebuilt from the series.
+
+    An update still costs O(window), not O(log window): the tail is compared with the previous one to tell the two
+    cases apart, inserting into and deleting from the sorted list shifts its elements, and the interquartile changes
+    are added up with math.fsum so the estimate matches np.nanmean to rounding.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.lastTime = np.empty(0)
+        self.lastSgi = np.empty(0)
+        self.timeChanges = deque()
+        self.sgiChanges = deque()
+        self.sortedSgiChanges = []
+        self.timeChangeSum = RunningSum(window)
+
+    def update(self, time, sgi) -> float:
+        """The derivative of the last `window` points of sgi over time, NaN until there are more than `window`."""
+        if len(time) <= self.window:
+            self._rebuild(np.empty(0), np.empty(0))
+            return np.nan
+        timeTail = np.asarray(time[-self.window:], dtype=float)
+        sgiTail = np.asarray(sgi[-self.window:], dtype=float)
+        if self._gainedOnePoint(timeTail, sgiTail):
+            self._push(timeTail[-1] - timeTail[-2], sgiTail[-1] - sgiTail[-2])
+        else:
+            self._rebuild(timeTail, sgiTail)
+        self.lastTime, self.lastSgi = timeTail, sgiTail
+        return self._estimate()
+
+    """ Private functions """
+
+    def _gainedOnePoint(self, timeTail: np.ndarray, sgiTail: np.ndarray) -> bool:
+        return len(self.lastTime) == len(timeTail) and len(self.lastSgi) == len(sgiTail) \
+            and _sameValues(timeTail[:-1], self.lastTime[1:]) and _sameValues(sgiTail[:-1], self.lastSgi[1:])
+
+    def _push(self, timeChange: float, sgiChange: float):
+        self._removeOldest()
+        self._append(float(timeChange), float(sgiChange))
+        self.timeChangeSum.updated(self.timeChanges)
+
+    def _rebuild(self, timeTail: np.ndarray, sgiTail: np.ndarray):
+        self.timeChanges.clear()
+        self.sgiChanges.clear()
+        self.sortedSgiChanges = []
+        self.timeChangeSum.reset([])
+        for timeChange, sgiChange in zip(np.diff(timeTail).tolist(), np.diff(sgiTail).tolist()):
+            self._append(timeChange, sgiChange)
+
+    def _append(self, timeChange: float, sgiChange: float):
+        self.timeChanges.append(timeChange)
+        self.sgiChanges.append(sgiChange)
+        self.timeChangeSum.add(timeChange)
+        if not math.isnan(sgiChange):
+            insort(self.sortedSgiChanges, sgiChange)
+
+    def _removeOldest(self):
+        timeChange = self.timeChanges.popleft()
+        sgiChange = self.sgiChanges.popleft()
+        self.timeChangeSum.remove(timeChange)
+        if not math.isnan(sgiChange):
+            del self.sortedSgiChanges[bisect_left(self.sortedSgiChanges, sgiChange)]
+
+    def _estimate(self) -> float:
+        changes = self.sortedSgiChanges
+        if not changes or self.timeChangeSum.count == 0:
+            return np.nan
+        quartile1 = _quantile(changes, 0.25)
+        quartile3 = _quantile(changes, 0.75)
+        interquartile = changes[bisect_right(changes, quartile1):bisect_left(changes, quartile3)]
+        if not interquartile:
+            return np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.float64(math.fsum(interquartile) / len(interquartile)) / self.timeChangeSum.mean()
+
+
+def _quantile(sortedValues: list, quantile: float) -> float:
+    """np.quantile's default linear interpolation on an already sorted list."""
+    position = (len(sortedValues) - 1) * quantile
+    below = math.floor(position)
+    fraction = position - below
+    a = sortedValues[below]
+    b = sortedValues[min(below + 1, len(sortedValues) - 1)]
+    if fraction >= 0.5:
+        return b - (b - a) * (1 - fraction)
+    return a + (b - a) * fraction
+
+
+def _sameValues(new: np.ndarray, old: np.ndarray) -> bool:
+    return bool(np.all((new == old) | (np.isnan(new) & np.isnan(old))))
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+
+from src.app.properties.common_properties import CommonProperties
+from src.app.widget.figure import FigureCanvas
+from src.app.widget.figure_snapshot import FigureSnapshot
+
+
+class FigureExportService:
+    """
+    Singleton that writes every reader's Result Figure.jpg on one background thread, so the Tk thread never rasterizes.
+
+    Requests for the same file are coalesced, only the newest snapshot is rendered. During a run a file is rendered at
+    most every CommonProperties.figureExportSeconds at figureExportDpi, and not at all if its data did not change.
+    The finalFigureDpi render only happens for final requests, e.g. at the end of a run, which are rendered right away.
+    Snapshots are rendered on a FigureCanvas of the service, never the one shown on screen.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        self._initialized = True
+        properties = CommonProperties()
+        self.exportSeconds = properties.figureExportSeconds
+        self.exportDpi = properties.figureExportDpi
+        self.finalDpi = properties.finalFigureDpi
+        self.pending = {}
+        self.lastRenders = {}
+        self.canvases = {}
+        self.timings = deque(maxlen=properties.figureTimingHistory)
+        self.skipped = 0
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self._run, name="Figure Export", daemon=True)
+        self.worker.start()
+
+    def requestExport(self, snapshot: Optional[FigureSnapshot], filename: str, final=False) -> Future:
+        """
+        Render the FigureCanvas.snapshot() to filename. The future resolves once a snapshot at least as new as this one
+        was written, or skipped as unchanged.
+        """
+        future = Future()
+        if snapshot is None:
+            future.set_result(None)
+            return future
+        with self.condition:
+            previous = self.pending.get(filename)
+            futures = previous[2] if previous is not None else []
+            futures.append(future)
+            self.pending[filename] = (snapshot, final or (previous is not None and previous[1]), futures)
+            self.condition.notify()
+        return future
+
+    def getMetrics(self) -> dict:
+        """The number of renders and skipped requests, and render times in ms, during runs and at their end."""
+        with self.condition:
+            timings = list(self.timings)
+            metrics = {"skipped": self.skipped}
+        for kind, final in [("running", False), ("final", True)]:
+            renderMs = np.array([timing[2] for timing in timings if timing[1] == final]) * 1000
+            metrics[kind] = {
+                "renders": len(renderMs),
+                "meanRenderMs": float(np.mean(renderMs)) if len(renderMs) else np.nan,
+                "maxRenderMs": float(np.max(renderMs)) if len(renderMs) else np.nan,
+            }
+        return metrics
+
+    """ Private functions """
+
+    def _run(self):
+        while True:
+            with self.condition:
+                filename = self._waitForDueRequest()
+                snapshot, final, futures = self.pending.pop(filename)
+            try:
+                self._export(filename, snapshot, final)
+                for future in futures:
+                    future.set_result(filename)
+            except Exception as exception:
+                logging.exception(f"Failed to export {filename}", extra={"id": "Figure Export"})
+                for future in futures:
+                    future.set_exception(exception)
+
+    def _waitForDueRequest(self) -> str:
+        """Called holding the condition. Final requests are due right away, others once the file's interval passed."""
+        while True:
+            now = time.monotonic()
+            dueTimes = {
+                filename: now if final else self.lastRenders.get(filename, (-np.inf,))[0] + self.exportSeconds
+                for filename, (_, final, _) in self.pending.items()
+            }
+            if dueTimes:
+                filename = min(dueTimes, key=dueTimes.get)
+                if dueTimes[filename] <= now:
+                    return filename
+                self.condition.wait(dueTimes[filename] - now)
+            else:
+                self.condition.wait()
+
+    def _export(self, filename: str, snapshot: FigureSnapshot, final: bool):
+        lastRender = self.lastRenders.get(filename)
+        if not final and lastRender is not None and snapshot.isSameFigure(lastRender[1]):
+            with self.condition:
+                self.skipped += 1
+            return
+        if filename not in self.canvases:
+            self.canvases[filename] = FigureCanvas(*snapshot.labels)
+        figureCanvas = self.canvases[filename]
+        start = time.perf_counter()
+        figureCanvas.applySnapshot(snapshot)
+        root, extension = os.path.splitext(filename)
+        # Rendered next to the file and renamed over it, so nothing ever reads a half written figure.
+        temporaryFilename = f"{root}.tmp{extension}"
+        figureCanvas.saveAs(temporaryFilename, self.finalDpi if final else self.exportDpi)
+        os.replace(temporaryFilename, filename)
+        with self.condition:
+            self.timings.append((filename, final, time.perf_counter() - start))
+            self.lastRenders[filename] = (time.monotonic(), None if final else snapshot)
+        if final:
+            # The run ended, so neither its figure nor its data are needed anymore.
+            del self.canvases[filename]
@@ -1,12 +1,14 @@
 import tkinter
+from concurrent.futures import Future
 
 import numpy as np
 
-from src.app.helper_methods.data_helpers import frequencyToIndex, convertListToPercent, convertToPercent
+from src.app.helper_methods.data_helpers import convertListToPercent, convertToPercent
 from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
 from src.app.helper_methods.model.result_set.result_set import ResultSet
 from src.app.helper_methods.model.sweep_data import SweepData
 from src.app.reader.analyzer.secondary_axis_tracker import SecondaryAxisTracker
+from src.app.reader.helpers.figure_export_service import FigureExportService
 from src.app.ui_manager.theme.colors import Colors
 from src.app.ui_manager.theme.figure_styles import FigureStyles
 from src.app.widget.figure import FigureCanvas
@@ -23,6 +25,8 @@ class Plotter:
             'Frequency (MHz)',
             f'Signal Check'
         )
+        self.timeLimit = None
+        self.sgiLimit = None
 
     def plotFrequencies(self, resultSet: ResultSet, zeroPoint, sweepData: SweepData):
         if len(resultSet.getTime()) > 0:
@@ -37,35 +41,67 @@ class Plotter:
         self.ReaderFigureCanvas.setYAxisLabel('Skroot Growth Index (SGI)')
         self.ReaderFigureCanvas.setXAxisLabel('Time (hours)')
         self.ReaderFigureCanvas.setTitle(f'SGI')
-        self.ReaderFigureCanvas.redrawPlot()
-        yPlot = frequencyToIndex(zeroPoint, resultSet.getDenoiseFrequencySmooth())
-        self.ReaderFigureCanvas.setYAxisLimits(
-            bottom=np.nanmin(yPlot)*1.1,
-            top=max(FigureStyles().y_soft_max, np.nanmax(yPlot) * 1.1),
+        xPlot = resultSet.getDenoiseTimeSmooth()
+        yPlot = resultSet.getDenoiseSgiSmooth(zeroPoint)
+        self.timeLimit = self.growLimit(self.timeLimit, FigureStyles().x_soft_max, np.nanmax(xPlot))
+        self.sgiLimit = self.growLimit(self.sgiLimit, FigureStyles().y_soft_max, np.nanmax(yPlot))
+        secondAxisLimits = None
+        if self.SecondaryAxisTracker.getTimestamps() and self.SecondaryAxisTracker.getValues():
+            secondAxisLimits = self.ReaderFigureCanvas.autoscaleLimits(self.SecondaryAxisTracker.getValues())
+        self.ReaderFigureCanvas.setView(
+            'sgi',
+            (0, self.timeLimit),
+            (np.nanmin(yPlot) * 1.1, self.sgiLimit),
+            secondAxisLimits,
         )
-        self.ReaderFigureCanvas.setXAxisLimits(
-            right=max(FigureStyles().x_soft_max, np.nanmax(resultSet.getDenoiseTimeSmooth()) * 1.1),
-        )
-        if self.SecondaryAxisTracker.getTimestamps():
-            self.ReaderFigureCanvas.addSecondAxis(
+        self.ReaderFigureCanvas.updateScatter('sgi', xPlot, yPlot, 20, Colors().buttons.hover)
+        if secondAxisLimits is not None:
+            self.ReaderFigureCanvas.updateScatter(
+                'secondary',
                 self.SecondaryAxisTracker.getTimes(),
                 self.SecondaryAxisTracker.getValues(),
+                20,
+                Colors().plot.secondary_line,
+                secondAxis=True,
             )
-        self.ReaderFigureCanvas.scatter(resultSet.getDenoiseTimeSmooth(), yPlot, 20, Colors().buttons.hover)
         self.ReaderFigureCanvas.drawCanvas(self.frequencyFrame)
-        self.ReaderFigureCanvas.saveAs(self.FileManager.getReaderPlotJpg())
+        FigureExportService().requestExport(self.ReaderFigureCanvas.snapshot(), self.FileManager.getReaderPlotJpg())
 
     def plotSignal(self, resultSet: ResultSet, sweepData: SweepData):
         self.ReaderFigureCanvas.setYAxisLabel('Signal Check')
         self.ReaderFigureCanvas.setXAxisLabel('Frequency (MHz)')
         self.ReaderFigureCanvas.setTitle(f'Signal Check')
-        self.ReaderFigureCanvas.redrawPlot()
-        self.ReaderFigureCanvas.scatter(sweepData.getFrequency(), convertListToPercent(sweepData.getMagnitude()), 20, Colors().plot.primary_line)
-        self.ReaderFigureCanvas.scatter(
-            resultSet.getCurrentFrequency(),
-            convertToPercent(resultSet.getCurrentVolts()),
-            30,
-            'red'
+        frequency = sweepData.getFrequency()
+        magnitude = convertListToPercent(sweepData.getMagnitude())
+        peakFrequency = resultSet.getCurrentFrequency()
+        peakMagnitude = convertToPercent(resultSet.getCurrentVolts())
+        self.ReaderFigureCanvas.setView(
+            'signal',
+            self.ReaderFigureCanvas.autoscaleLimits(frequency, peakFrequency),
+            self.ReaderFigureCanvas.autoscaleLimits(magnitude, peakMagnitude),
         )
+        self.ReaderFigureCanvas.updateScatter('sweep', frequency, magnitude, 20, Colors().plot.primary_line)
+        self.ReaderFigureCanvas.updateScatter('peak', peakFrequency, peakMagnitude, 30, 'red')
         self.ReaderFigureCanvas.drawCanvas(self.frequencyFrame)
-        self.ReaderFigureCanvas.saveAs(self.FileManager.getReaderPlotJpg())
+        FigureExportService().requestExport(self.ReaderFigureCanvas.snapshot(), self.FileManager.getReaderPlotJpg())
+
+    def exportFinalFigure(self) -> Future:
+        """ Renders the figure currently shown at full resolution, e.g. at the end of a run. """
+        return FigureExportService().requestExport(
+            self.ReaderFigureCanvas.snapshot(),
+            self.FileManager.getReaderPlotJpg(),
+            final=True,
+        )
+
+    @staticmethod
+    def growLimit(current, softMax, dataMax):
+        """
+        The upper limit of an axis, 10% above its data and at least softMax. Past softMax the limit grows in 25% steps,
+        so the plot is fully redrawn every few hours of a run rather than on every scan.
+        """
+        limit = dataMax * 1.1
+        if not limit > softMax:
+            return softMax
+        if current is not None and limit <= current <= limit * 1.25:
+            return current
+        return limit * 1.25
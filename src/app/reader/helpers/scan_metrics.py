@@ -0,0 +1,68 @@
+import csv
+import logging
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from src.app.properties.common_properties import CommonProperties
+from src.app.reader.helpers.scan_timer import ScanTimer
+
+STAGES = [
+    "sibWake",
+    "sweepTransfer",
+    "calibration",
+    "scanFiles",
+    "queued",
+    "peakFit",
+    "derivative",
+    "denoise",
+    "plot",
+    "harvest",
+    "analyzedFiles",
+    "uploads",
+    "total",
+]
+
+
+class ScanMetrics:
+    """
+    The stage timings of a reader's scans, appended to a CSV per run and summarized over the recent scans.
+
+    Every scan adds a row of seconds per stage in STAGES to the timings file. The last scanTimingHistory scans are kept
+    in memory for percentiles.
+    """
+
+    def __init__(self, timingsFile: str):
+        self.timingsFile = timingsFile
+        self.history = deque(maxlen=CommonProperties().scanTimingHistory)
+        self.lock = threading.Lock()
+
+    def record(self, scanDate: int, timer: ScanTimer) -> dict:
+        """ Records the scan's stages and total, returning them in seconds. """
+        timings = {stage: timer.stages.get(stage, 0.0) for stage in STAGES}
+        timings["total"] = timer.getTotal()
+        with self.lock:
+            self.history.append(timings)
+            try:
+                writeHeader = not os.path.exists(self.timingsFile)
+                with open(self.timingsFile, "a", newline="") as timingsFile:
+                    writer = csv.writer(timingsFile)
+                    if writeHeader:
+                        writer.writerow(["Scan Date"] + STAGES)
+                    writer.writerow([scanDate] + [f"{timings[stage]:.4f}" for stage in STAGES])
+            except OSError:
+                logging.exception("Failed to write scan timings", extra={"id": "metrics"})
+        return timings
+
+    def getPercentiles(self, percentiles=(50, 90, 99)) -> dict:
+        """ Per stage, the percentiles of its time in seconds over the recent scans. """
+        with self.lock:
+            history = list(self.history)
+        if not history:
+            return {}
+        return {
+            stage: dict(zip(percentiles, np.percentile([timings[stage] for timings in history], percentiles)))
+            for stage in STAGES
+        }
@@ -0,0 +1,66 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class ScanTimer:
+    """
+    The time spent in each stage of one scan, from the SIB wake to the uploads.
+
+    A scan runs on the I/O worker of its port and then on the analysis pool, so the timer is handed along with the
+    sweep and activated on each thread it runs on. Code anywhere below, e.g. the SIB or the analyzer, times its stage
+    with timedSpan(stage), or timedStage(stage) for a whole function, without needing the timer passed down, and does
+    nothing when no timer is active. A stage entered more than once, e.g. the repeated sweeps of Tunair, accumulates.
+    """
+
+    _active = threading.local()
+
+    def __init__(self):
+        self.startTime = time.monotonic()
+        self.stages = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def active(self):
+        """ Makes this the timer timedSpan records into on the current thread. """
+        previous = getattr(ScanTimer._active, "timer", None)
+        ScanTimer._active.timer = self
+        try:
+            yield self
+        finally:
+            ScanTimer._active.timer = previous
+
+    def record(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def getTotal(self) -> float:
+        return time.monotonic() - self.startTime
+
+    @staticmethod
+    def current():
+        return getattr(ScanTimer._active, "timer", None)
+
+
+def timedSpan(stage: str):
+    """ Times the block as the stage of the scan being taken or analyzed on this thread, if any. """
+    timer = ScanTimer.current()
+    return nullcontext() if timer is None else timer.span(stage)
+
+
+def timedStage(stage: str):
+    """ Decorator timing every call of the function as the stage, see timedSpan. """
+    def decorator(function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            with timedSpan(stage):
+                return function(*args, **kwargs)
+        return timed
+    return decorator
@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from src.app.properties.common_properties import CommonProperties
+from src.app.reader.analyzer.gaussian_fitting_service import GaussianFittingService
+from src.app.reader.interval_thread.port_worker import PortWorker
+from src.app.reader.interval_thread.scheduled_job import ScheduledJob
+from src.app.reader.sib.port_allocator import PortAllocator
+
+
+class AcquisitionScheduler:
+    """
+    Central scheduler for every reader's scans.
+
+    Deadlines are kept in a timer heap served by one dispatcher thread that sleeps until the earliest deadline, so no
+    reader polls. A due scan is handed to the I/O worker of the SIB port the reader was allocated by the
+    PortAllocator, which only ever blocks on that port. Analysis is submitted to a pool shared by all readers so serial
+    reads never wait behind curve fits, which themselves run in the GaussianFittingService process pool.
+    """
+
+    def __init__(self, portAllocator: PortAllocator):
+        self.PortAllocator = portAllocator
+        self.analysisPool = ThreadPoolExecutor(
+            max_workers=CommonProperties().analysisWorkers,
+            thread_name_prefix="Analysis",
+        )
+        GaussianFittingService().start()
+        self.portWorkers = {}
+        # The port key each reader's worker was created under, so it can be released after the port is removed
+        self.readerPorts = {}
+        self.stopped = False
+        self.timerHeap = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.dispatcher = threading.Thread(target=self._dispatch, name="Acquisition Scheduler", daemon=True)
+        self.dispatcher.start()
+
+    def scheduleScan(self, deadline: float, readerNumber: int, scan: Callable) -> ScheduledJob:
+        """At the time.monotonic() deadline, run scan on the I/O worker of the reader's port."""
+        return self.scheduleAt(deadline, lambda: self._getPortWorker(readerNumber).submit(scan))
+
+    def scheduleAt(self, deadline: float, callback: Callable) -> ScheduledJob:
+        """At the time.monotonic() deadline, run callback on the dispatcher thread. The callback must not block."""
+        with self.condition:
+            job = ScheduledJob(deadline, next(self.sequence), callback)
+            heapq.heappush(self.timerHeap, job)
+            self.condition.notify()
+        return job
+
+    def cancel(self, job: ScheduledJob) -> bool:
+        """Returns True if the job had not been dispatched yet and will never run."""
+        with self.condition:
+            wasPending, job.pending = job.pending, False
+            return wasPending
+
+    def submitAnalysis(self, task: Callable, *args) -> Future:
+        return self.analysisPool.submit(task, *args)
+
+    def releaseReader(self, readerNumber: int):
+        """Stop the I/O worker of the reader's port once its queued work is done, even if the port was removed."""
+        with self.condition:
+            key = self.readerPorts.pop(readerNumber, None)
+            worker = self.portWorkers.pop(key, None) if key is not None else None
+        if worker is not None:
+            worker.stop()
+
+    def shutdown(self):
+        """Stop the dispatcher, every port worker, the analysis pool and the fitting pool, waiting for their work."""
+        with self.condition:
+            self.stopped = True
+            workers = list(self.portWorkers.values())
+            self.portWorkers.clear()
+            self.readerPorts.clear()
+            self.condition.notify()
+        self.dispatcher.join()
+        for worker in workers:
+            worker.stop()
+            worker.thread.join()
+        self.analysisPool.shutdown(wait=True)
+        GaussianFittingService().shutdown()
+
+    """ Private functions """
+
+    def _getPortKey(self, readerNumber: int) -> str:
+        port = self.PortAllocator.getAllocatedPort(readerNumber)
+        return port if port is not None else f"Reader {readerNumber}"
+
+    def _getPortWorker(self, readerNumber: int) -> PortWorker:
+        key = self._getPortKey(readerNumber)
+        with self.condition:
+            if key not in self.portWorkers:
+                self.portWorkers[key] = PortWorker(key)
+            self.readerPorts[readerNumber] = key
+            return self.portWorkers[key]
+
+    def _dispatch(self):
+        while True:
+            with self.condition:
+                while not self.stopped and (not self.timerHeap or self.timerHeap[0].deadline > time.monotonic()):
+                    timeout = self.timerHeap[0].deadline - time.monotonic() if self.timerHeap else None
+                    self.condition.wait(timeout)
+                if self.stopped:
+                    return
+                job = heapq.heappop(self.timerHeap)
+                if not job.pending:
+                    continue
+                job.pending = False
+            try:
+                job.callback()
+            except:
+                logging.exception("Failed to dispatch scheduled job", extra={"id": "Acquisition Scheduler"})
@@ -0,0 +1,27 @@
+import logging
+import queue
+import threading
+from typing import Callable
+
+
+class PortWorker:
+    """Owns the blocking serial I/O of one SIB port; work queued for the port runs one task at a time."""
+
+    def __init__(self, port: str):
+        self.port = port
+        self.tasks = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"Port {port}", daemon=True)
+        self.thread.start()
+
+    def submit(self, task: Callable):
+        self.tasks.put(task)
+
+    def stop(self):
+        self.tasks.put(None)
+
+    def _run(self):
+        while (task := self.tasks.get()) is not None:
+            try:
+                task()
+            except:
+                logging.exception("Unhandled error on port worker", extra={"id": f"Port {self.port}"})
@@ -3,21 +3,26 @@ import math
 import os
 import threading
 import time
-from typing import Callable
+from datetime import datetime
+from typing import Callable, Optional
 
 import numpy as np
 
+from src.app.common_modules.aws.upload_queue import UploadQueue
 from src.app.helper_methods.custom_exceptions.analysis_exception import ZeroPointException, AnalysisException, \
     SensorNotFoundException
 from src.app.helper_methods.custom_exceptions.sib_exception import SIBReconnectException
-from src.app.helper_methods.data_helpers import frequencyToIndex
+from src.app.helper_methods.datetime_helpers import datetimeToMillis
 from src.app.helper_methods.helper_functions import getZeroPoint, createScanFile, copyExperimentLog
 from src.app.helper_methods.model.issue.issue import Issue
 from src.app.helper_methods.model.issue.potential_issue import PotentialIssue
 from src.app.helper_methods.model.setup_reader_form_input import SetupReaderFormInput
+from src.app.helper_methods.model.sweep_data import SweepData
 from src.app.properties.common_properties import CommonProperties
 from src.app.properties.dev_properties import DevProperties
 from src.app.properties.issue_properties import IssueProperties
+from src.app.reader.interval_thread.acquisition_scheduler import AcquisitionScheduler
+from src.app.reader.helpers.scan_timer import ScanTimer, timedSpan
 from src.app.reader.reader import Reader
 from src.app.ui_manager.root_manager import RootManager
 from src.app.widget import text_notification
@@ -28,22 +33,25 @@ from src.resources.sibcontrol.sibcontrol import SIBException, SIBConnectionError
 
 class ReaderThreadManager:
     def __init__(self, reader: Reader, rootManager: RootManager, guidedSetupForm: SetupReaderFormInput,
-                 resetRunFunc, issueOccurredFn: Callable):
+                 resetRunFunc, issueOccurredFn: Callable, acquisitionScheduler: AcquisitionScheduler):
         self.guidedSetupForm = guidedSetupForm
         self.issueOccurredFn = issueOccurredFn
         self.scanRate = guidedSetupForm.getScanRate()
         self.equilibrationTime = guidedSetupForm.getEquilibrationTime()
-        self.thread = threading.Thread(target=self.mainLoop, args=(reader,), daemon=True)
+        self.AcquisitionScheduler = acquisitionScheduler
+        self.shutdownFlag = threading.Event()
+        self.runFinished = threading.Event()
+        # Guards shutdownFlag against nextScan and timerTick, so nothing is scheduled after stopReaderLoop cancels
+        self.scheduleLock = threading.Lock()
+        self.nextScan = None
+        self.timerTick = None
         self.Timer = reader.ReaderPage.getTimer()
         self.isDevMode = DevProperties().isDevMode
         self.RootManager = rootManager
         self.Reader = reader
         self.kpiForm = self.Reader.ReaderPage.getReaderFrame().kpiForm
         self.secondAxisSubscription = self.kpiForm.lastSecondAxisEntry.subscribe(
-            lambda value: threading.Thread(
-                target=self.addSecondaryAxisValue,
-                args=(float(value),)
-            ).start()
+            lambda value: self.addSecondaryAxisValue(float(value))
         )
         # Current Issues is supposed to be a dict of all issues used for updating text_notification on successful runs.
         # Needs fixing.
@@ -54,6 +62,7 @@ class ReaderThreadManager:
         self.denoiseSet = CommonProperties().denoiseSet
 
         self.resetRunFunc = resetRunFunc
+        self.runStartMillis = datetimeToMillis(datetime.now())
 
     def addSecondaryAxisValue(self, value: float):
         self.Reader.SecondaryAxisTracker.addValue(value)
@@ -62,7 +71,24 @@ class ReaderThreadManager:
 
     def startReaderLoop(self, user: str):
         self.kpiForm.setConstants(self.guidedSetupForm.getLotId(), user)
-        self.thread.start()
+        self.runStartMillis = datetimeToMillis(datetime.now())
+        if self.isDevMode:
+            self.scanRate = DevProperties().scanRate
+        self.scheduleTimerTick()
+        self.AcquisitionScheduler.scheduleScan(time.monotonic(), self.Reader.readerNumber, self.acquireSweep)
+
+    def stopReaderLoop(self):
+        """Stop scanning and block until the scan in progress, if any, and the end of run tasks are done."""
+        with self.scheduleLock:
+            self.shutdownFlag.set()
+            timerTick, nextScan = self.timerTick, self.nextScan
+        if timerTick is not None:
+            self.AcquisitionScheduler.cancel(timerTick)
+        if nextScan is not None and self.AcquisitionScheduler.cancel(nextScan):
+            logging.info('Cancelling data collection due to stop button pressed',
+                         extra={"id": f"Reader {self.Reader.readerNumber}"})
+            self.AcquisitionScheduler.submitAnalysis(self.finishRun)
+        self.runFinished.wait()
 
     def checkZeroPoint(self):
         try:
@@ -89,28 +115,48 @@ class ReaderThreadManager:
             raise ZeroPointException(
                 f"Failed to find the zero point for reader {self.Reader.readerNumber}, last 5 points: {self.Reader.getResultSet().getMaxFrequencySmooth()[-5:]}")
 
-    def takeSweep(self):
+    def acquireSweep(self):
+        """Runs on the I/O worker of the reader's port: takes the sweep and hands it to the shared analysis pool."""
+        if self.shutdownFlag.is_set():
+            self.finishRun()
+            return
+        timer = ScanTimer()
+        reader = self.Reader
+        sweepData, acquisitionError = None, None
+        try:
+            with timer.active():
+                reader.FileManager.updateScanName()
+                reader.Indicator.changeIndicatorYellow()
+                self.checkZeroPoint()
+                sweepData = reader.SibInterface.takeScan(
+                    os.path.splitext(reader.FileManager.getCurrentScan())[0],
+                    reader.getResultSet().getCurrentVolts(),
+                )
+                with timer.span("scanFiles"):
+                    createScanFile(reader.FileManager.getCurrentScan(), sweepData)
+                    reader.ScanSegmentWriter.append(reader.FileManager.getCurrentScanDate(), sweepData)
+        except Exception as e:
+            acquisitionError = e
+        self.AcquisitionScheduler.submitAnalysis(self.recordSweep, timer, time.monotonic(), sweepData, acquisitionError)
+
+    def analyzeSweep(self, sweepData: SweepData, acquisitionError: Optional[Exception]):
         reader = self.Reader
         analyzer = self.Reader.getAnalyzer()
         resultSet = self.Reader.getResultSet()
         harvestAlgorithm = self.Reader.HarvestAlgorithm
         try:
-            reader.FileManager.updateScanName()
-            reader.Indicator.changeIndicatorYellow()
-            self.checkZeroPoint()
-            sweepData = reader.SibInterface.takeScan(
-                os.path.splitext(reader.FileManager.getCurrentScan())[0],
-                resultSet.getCurrentVolts(),
-            )
-            createScanFile(reader.FileManager.getCurrentScan(), sweepData)
+            if acquisitionError is not None:
+                raise acquisitionError
             analyzer.analyzeScan(sweepData, self.denoiseSet)
             reader.SibInterface.setReferenceFrequency(resultSet.getCurrentFrequency())
-            reader.plotFrequencyButton.invoke()  # any changes to GUI must be in common_modules thread
-            harvestAlgorithm.check(resultSet)
+            with timedSpan("plot"):
+                reader.plotFrequencyButton.invoke()  # any changes to GUI must be in common_modules thread
+            with timedSpan("harvest"):
+                harvestAlgorithm.check(resultSet)
             if harvestAlgorithm.currentHarvestPrediction != 0 and not np.isnan(harvestAlgorithm.currentHarvestPrediction):
                 self.kpiForm.saturationDate = harvestAlgorithm.currentHarvestPrediction
             if reader.finishedEquilibrationPeriod:
-                self.kpiForm.sgi = frequencyToIndex(analyzer.zeroPoint, resultSet.getDenoiseFrequencySmooth())[-1]
+                self.kpiForm.sgi = resultSet.getDenoiseSgiSmooth(analyzer.zeroPoint)[-1]
             reader.Indicator.changeIndicatorGreen()
             if reader.readerNumber in self.currentIssues and not self.currentIssues[reader.readerNumber].resolved:
                 self.currentIssues[reader.readerNumber].resolveIssue()
@@ -118,151 +164,181 @@ class ReaderThreadManager:
                     reader.AutomatedIssueManager.updateIssue(self.currentIssues[reader.readerNumber])
                 del self.currentIssues[reader.readerNumber]
         finally:
-            analyzer.createAnalyzedFiles()
+            with timedSpan("analyzedFiles"):
+                analyzer.createAnalyzedFiles()
             if reader.finishedEquilibrationPeriod:
-                reader.AwsService.uploadExperimentFilesOnInterval(
-                    reader.FileManager.getCurrentScanDate(),
-                    self.guidedSetupForm.getLotId(),
-                    self.kpiForm.saturationDate,
-                    reader.AutomatedIssueManager.hasOpenIssues(),
-                    resultSet.getStartTime(),
-                    self.guidedSetupForm.getWarehouse(),
-                )
-
-    def mainLoop(self, reader):
-        if self.isDevMode:
-            self.scanRate = DevProperties().scanRate
-        self.thread.shutdown_flag = threading.Event()
+                with timedSpan("uploads"):
+                    reader.AwsService.uploadExperimentFilesOnInterval(
+                        reader.FileManager.getCurrentScanDate(),
+                        self.guidedSetupForm.getLotId(),
+                        self.kpiForm.saturationDate,
+                        reader.AutomatedIssueManager.hasOpenIssues(),
+                        resultSet.getStartTime(),
+                        self.guidedSetupForm.getWarehouse(),
+                    )
 
-        while not self.thread.shutdown_flag.is_set():
-            startTime = time.time()
+    def recordSweep(self, timer: ScanTimer, submitTime: float, sweepData: SweepData,
+                    acquisitionError: Optional[Exception]):
+        """Runs on the shared analysis pool: analyzes the sweep, handles any failure and schedules the next scan."""
+        reader = self.Reader
+        timer.record("queued", time.monotonic() - submitTime)
+        try:
             try:
-                try:
-                    self.takeSweep()
-                except SIBConnectionError:
-                    if reader.readerNumber in self.currentIssues:
-                        if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
-                            self.currentIssues[reader.readerNumber] = self.currentIssues[
-                                reader.readerNumber].persistIssue()
-                    else:
-                        self.currentIssues[reader.readerNumber] = PotentialIssue(
-                            IssueProperties().consecutiveHardwareIssue,
-                            f"Automated - Reader Connection Error On Reader {reader.readerNumber}.",
-                            reader.AutomatedIssueManager.createIssue,
-                        )
-                    reader.Indicator.changeIndicatorRed()
-                    reader.getAnalyzer().recordFailedScan()
-                    logging.exception(
-                        f'Connection Error: Failed to take scan {reader.FileManager.getCurrentScanDate()}',
-                        extra={"id": f"Reader {reader.readerNumber}"})
-                    text_notification.setText(f"Reader hardware disconnected.\nPlease contact your system administrator.  ")
-                except SIBReconnectException:
-                    if reader.readerNumber in self.currentIssues:
-                        if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
-                            self.currentIssues[reader.readerNumber] = self.currentIssues[
-                                reader.readerNumber].persistIssue()
-                    else:
-                        self.currentIssues[reader.readerNumber] = PotentialIssue(
-                            IssueProperties().consecutiveHardwareIssue,
-                            f"Automated - Hardware Issue Identified On Reader {reader.readerNumber}.",
-                            reader.AutomatedIssueManager.createIssue,
-                        )
-                    reader.Indicator.changeIndicatorRed()
-                    reader.getAnalyzer().recordFailedScan()
-                    logging.exception(
-                        f'Failed to take scan {reader.FileManager.getCurrentScanDate()}, but reconnected successfully',
-                        extra={"id": f"Reader {reader.readerNumber}"})
-                    text_notification.setText(
-                        'Sweep failed, but connection re-established. No further action is necessary.',
+                with timer.active():
+                    self.analyzeSweep(sweepData, acquisitionError)
+            except SIBConnectionError:
+                if reader.readerNumber in self.currentIssues:
+                    if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
+                        self.currentIssues[reader.readerNumber] = self.currentIssues[
+                            reader.readerNumber].persistIssue()
+                else:
+                    self.currentIssues[reader.readerNumber] = PotentialIssue(
+                        IssueProperties().consecutiveHardwareIssue,
+                        f"Automated - Reader Connection Error On Reader {reader.readerNumber}.",
+                        reader.AutomatedIssueManager.createIssue,
                     )
-                except SIBException:
-                    if reader.readerNumber in self.currentIssues:
-                        if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
-                            self.currentIssues[reader.readerNumber] = self.currentIssues[
-                                reader.readerNumber].persistIssue()
-                    else:
-                        self.currentIssues[reader.readerNumber] = PotentialIssue(
-                            IssueProperties().consecutiveHardwareIssue,
-                            f"Automated - Hardware Issue Identified On Reader {reader.readerNumber}.",
-                            reader.AutomatedIssueManager.createIssue,
-                        )
-                    reader.Indicator.changeIndicatorRed()
-                    reader.getAnalyzer().recordFailedScan()
-                    logging.exception(
-                        f'Hardware Problem: Failed to take scan {reader.FileManager.getCurrentScanDate()}',
-                        extra={"id": f"Reader {reader.readerNumber}"})
-                    text_notification.setText(
-                        f"Reader hardware disconnected.\nPlease contact your system administrator. ")
-                except AnalysisException:
-                    if reader.readerNumber in self.currentIssues:
-                        if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
-                            self.currentIssues[reader.readerNumber] = self.currentIssues[
-                                reader.readerNumber].persistIssue()
-                    else:
-                        self.currentIssues[reader.readerNumber] = PotentialIssue(
-                            IssueProperties().consecutiveAnalysisIssue,
-                            f"Automated - Analysis Failed On Reader {reader.readerNumber}.",
-                            reader.AutomatedIssueManager.createIssue,
-                        )
-                    reader.Indicator.changeIndicatorRed()
-                    logging.exception(
-                        f'Error Analyzing Data, failed to analyze scan {reader.FileManager.getCurrentScanDate()}',
-                        extra={"id": f"Reader {reader.readerNumber}"})
-                    text_notification.setText(
-                        f"Sweep analysis failed, check vessel placement.")
-                except SensorNotFoundException as e:
-                    if reader.readerNumber in self.currentIssues:
-                        if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
-                            self.currentIssues[reader.readerNumber] = self.currentIssues[
-                                reader.readerNumber].persistIssue()
-                    else:
-                        self.currentIssues[reader.readerNumber] = PotentialIssue(
-                            IssueProperties().consecutiveAnalysisIssue,
-                            f"Automated - Sensor not found on Reader {reader.readerNumber}.",
-                            reader.AutomatedIssueManager.createIssue,
-                        )
-                    reader.Indicator.changeIndicatorRed()
-                    text_notification.setText(f"Sensor not found above Reader Port {reader.readerNumber}.")
-                    logging.info(e.message, extra={"id": f"Reader {reader.readerNumber}"})
-                finally:
-                    self.Timer.updateTime()
-                if not self.issueOccurredFn():
-                    text_notification.setText("Reader has recorded a sweep.")
-            except:
-                logging.exception('Unknown error has occurred', extra={"id": f"Reader {reader.readerNumber}"})
-            finally:
-                currentTime = time.time()
-                if self.isDevMode and DevProperties().enforceScanRate:
-                    pass
+                reader.Indicator.changeIndicatorRed()
+                reader.getAnalyzer().recordFailedScan()
+                logging.exception(
+                    f'Connection Error: Failed to take scan {reader.FileManager.getCurrentScanDate()}',
+                    extra={"id": f"Reader {reader.readerNumber}"})
+                text_notification.setText(f"Reader hardware disconnected.\nPlease contact your system administrator.  ")
+            except SIBReconnectException:
+                if reader.readerNumber in self.currentIssues:
+                    if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
+                        self.currentIssues[reader.readerNumber] = self.currentIssues[
+                            reader.readerNumber].persistIssue()
+                else:
+                    self.currentIssues[reader.readerNumber] = PotentialIssue(
+                        IssueProperties().consecutiveHardwareIssue,
+                        f"Automated - Hardware Issue Identified On Reader {reader.readerNumber}.",
+                        reader.AutomatedIssueManager.createIssue,
+                    )
+                reader.Indicator.changeIndicatorRed()
+                reader.getAnalyzer().recordFailedScan()
+                logging.exception(
+                    f'Failed to take scan {reader.FileManager.getCurrentScanDate()}, but reconnected successfully',
+                    extra={"id": f"Reader {reader.readerNumber}"})
+                text_notification.setText(
+                    'Sweep failed, but connection re-established. No further action is necessary.',
+                )
+            except SIBException:
+                if reader.readerNumber in self.currentIssues:
+                    if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
+                        self.currentIssues[reader.readerNumber] = self.currentIssues[
+                            reader.readerNumber].persistIssue()
                 else:
-                    self.checkIfScanTookTooLong(currentTime - startTime)
-                self.waitUntilNextScan(currentTime, startTime)
-        self.secondAxisSubscription.dispose()
-        text_notification.setText("Run Finished.")
-        if reader.finishedEquilibrationPeriod:
-            reader.AwsService.uploadFinalExperimentFiles(
-                self.guidedSetupForm.getLotId(),
-                self.kpiForm.saturationDate,
-                self.Reader.getAnalyzer().ResultSet.getStartTime(),
-                self.guidedSetupForm.getWarehouse(),
+                    self.currentIssues[reader.readerNumber] = PotentialIssue(
+                        IssueProperties().consecutiveHardwareIssue,
+                        f"Automated - Hardware Issue Identified On Reader {reader.readerNumber}.",
+                        reader.AutomatedIssueManager.createIssue,
+                    )
+                reader.Indicator.changeIndicatorRed()
+                reader.getAnalyzer().recordFailedScan()
+                logging.exception(
+                    f'Hardware Problem: Failed to take scan {reader.FileManager.getCurrentScanDate()}',
+                    extra={"id": f"Reader {reader.readerNumber}"})
+                text_notification.setText(
+                    f"Reader hardware disconnected.\nPlease contact your system administrator. ")
+            except AnalysisException:
+                if reader.readerNumber in self.currentIssues:
+                    if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
+                        self.currentIssues[reader.readerNumber] = self.currentIssues[
+                            reader.readerNumber].persistIssue()
+                else:
+                    self.currentIssues[reader.readerNumber] = PotentialIssue(
+                        IssueProperties().consecutiveAnalysisIssue,
+                        f"Automated - Analysis Failed On Reader {reader.readerNumber}.",
+                        reader.AutomatedIssueManager.createIssue,
+                    )
+                reader.Indicator.changeIndicatorRed()
+                logging.exception(
+                    f'Error Analyzing Data, failed to analyze scan {reader.FileManager.getCurrentScanDate()}',
+                    extra={"id": f"Reader {reader.readerNumber}"})
+                text_notification.setText(
+                    f"Sweep analysis failed, check vessel placement.")
+            except SensorNotFoundException as e:
+                if reader.readerNumber in self.currentIssues:
+                    if type(self.currentIssues[reader.readerNumber]) is PotentialIssue:
+                        self.currentIssues[reader.readerNumber] = self.currentIssues[
+                            reader.readerNumber].persistIssue()
+                else:
+                    self.currentIssues[reader.readerNumber] = PotentialIssue(
+                        IssueProperties().consecutiveAnalysisIssue,
+                        f"Automated - Sensor not found on Reader {reader.readerNumber}.",
+                        reader.AutomatedIssueManager.createIssue,
+                    )
+                reader.Indicator.changeIndicatorRed()
+                text_notification.setText(f"Sensor not found above Reader Port {reader.readerNumber}.")
+                logging.info(e.message, extra={"id": f"Reader {reader.readerNumber}"})
+            finally:
+                self.Timer.updateTime()
+            if not self.issueOccurredFn():
+                text_notification.setText("Reader has recorded a sweep.")
+        except:
+            logging.exception('Unknown error has occurred', extra={"id": f"Reader {reader.readerNumber}"})
+        finally:
+            timings = self.recordScanTimings(timer)
+            if self.isDevMode and DevProperties().enforceScanRate:
+                pass
+            else:
+                self.checkIfScanTookTooLong(timings)
+            self.scheduleNextScan(timer.startTime)
+
+    def recordScanTimings(self, timer: ScanTimer) -> dict:
+        reader = self.Reader
+        timings = reader.ScanMetrics.record(reader.FileManager.getCurrentScanDate(), timer)
+        if reader.DiagnosticsPanel is not None:
+            reader.DiagnosticsPanel.update(reader.ScanMetrics.getPercentiles(), UploadQueue().getPendingCount())
+        return timings
+
+    def scheduleNextScan(self, startTime: float):
+        with self.scheduleLock:
+            if not self.shutdownFlag.is_set():
+                self.nextScan = self.AcquisitionScheduler.scheduleScan(
+                    startTime + self.scanRate * 60,
+                    self.Reader.readerNumber,
+                    self.acquireSweep,
+                )
+                return
+        self.finishRun()
+
+    def scheduleTimerTick(self):
+        with self.scheduleLock:
+            if not self.shutdownFlag.is_set():
+                self.Timer.updateTime()
+                self.timerTick = self.AcquisitionScheduler.scheduleAt(time.monotonic() + 1, self.scheduleTimerTick)
+
+    def finishRun(self):
+        reader = self.Reader
+        try:
+            self.secondAxisSubscription.dispose()
+            text_notification.setText("Run Finished.")
+            if reader.finishedEquilibrationPeriod:
+                reader.AwsService.uploadFinalExperimentFiles(
+                    self.guidedSetupForm.getLotId(),
+                    self.kpiForm.saturationDate,
+                    self.Reader.getAnalyzer().ResultSet.getStartTime(),
+                    self.guidedSetupForm.getWarehouse(),
+                )
+            reader.Plotter.exportFinalFigure()
+            self.resetRunFunc(reader.readerNumber)
+            copyExperimentLog(
+                self.Reader.FileManager.getReaderSavePath(),
+                f"Reader {reader.readerNumber}",
+                self.runStartMillis,
             )
-        self.resetRunFunc(reader.readerNumber)
-        copyExperimentLog(self.Reader.FileManager.getReaderSavePath())
-        logging.info(f'Finished run.', extra={"id": f"Reader {reader.readerNumber}"})
+            logging.info(f'Finished run.', extra={"id": f"Reader {reader.readerNumber}"})
+        finally:
+            self.AcquisitionScheduler.releaseReader(reader.readerNumber)
+            self.runFinished.set()
 
-    def checkIfScanTookTooLong(self, timeTaken):
+    def checkIfScanTookTooLong(self, timings: dict):
+        timeTaken = timings["total"]
         if timeTaken > self.scanRate * 60:
             self.scanRate = math.ceil(timeTaken / 60)
             text_notification.setText(f"Current scan rate is infeasible, updated to {self.scanRate}.")
-            logging.info(f'{timeTaken} seconds to take scan. Scan rate now {self.scanRate}.',
+            slowestStages = sorted((stage for stage in timings if stage != "total"), key=timings.get, reverse=True)[:3]
+            logging.info(f'{timeTaken} seconds to take scan. Scan rate now {self.scanRate}. Slowest stages: '
+                         f'{", ".join(f"{stage} {timings[stage]:.1f} s" for stage in slowestStages)}.',
                          extra={"id": f"Reader {self.Reader.readerNumber}"})
-
-    def waitUntilNextScan(self, currentTime, startTime):
-        while currentTime - startTime < self.scanRate * 60:
-            if self.thread.shutdown_flag.is_set():
-                logging.info('Cancelling data collection due to stop button pressed',
-                             extra={"id": f"Reader {self.Reader.readerNumber}"})
-                break
-            time.sleep(0.05)
-            self.Timer.updateTime()
-            currentTime = time.time()
@@ -0,0 +1,14 @@
+from typing import Callable
+
+
+class ScheduledJob:
+    """An entry of the acquisition scheduler's timer heap."""
+
+    def __init__(self, deadline: float, sequence: int, callback: Callable):
+        self.deadline = deadline
+        self.sequence = sequence
+        self.callback = callback
+        self.pending = True
+
+    def __lt__(self, other) -> bool:
+        return (self.deadline, self.sequence) < (other.deadline, other.sequence)
@@ -4,10 +4,11 @@ import shutil
 import tkinter.ttk as ttk
 
 from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
+from src.app.helper_methods.file_manager.scan_segment_writer import ScanSegmentWriter
 from src.app.helper_methods.model.plottable import Plottable
 from src.app.use_case.use_case_factory import ContextFactory
-from src.app.helper_methods.data_helpers import frequencyToIndex
 from src.app.helper_methods.model.result_set.result_set import ResultSet
+from src.app.properties.common_properties import CommonProperties
 from src.app.properties.dev_properties import DevProperties
 from src.app.reader.algorithm.harvest_algorithm import HarvestAlgorithm
 from src.app.reader.analyzer.analyzer import Analyzer
@@ -15,11 +16,13 @@ from src.app.reader.analyzer.dev_analyzer import DevAnalyzer
 from src.app.reader.analyzer.dev_secondary_axis_tracker import DevSecondaryAxisTracker
 from src.app.reader.analyzer.secondary_axis_tracker import SecondaryAxisTracker
 from src.app.reader.helpers.plotter import Plotter
+from src.app.reader.helpers.scan_metrics import ScanMetrics
 from src.app.reader.service.aws_service import AwsService
 from src.app.reader.service.dev_aws_service import DevAwsService
 from src.app.reader.sib.dev_sib import DevSib
 from src.app.reader.sib.sib_interface import SibInterface
 from src.app.widget import text_notification
+from src.app.widget.diagnostics_panel import DiagnosticsPanel
 from src.app.widget.indicator import Indicator
 from src.app.widget.issues.automated_issue_manager import AutomatedIssueManager
 
@@ -28,6 +31,8 @@ class Reader:
     def __init__(self, globalFileManager, readerNumber, readerPage, sibInterface: SibInterface):
         self.FileManager = ReaderFileManager(globalFileManager.getSavePath(), readerNumber)
         self.HarvestAlgorithm = HarvestAlgorithm(self.FileManager)
+        self.ScanSegmentWriter = ScanSegmentWriter(self.FileManager.getRawScanSegments())
+        self.ScanMetrics = ScanMetrics(self.FileManager.getScanTimings())
         if DevProperties().isDevMode:
             self.AwsService = DevAwsService(self.FileManager, globalFileManager)
             self.Analyzer = DevAnalyzer(self.FileManager, readerNumber, self.HarvestAlgorithm)
@@ -57,6 +62,7 @@ class Reader:
         self.SibInterface.setStopFrequency(ContextFactory().getSibProperties().stopFrequency)
         self.yAxisLabel = self.SibInterface.getYAxisLabel()
         self.Indicator = Indicator(readerNumber, self.ReaderPage)
+        self.DiagnosticsPanel = DiagnosticsPanel(readerPage.frame) if CommonProperties().showScanDiagnostics else None
         self.plotFrequencyButton = ttk.Button(
             readerPage.frame,
             text="Real Time Plot",
@@ -71,7 +77,7 @@ class Reader:
     def getCurrentPlottable(self, denoiseSet) -> Plottable:
         return Plottable(
             self.Analyzer.ResultSet.getDenoiseTimeSmooth(),
-            frequencyToIndex(self.Analyzer.zeroPoint, self.Analyzer.ResultSet.getDenoiseFrequencySmooth()),
+            self.Analyzer.ResultSet.getDenoiseSgiSmooth(self.Analyzer.zeroPoint),
         )
 
     def getAnalyzer(self) -> Analyzer:
@@ -1,3 +1,4 @@
+import os
 import socket
 from datetime import datetime
 
@@ -49,12 +50,19 @@ class AwsService:
 
     def uploadRawDataOnInterval(self, scanMillis):
         if (scanMillis - self.awsLastRawDataUploadMillis) >= self.rawDataUploadRate:
-            self.AwsBoto3Service.uploadFile(
-                self.ReaderFileManager.getCurrentScan(),
-                "text/csv",
-            )
+            self.uploadRawScanSegments(self.awsLastRawDataUploadMillis)
             self.awsLastRawDataUploadMillis = scanMillis
 
+    def uploadRawScanSegments(self, sinceMillis: int = 0):
+        """ Uploads the raw scan segments written to since sinceMillis, the open segment is sent again as it grows. """
+        segmentFolder = self.ReaderFileManager.getRawScanSegments()
+        if not os.path.exists(segmentFolder):
+            return
+        for segmentName in sorted(os.listdir(segmentFolder)):
+            segmentFile = f"{segmentFolder}/{segmentName}"
+            if segmentName.endswith(".scans") and os.path.getmtime(segmentFile) * 1000 >= sinceMillis:
+                self.AwsBoto3Service.uploadFile(segmentFile, "application/octet-stream")
+
     def uploadFinalExperimentFiles(self, lotId: str, saturationDate: int, startDate: int, warehouse: str = ""):
         newConfig = DynamodbConfig(datetimeToMillis(datetime.now()),
                                    startDate,
@@ -64,6 +72,7 @@ class AwsService:
                                    False,
                                    warehouse)
         self.uploadReaderAnalyzed(newConfig)
+        self.uploadRawScanSegments(self.awsLastRawDataUploadMillis)
         self.AwsBoto3Service.pushExperimentRow(newConfig)
 
     def uploadReaderAnalyzed(self, config: DynamodbConfig):
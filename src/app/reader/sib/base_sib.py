@@ -2,20 +2,21 @@
 import logging
 import time
 from abc import abstractmethod
-from typing import List
 
+import numpy as np
 from reactivex import Subject
 from reactivex.subject import BehaviorSubject
 
 from src.app.helper_methods.custom_exceptions.sib_exception import SIBReconnectException
 from src.app.helper_methods.model.sweep_data import SweepData
 from src.app.use_case.use_case_factory import ContextFactory
+from src.app.reader.helpers.scan_timer import timedStage
 from src.app.reader.sib.port_allocator import PortAllocator
 from src.app.reader.sib.sib_interface import SibInterface
 from src.app.reader.sib.sib_utils import (
     loadCalibrationFile,
     findSelfResonantFrequency,
-    getNumPointsSweep, convertAdcToVolts, find_nearest, createCalibrationDirectoryIfNotExists, calculateFrequencyValues,
+    getNumPointsSweep, convertAdcToVolts, findNearestIndices, createCalibrationDirectoryIfNotExists, calculateFrequencyValues,
     createCalibrationFile, removeInitialSpike,
 )
 from src.app.widget import text_notification
@@ -30,10 +31,11 @@ class BaseSib(SibInterface):
         """Initialize common SIB properties."""
         self.PortAllocator = portAllocator
         self.readerNumber = readerNumber
-        self.calibrationFrequency, self.calibrationVolts = [], []
+        self.calibrationFrequency, self.calibrationVolts = np.empty(0), np.empty(0)
+        self.calibrationIndices = {}
+        self.SibProperties = Properties = ContextFactory().getSibProperties()
         self.initialize(port.device)
         self.serialNumber = port.serial_number
-        Properties = ContextFactory().getSibProperties()
         self.calibrationStartFreq = Properties.startFrequency
         self.calibrationStopFreq = Properties.stopFrequency
         self.stepSize = Properties.stepSize
@@ -49,15 +51,15 @@ class BaseSib(SibInterface):
         """The reader takes a scan and returns magnitude values. Must be implemented by subclass."""
         pass
 
-    @staticmethod
-    def getYAxisLabel() -> str:
+    def getYAxisLabel(self) -> str:
         """Returns the y-axis label from SIB properties."""
-        return ContextFactory().getSibProperties().yAxisLabel
+        return self.SibProperties.yAxisLabel
 
     def loadCalibrationFile(self):
         """Load calibration file and find self-resonant frequency."""
         try:
             self.calibrationFrequency, self.calibrationVolts = loadCalibrationFile(self.calibrationFilename)
+            self.calibrationIndices = {}
             if len(self.calibrationFrequency) == 0 or len(self.calibrationVolts) == 0:
                 return False
             selfResonance = findSelfResonantFrequency(self.calibrationFrequency, self.calibrationVolts, [50, 170], 1.8)
@@ -88,14 +90,14 @@ class BaseSib(SibInterface):
             createCalibrationDirectoryIfNotExists(self.calibrationFilename)
             startFrequency = self.calibrationStartFreq - self.initialSpikeMhz
             stopFrequency = self.calibrationStopFreq
-            numPoints = getNumPointsSweep(startFrequency, stopFrequency)
+            numPoints = getNumPointsSweep(startFrequency, stopFrequency, self.stepSize)
             allFrequency = calculateFrequencyValues(self.calibrationStartFreq - self.initialSpikeMhz, self.calibrationStopFreq, self.stepSize)
             self.prepareSweep(startFrequency, stopFrequency, numPoints)
             allVolts = self.performSweep()
             frequency, volts = removeInitialSpike(allFrequency, allVolts, self.initialSpikeMhz, self.stepSize)
             createCalibrationFile(self.calibrationFilename, frequency, volts)
-            self.setStartFrequency(ContextFactory().getSibProperties().startFrequency)
-            self.setStopFrequency(ContextFactory().getSibProperties().stopFrequency)
+            self.setStartFrequency(self.SibProperties.startFrequency)
+            self.setStopFrequency(self.SibProperties.stopFrequency)
             return True
         except SIBConnectionError:
             self.resetSibConnection()
@@ -149,7 +151,7 @@ class BaseSib(SibInterface):
     def setNumberOfPoints(self) -> bool:
         """Set the number of points for the sweep."""
         try:
-            self.sib.num_pts = getNumPointsSweep(self.startFreqMHz, self.stopFreqMHz)
+            self.sib.num_pts = getNumPointsSweep(self.startFreqMHz, self.stopFreqMHz, self.stepSize)
             return True
         except:
             return False
@@ -170,7 +172,7 @@ class BaseSib(SibInterface):
     def initialize(self, port):
         """Initialize the SIB hardware connection."""
         self.port = port
-        self.sib = sibcontrol.SIB350(port)
+        self.sib = sibcontrol.SIB350(port, inter_byte_timeout=self.SibProperties.interByteTimeout)
         self.sib.amplitude_mA = 31.6  # The synthesizer output amplitude is set to 31.6 mA by default
         self.sib.open()
         self.sib.wake()
@@ -203,9 +205,8 @@ class BaseSib(SibInterface):
     def checkAndSendConfiguration(self):
         """Check and send configuration to the SIB."""
         if self.sib.valid_config():
-            self.sib.write_start_ftw()  # Send the start frequency to the SIB
-            self.sib.write_stop_ftw()  # Send the stop frequency to the SIB
-            self.sib.write_num_pts()  # Send the number of points to the SIB
+            # Sends the start frequency, stop frequency and number of points, then reads their three acks.
+            self.sib.write_sweep_config()
         else:
             text_notification.setText(
                 f"Reader Port configuration is not valid.\nChange the scan frequency or number of points to reset it.")
@@ -220,6 +221,7 @@ class BaseSib(SibInterface):
     def resetSibConnection(self):
         """Reset the SIB connection after a communication error."""
         logging.info("Problem with serial connection. Closing and then re-opening port.", extra={"id": "Sib"})
+        logging.info(f"SIB command latency before the reset: {self.sib.command_latency()}", extra={"id": "Sib"})
         if self.sib.is_open():
             self.reset()
             time.sleep(1.0)
@@ -235,36 +237,49 @@ class BaseSib(SibInterface):
         except:
             pass
 
-    def performSweep(self) -> List[float]:
+    @timedStage("sweepTransfer")
+    def performSweep(self) -> np.ndarray:
         self.sib.write_sweep_command()
-        conversion_results, sweep_complete = list(), False
+        sweepBuffer, sweep_complete = self.sib.create_sweep_buffer(), False
         while not sweep_complete:
             try:
-                ack_msg, tmp_data = self.sib.read_sweep_response()
+                # When the SIB sends measurement data it is read straight into the sweep buffer.
+                ack_msg = self.sib.read_sweep_response_into(sweepBuffer)
 
                 if ack_msg == 'ok':
                     # SIB has sent the sweep complete command.
                     sweep_complete = True
-                elif ack_msg == 'send_data':
-                    # SIB is sending measurement data. Add it to the conversion results array
-                    conversion_results.extend(tmp_data)
-                else:
+                elif ack_msg != 'send_data':
                     logging.info(f"SIB Received an unexpected command. Something is wrong. ack_msg: {ack_msg}", extra={"id": "Sib"})
             except:
                 sweep_complete = True
                 logging.exception("An error occurred while waiting for scan to complete", extra={"id": "Sib"})
                 raise
-        return convertAdcToVolts(conversion_results)
+        return convertAdcToVolts(sweepBuffer.codes())
 
     def calibrationPointComparison(self, frequency: float, volts: float):
-        calibrationVoltsOffset = find_nearest(frequency, self.calibrationFrequency, self.calibrationVolts)
+        calibrationVoltsOffset = self.calibrationVolts[findNearestIndices([frequency], self.calibrationFrequency)[0]]
         return volts / calibrationVoltsOffset
 
-    def calibrationComparison(self, frequency, volts):
-        calibratedVolts = []
-        for i in range(len(frequency)):
-            calibratedVolts.append(self.calibrationPointComparison(frequency[i], volts[i]))
-        return calibratedVolts
+    @timedStage("calibration")
+    def calibrationComparison(self, frequency, volts) -> np.ndarray:
+        """
+        Divide a whole sweep by the nearest calibration point of every frequency. Samples past the last frequency, as
+        the stop frequency sample of a VNA optimizer sweep, are ignored.
+        """
+        volts = np.asarray(volts, dtype=float)[:len(frequency)]
+        return volts / self.calibrationVolts[self.getCalibrationIndices(frequency)]
+
+    def getCalibrationIndices(self, frequency) -> np.ndarray:
+        """Index of the nearest calibration point for every frequency, cached per evenly spaced sweep grid."""
+        if len(frequency) == 0:
+            return np.empty(0, dtype=np.intp)
+        grid = (float(frequency[0]), float(frequency[-1]), len(frequency))
+        if grid not in self.calibrationIndices:
+            if len(self.calibrationIndices) >= 16:
+                self.calibrationIndices = {}
+            self.calibrationIndices[grid] = findNearestIndices(frequency, self.calibrationFrequency)
+        return self.calibrationIndices[grid]
 
     def prepareSweep(self, startFrequency, stopFrequency, numPoints):
         try:
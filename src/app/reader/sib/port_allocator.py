@@ -1,4 +1,5 @@
 import platform
+from typing import Optional
 
 from serial.tools import list_ports
 from serial.tools.list_ports_common import ListPortInfo
@@ -15,6 +16,9 @@ class PortAllocator:
         self.ports[readerNumber] = port.device
         return port
 
+    def getAllocatedPort(self, readerNumber) -> Optional[str]:
+        return self.ports.get(readerNumber)
+
     def removePort(self, readerNumber):
         del self.ports[readerNumber]
 
@@ -3,6 +3,7 @@ import os
 
 from src.app.use_case.use_case_factory import ContextFactory
 from src.app.properties.dev_properties import DevProperties
+from src.app.reader.interval_thread.acquisition_scheduler import AcquisitionScheduler
 from src.app.reader.sib.dev_sib import DevSib
 from src.app.reader.sib.port_allocator import PortAllocator
 from src.app.reader.sib.sib_interface import SibInterface
@@ -12,6 +13,7 @@ from src.app.widget import text_notification
 class SibFinder:
     def __init__(self):
         self.PortAllocator = PortAllocator()
+        self.AcquisitionScheduler = AcquisitionScheduler(self.PortAllocator)
 
     def connectSib(self, readerNumber: int):
         if not DevProperties().isDevMode:
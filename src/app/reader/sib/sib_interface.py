@@ -56,7 +56,6 @@ class SibInterface(ABC):
     def close(self) -> bool:
         """The reader closes the port that it is using to connect."""
 
-    @staticmethod
-    def getYAxisLabel() -> str:
+    def getYAxisLabel(self) -> str:
         """ Returns the yaxislabel, or units of the magnitude of the graph. """
 
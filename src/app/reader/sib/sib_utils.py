@@ -8,32 +8,31 @@ from typing import List
 import numpy as np
 import pandas
 
-from src.app.use_case.use_case_factory import ContextFactory
 from src.app.helper_methods.data_helpers import truncateByX
 from src.app.widget import text_notification
 
 
-def loadCalibrationFile(calibrationFilename) -> (List[float], List[float]):
+def loadCalibrationFile(calibrationFilename) -> (np.ndarray, np.ndarray):
     """Load calibration data from CSV file.
 
-    Returns tuple of (calibrationFrequency, calibrationVolts).
-    Returns ([], []) if file cannot be loaded.
+    Returns tuple of (calibrationFrequency, calibrationVolts) as float arrays.
+    Returns empty arrays if file cannot be loaded.
     """
     try:
         readings = pandas.read_csv(calibrationFilename)
-        calibrationVolts = list(readings['Signal Strength (V)'].values.tolist())
-        calibrationFrequency = readings['Frequency (MHz)'].values.tolist()
+        calibrationVolts = readings['Signal Strength (V)'].to_numpy(dtype=float)
+        calibrationFrequency = readings['Frequency (MHz)'].to_numpy(dtype=float)
         return calibrationFrequency, calibrationVolts
     except KeyError or ValueError:
         logging.exception("Column did not exist", extra={"id": calibrationFilename})
-        return [], []
+        return np.empty(0), np.empty(0)
     except FileNotFoundError:
         logging.exception("No previous calibration found.", extra={"id": calibrationFilename})
         text_notification.setText("No previous calibration found, please calibrate.")
-        return [], []
+        return np.empty(0), np.empty(0)
     except Exception:
         logging.exception("Failed to load in calibration", extra={"id": calibrationFilename})
-        return [], []
+        return np.empty(0), np.empty(0)
 
 
 def createCalibrationFile(outputFileName, frequency, volts) -> None:
@@ -56,7 +55,7 @@ def createReferenceFile(outputFileName, referenceStrength, frequencyStrength) ->
 
 def calculateFrequencyValues(startFreqMHz, stopFreqMHz, df) -> List[float]:
     """Calculate frequency values for a sweep."""
-    nPoints = getNumPointsFrequency(startFreqMHz, stopFreqMHz)
+    nPoints = getNumPointsFrequency(startFreqMHz, stopFreqMHz, df)
     return startFreqMHz + df * np.arange(0, nPoints)
 
 
@@ -75,6 +74,19 @@ def find_nearest(freq, freqList, dBlist) -> float:
         return dBlist[pos - 1]
 
 
+def findNearestIndices(frequencies, calibrationFrequency: np.ndarray) -> np.ndarray:
+    """Vectorized find_nearest, returning the index of the nearest calibration point for every frequency."""
+    frequencies = np.asarray(frequencies, dtype=float)
+    positions = np.searchsorted(calibrationFrequency, frequencies, side='left')
+    after = np.minimum(positions, len(calibrationFrequency) - 1)
+    before = np.maximum(positions - 1, 0)
+    useAfter = calibrationFrequency[after] - frequencies < frequencies - calibrationFrequency[before]
+    indices = np.where(useAfter, after, before)
+    indices[positions == 0] = 0
+    indices[positions == len(calibrationFrequency)] = len(calibrationFrequency) - 1
+    return indices
+
+
 def createCalibrationDirectoryIfNotExists(filename) -> None:
     """Create calibration directory structure if it doesn't exist."""
     if not os.path.exists(os.path.dirname(os.path.dirname(filename))):
@@ -83,19 +95,19 @@ def createCalibrationDirectoryIfNotExists(filename) -> None:
         os.mkdir(os.path.dirname(filename))
 
 
-def convertAdcToVolts(adcList) -> List[float]:
+def convertAdcToVolts(adcList) -> np.ndarray:
     """Convert ADC values to voltage values."""
-    return [float(adcValue) * (3.3 / 2 ** 10) for adcValue in adcList]
+    return np.asarray(adcList, dtype=float) * (3.3 / 2 ** 10)
 
 
-def getNumPointsFrequency(startFreq, stopFreq) -> int:
+def getNumPointsFrequency(startFreq, stopFreq, stepSize) -> int:
     """Calculate number of points including endpoint for frequency array."""
-    return int((stopFreq - startFreq) * (1 / ContextFactory().getSibProperties().stepSize) + 1)
+    return int((stopFreq - startFreq) * (1 / stepSize) + 1)
 
 
-def getNumPointsSweep(startFreq, stopFreq) -> int:
+def getNumPointsSweep(startFreq, stopFreq, stepSize) -> int:
     """Calculate number of points for sweep (excluding endpoint)."""
-    return int((stopFreq - startFreq) * (1 / ContextFactory().getSibProperties().stepSize))
+    return int((stopFreq - startFreq) * (1 / stepSize))
 
 
 def findSelfResonantFrequency(frequency, volts, scanRange, threshold) -> float:
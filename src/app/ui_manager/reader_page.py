@@ -157,6 +157,7 @@ class ReaderPage:
                 guidedSetupForm,
                 self._resetReader,
                 self.issueOccurred,
+                self.sibFinder.AcquisitionScheduler,
             )
             if sib.getCalibrationFilePresent().value:
                 return guidedSetupForm.getCalibrate()
@@ -189,8 +190,7 @@ class ReaderPage:
             text_notification.setText(
                 f"Stopped scanning. Please wait for current sweep to complete to reset it."
             )
-            self.readerThreads[readerNumber].thread.shutdown_flag.set()
-            self.readerThreads[readerNumber].thread.join()
+            self.readerThreads[readerNumber].stopReaderLoop()
             readerFrame.hidePlotFrame()
             readerFrame.createButton.show()
             readerFrame.resetSetupForm()
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from src.app.helper_methods.model.peak_fit import PeakFit
+
 
 @dataclass
 class SibProperties:
@@ -9,6 +11,9 @@ class SibProperties:
     initialSpikeMhz: float = 0.2
     yAxisLabel: str = 'Signal Strength (Unitless)'
     repeatMeasurements: int = 1
+    peakFinder: str = PeakFit.GAUSSIAN  # Key of data_helpers.PEAK_FINDERS used for the resonance peak of every scan
+    settleSeconds: float = 0.005  # Seconds the DDS is left to settle before every repeated Tunair measurement
+    interByteTimeout: float = None  # Seconds a SIB read waits between two bytes, None to wait for the read timeout
 
     @staticmethod
     def getWWContinuousProperties():
@@ -1,4 +1,5 @@
 from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.reader.helpers.scan_timer import timedSpan
 from src.app.reader.sib.base_sib import BaseSib
 from src.app.reader.sib.port_allocator import PortAllocator
 from src.app.reader.sib.sib_utils import (
@@ -14,7 +15,8 @@ class ContinuousSib(BaseSib):
 
     def takeScan(self, directory: str, currentVolts: float) -> SweepData:
         try:
-            self.sib.wake()
+            with timedSpan("sibWake"):
+                self.sib.wake()
             allFrequency = calculateFrequencyValues(self.startFreqMHz, self.stopFreqMHz, self.stepSize)
             self.checkAndSendConfiguration()
             allVolts = self.performSweep()
@@ -2,6 +2,7 @@ import numpy as np
 
 from src.app.helper_methods.custom_exceptions.analysis_exception import SensorNotFoundException
 from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.reader.helpers.scan_timer import timedSpan
 from src.app.reader.sib.base_sib import BaseSib
 from src.app.reader.sib.port_allocator import PortAllocator
 from src.app.use_case.roller_bottle.vna_sweep_optimizer import VnaSweepOptimizer
@@ -14,7 +15,8 @@ class RollerBottleSib(BaseSib):
 
     def takeScan(self, directory: str, currentVolts: float) -> SweepData:
         try:
-            self.sib.wake()
+            with timedSpan("sibWake"):
+                self.sib.wake()
             optimizer = VnaSweepOptimizer(currentVolts) if not np.isnan(currentVolts) else VnaSweepOptimizer()
             sweepData = optimizer.performOptimizedSweep(
                 self,
@@ -340,7 +340,7 @@ class VnaSweepOptimizer:
         return sib_device.performSweep()
 
     @staticmethod
-    def _applyCalibration(sib_device, frequencies: List[float], raw_volts: List[float]) -> List[float]:
+    def _applyCalibration(sib_device, frequencies: List[float], raw_volts: List[float]) -> np.ndarray:
         """
         Apply calibration correction to raw voltage measurements.
 
@@ -350,13 +350,9 @@ class VnaSweepOptimizer:
             raw_volts: List of raw voltage measurements
 
         Returns:
-            List of calibrated voltage values
+            Array of calibrated voltage values
         """
-        calibrated_volts = []
-        for freq, volt in zip(frequencies, raw_volts):
-            calibrated_volt = sib_device.calibrationPointComparison(freq, volt)
-            calibrated_volts.append(calibrated_volt)
-        return calibrated_volts
+        return sib_device.calibrationComparison(frequencies, raw_volts)
 
     @staticmethod
     def _calculateFrequencies(start_freq_mhz: float, stop_freq_mhz: float, num_points: int) -> List[float]:
@@ -5,13 +5,14 @@ from typing import List
 
 import numpy as np
 
-from src.app.use_case.use_case_factory import ContextFactory
 from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.reader.helpers.scan_timer import timedSpan
 from src.app.reader.sib.base_sib import BaseSib
 from src.app.reader.sib.port_allocator import PortAllocator
 from src.app.reader.sib.sib_utils import (
     calculateFrequencyValues,
     createReferenceFile,
+    findNearestIndices,
     normalizeToReference,
 )
 from src.app.widget.sidebar.configurations.default_reference_frequency import ReferenceFrequencyConfiguration
@@ -30,7 +31,8 @@ class TunairSib(BaseSib):
 
     def takeScan(self, directory: str, currentVolts: float) -> SweepData:
         try:
-            self.sib.wake()
+            with timedSpan("sibWake"):
+                self.sib.wake()
             allFrequency = calculateFrequencyValues(self.startFreqMHz, self.stopFreqMHz, self.stepSize)
             randomizedFrequency, randomizedVolts = self.performRandomSweep(list(allFrequency), directory)
             return SweepData(randomizedFrequency, randomizedVolts)
@@ -51,44 +53,50 @@ class TunairSib(BaseSib):
     def performRandomSweep(self, frequencyRange: List[float], directory: str) -> (List[float], List[float]):
         shuffledFrequencyRange = random.sample(frequencyRange, len(frequencyRange))
         shuffledVolts = []
+        maxReferenceVoltage = MaximumReferenceVoltageConfiguration().getConfig()
+        minReferenceVoltage = MinimumReferenceVoltageConfiguration().getConfig()
         for frequency in shuffledFrequencyRange:
             freq = round(frequency, 1)
-            allFreqVolts = []
-            allReferenceVolts = []
-            averagedFreqVolts = []
-            maxReferenceVoltage = MaximumReferenceVoltageConfiguration().getConfig()
-            minReferenceVoltage = MinimumReferenceVoltageConfiguration().getConfig()
-            if freq > self.referenceFreqMHz:
-                stepSize = freq - self.referenceFreqMHz
-                self.prepareSweep(self.referenceFreqMHz - stepSize, self.referenceFreqMHz + stepSize, 3)
-            elif freq < self.referenceFreqMHz:
-                stepSize = abs(freq - self.referenceFreqMHz)
-                self.prepareSweep(self.referenceFreqMHz - (2 * stepSize), self.referenceFreqMHz, 3)
-            for i in range(ContextFactory().getSibProperties().repeatMeasurements):
-                time.sleep(0.005)  # Small delay to allow the DDS to settle
-                try:
-                    if freq > self.referenceFreqMHz:
-                        sweepVolts = self.performSweep()
-                        referenceVolts = self.calibrationPointComparison(self.referenceFreqMHz, sweepVolts[1])
-                        pointVolts = self.calibrationPointComparison(freq, sweepVolts[2])
-                        freqVolts = normalizeToReference(pointVolts, referenceVolts)
-                    elif freq < self.referenceFreqMHz:
-                        sweepVolts = self.performSweep()
-                        referenceVolts = self.calibrationPointComparison(self.referenceFreqMHz, sweepVolts[2])
-                        pointVolts = self.calibrationPointComparison(freq, sweepVolts[1])
-                        freqVolts = normalizeToReference(pointVolts, referenceVolts)
-                    else:
-                        referenceVolts = np.nan
-                        freqVolts = 1
-                    allReferenceVolts.append(referenceVolts)
-                    allFreqVolts.append(freqVolts)
-                    if minReferenceVoltage < referenceVolts < maxReferenceVoltage or np.isnan(referenceVolts):
-                        averagedFreqVolts.append(freqVolts)
-                except SIBException:
-                    logging.exception(f"Failed to get point at {freq} MHz", extra={"id": "Sib"})
-            shuffledVolts.append(np.mean(averagedFreqVolts))
+            allReferenceVolts, allFreqVolts = self.measurePoint(freq)
+            inRange = (minReferenceVoltage < allReferenceVolts) & (allReferenceVolts < maxReferenceVoltage)
+            averagedFreqVolts = allFreqVolts[inRange | np.isnan(allReferenceVolts)]
+            shuffledVolts.append(np.mean(averagedFreqVolts) if len(averagedFreqVolts) else np.nan)
             if freq % 10 == 0 or 9.7 < freq - self.referenceFreqMHz < 10.3:
                 createReferenceFile(f"{directory}/{freq} Reference Scan.csv", allReferenceVolts, allFreqVolts)
         sorted_pairs = sorted(zip(shuffledFrequencyRange, shuffledVolts))
         sortedFrequencies, sortedVolts = zip(*sorted_pairs)
         return list(sortedFrequencies), list(sortedVolts)
+
+    def measurePoint(self, freq: float) -> (np.ndarray, np.ndarray):
+        """
+        The calibrated reference volts and normalized volts of freq, one per repeated measurement that succeeded.
+
+        The DDS is configured for the 3-point sweep over the reference and the point once, then left to settle for
+        SibProperties.settleSeconds before each of the repeatMeasurements sweeps into preallocated arrays. Calibration
+        is applied to all repeats at once.
+        """
+        repeats = self.SibProperties.repeatMeasurements
+        if freq == self.referenceFreqMHz:
+            return np.full(repeats, np.nan), np.ones(repeats)
+        stepSize = abs(freq - self.referenceFreqMHz)
+        if freq > self.referenceFreqMHz:
+            self.prepareSweep(self.referenceFreqMHz - stepSize, self.referenceFreqMHz + stepSize, 3)
+            referenceIndex, pointIndex = 1, 2
+        else:
+            self.prepareSweep(self.referenceFreqMHz - (2 * stepSize), self.referenceFreqMHz, 3)
+            referenceIndex, pointIndex = 2, 1
+        sweepVolts = np.full((repeats, 3), np.nan)
+        succeeded = np.zeros(repeats, dtype=bool)
+        for i in range(repeats):
+            time.sleep(self.SibProperties.settleSeconds)  # Small delay to allow the DDS to settle
+            try:
+                sweepVolts[i] = self.performSweep()[:3]
+                succeeded[i] = True
+            except SIBException:
+                logging.exception(f"Failed to get point at {freq} MHz", extra={"id": "Sib"})
+        referenceCalibration, pointCalibration = self.calibrationVolts[
+            findNearestIndices([self.referenceFreqMHz, freq], self.calibrationFrequency)
+        ]
+        referenceVolts = sweepVolts[succeeded, referenceIndex] / referenceCalibration
+        pointVolts = sweepVolts[succeeded, pointIndex] / pointCalibration
+        return referenceVolts, normalizeToReference(pointVolts, referenceVolts)
@@ -28,6 +28,8 @@ class ContextFactory:
     UseCase-dependent components based on the current Version().useCase setting.
     """
 
+    _sibProperties = {}
+
     def __init__(self, use_case: Optional[UseCase] = None):
         """
         Initialize the factory with a specific UseCase.
@@ -165,13 +167,22 @@ class ContextFactory:
         config = self.getSetupFormConfig()
         return ConfigurableSetupForm(root_manager, guided_setup_inputs, parent, submit_fn, config)
 
-    def getSibProperties(self):
+    def getSibProperties(self) -> SibProperties:
         """
         Get SibProperties instance for the current UseCase.
 
+        The properties are built once per UseCase and shared, so callers must not modify them.
+
         Returns:
-            SibProperties instance (currently shared across all UseCases)
+            SibProperties instance for the current UseCase
         """
+        properties = ContextFactory._sibProperties.get(self.use_case)
+        if properties is None:
+            properties = self._createSibProperties()
+            ContextFactory._sibProperties[self.use_case] = properties
+        return properties
+
+    def _createSibProperties(self) -> SibProperties:
         if self.use_case == UseCase.FlowCell:
             return SibProperties.getFlowCellProperties()
         elif self.use_case == UseCase.SkrootFlowCell:
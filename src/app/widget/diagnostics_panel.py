@@ -0,0 +1,25 @@
+import tkinter as tk
+
+from src.app.ui_manager.theme import Colors
+
+
+class DiagnosticsPanel:
+    """ A small table at the bottom of a reader's page with the p50/p90 time of each stage of its recent scans. """
+
+    def __init__(self, frame):
+        self.label = tk.Label(
+            frame,
+            text="",
+            justify="left",
+            font=("Courier", 9),
+            background=Colors().body.background,
+            foreground=Colors().body.text,
+        )
+        self.label.place(relx=0.5, rely=1.0, anchor='s')
+
+    def update(self, percentiles: dict, pendingUploads: int):
+        lines = [f"{'stage':<14}{'p50 s':>8}{'p90 s':>8}"]
+        for stage, values in percentiles.items():
+            lines.append(f"{stage:<14}{values[50]:>8.2f}{values[90]:>8.2f}")
+        lines.append(f"{'uploads queued':<14}{pendingUploads:>8}")
+        self.label.configure(text="\n".join(lines))
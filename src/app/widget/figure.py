@@ -1,14 +1,20 @@
+import matplotlib
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from matplotlib.ticker import MaxNLocator
+from matplotlib.transforms import nonsingular
 from matplotlib.widgets import Button
 from reactivex.subject import BehaviorSubject
 import tkinter as tk
 import warnings
 import time
+from typing import Optional
 
 from src.app.ui_manager.theme.figure_styles import FigureStyles
 from src.app.widget.sidebar.configurations.secondary_axis_type import SecondaryAxisType
+from src.app.widget.figure_snapshot import FigureSnapshot
+from src.app.widget.scatter_series import ScatterSeries
 from src.app.widget.sidebar.configurations.secondary_axis_units import SecondaryAxisUnits
 
 warnings.filterwarnings("ignore", category=UserWarning,
@@ -21,6 +27,15 @@ class FigureCanvas:
     def __init__(self, yAxisLabel, xAxisLabel, title, tickSize=7, labelSize=9):
         self.frequencyFigure = Figure(facecolor=Colors().plot.background)
         self.currentPlot = None
+        self.secondPlot = None
+        self.view = None
+        self.viewArguments = None
+        self.limits = None
+        self.series = {}
+        self.background = None
+        self.frameBackground = None
+        self.frameSize = None
+        self.saving = False
         self.tickSize = tickSize
         self.labelSize = labelSize
         self.yAxisLabel = yAxisLabel
@@ -50,6 +65,7 @@ class FigureCanvas:
         if not hasattr(self, 'button_ax') or self.button_ax not in self.frequencyFigure.axes:
             self.button_ax = self.frequencyFigure.add_axes([0.15, 0.75, 0.2, 0.1])
             self.button_ax.set_zorder(1000)
+            self.button_ax.set_animated(True)
             self.button_ax.patch.set_alpha(0.5)
             self.toggle_button = Button(self.button_ax, 'Toggle', color=Colors().buttons.background,
                                         hovercolor=Colors().buttons.background)
@@ -91,15 +107,72 @@ class FigureCanvas:
             else:
                 raise  # Re-raise unexpected errors
 
-    def addSecondAxis(self, times, values):
-        if values:
-            ax2 = self.currentPlot.twinx()
-            ax2.scatter(times, values, s=20, color=Colors().plot.secondary_line)
-            ax2.set_ylabel(f"{SecondaryAxisType().getConfig()} {SecondaryAxisUnits().getAsUnit()}", color=Colors().plot.secondary_line)
-        self.frequencyFigure.tight_layout()
+    def setView(self, view, xLimits, yLimits, secondAxisLimits=None):
+        """
+        Rebuilds the axes when the view changed and redraws the whole figure when the limits changed. Otherwise the
+        axes, the scatter series and the cached frame are kept, and drawCanvas only blits what changed.
+        """
+        secondAxisLabel = None
+        if secondAxisLimits is not None:
+            secondAxisLabel = f"{SecondaryAxisType().getConfig()} {SecondaryAxisUnits().getAsUnit()}"
+        self.viewArguments = (view, xLimits, yLimits, secondAxisLimits)
+        layout = (view, self.yAxisLabel, self.xAxisLabel, self.title, self.reachedEquilibration, secondAxisLabel)
+        if layout != self.view:
+            self.redrawPlot()
+            if secondAxisLabel is not None:
+                self.secondPlot = self.currentPlot.twinx()
+                self.secondPlot.set_ylabel(secondAxisLabel, color=Colors().plot.secondary_line)
+            self.view = layout
+        if (xLimits, yLimits, secondAxisLimits) != self.limits:
+            self.currentPlot.set_xlim(*xLimits)
+            self.currentPlot.set_ylim(*yLimits)
+            if self.secondPlot is not None:
+                self.secondPlot.set_ylim(*secondAxisLimits)
+                self.frequencyFigure.tight_layout()
+            self.limits = (xLimits, yLimits, secondAxisLimits)
+            self.frameBackground = None
+
+    def updateScatter(self, name, x, y, size, color, secondAxis=False):
+        """ Sets the points of a scatter series of the current view, created on first use. """
+        if name not in self.series:
+            self.series[name] = ScatterSeries(self.secondPlot if secondAxis else self.currentPlot, size, color)
+        self.series[name].setData(x, y)
+
+    def snapshot(self) -> Optional[FigureSnapshot]:
+        """ The current view, or None before the first one. Series data is shared, as setData never modifies it. """
+        if self.viewArguments is None:
+            return None
+        return FigureSnapshot(
+            (self.yAxisLabel, self.xAxisLabel, self.title),
+            self.reachedEquilibration,
+            self.viewArguments,
+            [
+                (name, series.offsets, series.size, series.color, series.axes is self.secondPlot)
+                for name, series in self.series.items()
+            ],
+        )
+
+    def applySnapshot(self, snapshot: FigureSnapshot):
+        self.yAxisLabel, self.xAxisLabel, self.title = snapshot.labels
+        self.reachedEquilibration = snapshot.reachedEquilibration
+        self.setView(*snapshot.view)
+        for name, offsets, size, color, secondAxis in snapshot.series:
+            self.updateScatter(name, offsets[:, 0], offsets[:, 1], size, color, secondAxis)
+
+    @staticmethod
+    def autoscaleLimits(*values) -> tuple:
+        """ The limits matplotlib's autoscaling gives the values, for views whose axes follow their data. """
+        values = np.concatenate([np.ravel(np.asarray(value, dtype=float)) for value in values])
+        low, high = np.nanmin(values), np.nanmax(values)
+        margin = (high - low) * matplotlib.rcParams['axes.ymargin']
+        return nonsingular(low - margin, high + margin)
 
     def redrawPlot(self):
         self.frequencyFigure.clear()
+        self.secondPlot = None
+        self.limits = None
+        self.series = {}
+        self.frameBackground = None
         if self.reachedEquilibration:
             self.toggle_button = self.createToggle()
         self.currentPlot = self.frequencyFigure.add_subplot(111)
@@ -121,17 +194,59 @@ class FigureCanvas:
 
     def drawCanvas(self, frame):
         if self.frequencyCanvas is None:
-            self.frequencyCanvas = FigureCanvasTkAgg(self.frequencyFigure, master=frame)
-        self.frequencyCanvas.draw()
+            self.attachCanvas(FigureCanvasTkAgg(self.frequencyFigure, master=frame))
+        self.render()
         self.frequencyCanvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
         self.frequencyCanvas.get_tk_widget().update()
         self.frequencyCanvas.get_tk_widget().update_idletasks()
 
+    def attachCanvas(self, canvas):
+        self.frequencyCanvas = canvas
+        self.frequencyCanvas.mpl_connect('draw_event', self.onDraw)
+
+    def render(self):
+        """ Blits the changed points onto the cached frame, or draws the whole figure if there is no valid frame. """
+        if self.frameBackground is None or self.frameSize != self.frequencyFigure.bbox.bounds:
+            self.frequencyCanvas.draw()
+            return
+        fromEmptyAxes = any([series.needsRedraw() for series in self.series.values()])
+        self.frequencyCanvas.restore_region(self.background if fromEmptyAxes else self.frameBackground)
+        self.drawAnimated(fromEmptyAxes)
+        self.frequencyCanvas.blit(self.frequencyFigure.bbox)
+
+    def onDraw(self, event):
+        """ Every full draw, including Tk resizes, caches the empty axes and then draws the animated artists. """
+        if self.saving:
+            return
+        self.background = self.frequencyCanvas.copy_from_bbox(self.frequencyFigure.bbox)
+        self.drawAnimated(True)
+
+    def drawAnimated(self, fromEmptyAxes):
+        for series in self.series.values():
+            series.drawSettledPoints(fromEmptyAxes)
+        self.frameBackground = self.frequencyCanvas.copy_from_bbox(self.frequencyFigure.bbox)
+        self.frameSize = self.frequencyFigure.bbox.bounds
+        for series in self.series.values():
+            series.drawChangingPoints()
+        if self.button_ax in self.frequencyFigure.axes:
+            self.frequencyFigure.draw_artist(self.button_ax)
+
     def scatter(self, x, y, size, color):
         self.currentPlot.scatter(x, y, size, color=color)
 
-    def saveAs(self, filename):
-        self.frequencyFigure.savefig(filename, dpi=500)
+    def saveAs(self, filename, dpi=500):
+        animated = [series.artist for series in self.series.values()]
+        if self.button_ax in self.frequencyFigure.axes:
+            animated.append(self.button_ax)
+        self.saving = True
+        for artist in animated:
+            artist.set_animated(False)
+        try:
+            self.frequencyFigure.savefig(filename, dpi=dpi)
+        finally:
+            for artist in animated:
+                artist.set_animated(True)
+            self.saving = False
 
     def addVerticalLine(self, x):
         self.currentPlot.axvline(x=x)
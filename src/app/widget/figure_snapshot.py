@@ -0,0 +1,23 @@
+import numpy as np
+
+
+class FigureSnapshot:
+    """What a FigureCanvas shows, so the figure can be rendered again on another FigureCanvas and thread."""
+
+    def __init__(self, labels: tuple, reachedEquilibration: bool, view: tuple, series: list):
+        self.labels = labels
+        self.reachedEquilibration = reachedEquilibration
+        self.view = view
+        self.series = series
+
+    def isSameFigure(self, other) -> bool:
+        if other is None or len(self.series) != len(other.series):
+            return False
+        if (self.labels, self.reachedEquilibration, self.view) != (other.labels, other.reachedEquilibration, other.view):
+            return False
+        for (name, offsets, *style), (otherName, otherOffsets, *otherStyle) in zip(self.series, other.series):
+            if name != otherName or style != otherStyle:
+                return False
+            if offsets is not otherOffsets and not np.array_equal(offsets, otherOffsets, equal_nan=True):
+                return False
+        return True
@@ -1,19 +1,46 @@
+import atexit
+import datetime
+import glob
 import logging
+import logging.handlers
 import os
+import queue
+import re
+import threading
+
+from src.app.helper_methods.datetime_helpers import datetimeToMillis
+from src.app.properties.common_properties import CommonProperties
+
+LOG_FORMAT = "%(id)s - %(asctime)s [%(levelname)s] (%(threadName)s) %(message)s"
+RECORD_START = re.compile(r"^(?P<id>.*?) - (?P<time>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \[")
 
 
 def loggerSetup(location, version):
+    """
+    Logs through a queue to a rotating file, so threads never wait on file I/O to log.
+
+    The previous session's log is rolled over to location.1 rather than cleared. Returns the listener writing the file.
+    """
     if not os.path.exists(os.path.dirname(location)):
         os.mkdir(os.path.dirname(location))
-    open(location, 'w+').close()
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(id)s - %(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
-            logging.FileHandler(location)
-        ]
+    properties = CommonProperties()
+    fileHandler = logging.handlers.RotatingFileHandler(
+        location,
+        maxBytes=properties.logMaxMegabytes * 1024 * 1024,
+        backupCount=properties.logBackups,
     )
-    logging.getLogger().addFilter(DuplicateFilter())
+    if os.path.getsize(location):
+        fileHandler.doRollover()
+    fileHandler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(queue.SimpleQueue(), fileHandler)
+    queueHandler = logging.handlers.QueueHandler(listener.queue)
+    queueHandler.addFilter(LogContextFilter())
+    rootLogger = logging.getLogger()
+    rootLogger.setLevel(logging.INFO)
+    rootLogger.addHandler(queueHandler)
+    rootLogger.addFilter(DuplicateFilter())
+    listener.start()
+    atexit.register(listener.stop)
     logging.captureWarnings(True)
     logging.getLogger("matplotlib").setLevel(logging.WARNING)
     logging.getLogger("requests").setLevel(logging.WARNING)
@@ -21,7 +48,43 @@ def loggerSetup(location, version):
     logging.getLogger("botocore").setLevel(logging.ERROR)
     logging.getLogger('s3transfer').setLevel(logging.ERROR)
     logging.info(f'Logger Setup {version}', extra={"id": "global"})
-    return
+    return listener
+
+
+def writeRunLog(location: str, destination: str, logId: str, sinceMillis: int):
+    """
+    Writes the records logged since sinceMillis by logId, or by anything other than a reader, to destination.
+
+    Reads the rotated segments of the log oldest first, skipping segments last written before sinceMillis.
+    """
+    rotated = [segment for segment in glob.glob(f"{glob.escape(location)}.*") if segment.rsplit(".", 1)[1].isdigit()]
+    segments = sorted(rotated, key=lambda segment: -int(segment.rsplit(".", 1)[1])) + [location]
+    keep = False
+    with open(destination, "w") as runLog:
+        for segment in segments:
+            if not os.path.exists(segment) or os.path.getmtime(segment) * 1000 < sinceMillis:
+                continue
+            with open(segment, errors="replace") as log:
+                for line in log:
+                    recordStart = RECORD_START.match(line)
+                    if recordStart:
+                        recordTime = datetime.datetime.strptime(recordStart["time"], "%Y-%m-%d %H:%M:%S,%f")
+                        recordId = recordStart["id"]
+                        keep = datetimeToMillis(recordTime) >= sinceMillis and \
+                            (recordId == logId or not recordId.startswith("Reader "))
+                    if keep:
+                        runLog.write(line)
+
+
+class LogContextFilter(logging.Filter):
+    """ Gives every record the structured fields the log format expects: its id and, for reader records, the reader. """
+
+    def filter(self, record: logging.LogRecord):
+        if not hasattr(record, "id"):
+            record.id = record.name if record.name != "root" else "global"
+        readerId = re.fullmatch(r"Reader (\d+)", str(record.id))
+        record.reader = int(readerId[1]) if readerId else None
+        return True
 
 
 class DuplicateFilter(logging.Filter):
@@ -30,16 +93,21 @@ class DuplicateFilter(logging.Filter):
         self.consecutive_repeats = 0
         self.consecutive_repeats_warning = 100
         self.last_log = ""
+        self.lock = threading.Lock()
 
     def filter(self, record: logging.LogRecord):
         # add other fields if you need more granular comparison, depends on your app
         current_log = (record.levelno, record.msg)
-        if current_log != getattr(self, "last_log", None):
-            self.last_log = current_log
-            self.consecutive_repeats = 0
-            return True
-        self.consecutive_repeats += 1
-        if self.consecutive_repeats % self.consecutive_repeats_warning == 0:
-            logging.warning(f"{self.last_log} recorded {self.consecutive_repeats_warning} times in a row.",
+        with self.lock:
+            if current_log != self.last_log:
+                self.last_log = current_log
+                self.consecutive_repeats = 0
+                return True
+            self.consecutive_repeats += 1
+            warn = self.consecutive_repeats % self.consecutive_repeats_warning == 0
+            last_log = self.last_log
+        # Logged outside the lock, the warning passes back through this filter.
+        if warn:
+            logging.warning(f"{last_log} recorded {self.consecutive_repeats_warning} times in a row.",
                             extra={"id": "global"})
         return False
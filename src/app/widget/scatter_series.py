@@ -0,0 +1,55 @@
+from collections import deque
+
+import numpy as np
+
+
+class ScatterSeries:
+    """
+    A scatter plot drawn by blitting. The points that stopped changing are kept in the cached frame of the figure, so a
+    frame only draws the points appended or relabelled since, rather than the whole history.
+    """
+
+    def __init__(self, axes, size, color, framesToSettle=10):
+        self.axes = axes
+        self.size = size
+        self.color = color
+        self.artist = axes.scatter([], [], size, color=color, animated=True)
+        self.changingArtist = axes.scatter([], [], size, color=color, animated=True)
+        self.offsets = np.empty((0, 2))
+        self.drawnOffsets = self.offsets
+        self.cachedPoints = 0
+        self.recentChanges = deque(maxlen=framesToSettle)
+
+    def setData(self, x, y):
+        self.offsets = np.column_stack([np.atleast_1d(x), np.atleast_1d(y)]).astype(float)
+        self.artist.set_offsets(self.offsets)
+
+    def needsRedraw(self) -> bool:
+        """ Whether a point in the cached frame changed, in which case the frame has to be drawn from empty axes. """
+        unchanged = self.unchangedPoints()
+        if len(self.drawnOffsets):
+            self.recentChanges.append(len(self.offsets) - unchanged)
+        return unchanged < self.cachedPoints
+
+    def drawSettledPoints(self, fromEmptyAxes: bool):
+        """ Draws the points that did not change for a while, which the caller then caches with the frame. """
+        start = 0 if fromEmptyAxes else self.cachedPoints
+        stop = max(start, len(self.offsets) - max(self.recentChanges, default=0))
+        self.drawPoints(start, stop)
+        self.cachedPoints = stop
+
+    def drawChangingPoints(self):
+        self.drawPoints(self.cachedPoints, len(self.offsets))
+        self.drawnOffsets = self.offsets
+
+    def drawPoints(self, start, stop):
+        if stop > start:
+            self.changingArtist.set_offsets(self.offsets[start:stop])
+            self.axes.draw_artist(self.changingArtist)
+
+    def unchangedPoints(self) -> int:
+        """ The number of leading points that are the same as on the last frame. """
+        common = min(len(self.offsets), len(self.drawnOffsets))
+        drawn, current = self.drawnOffsets[:common], self.offsets[:common]
+        changed = ~((drawn == current) | (np.isnan(drawn) & np.isnan(current))).all(axis=1)
+        return int(np.argmax(changed)) if changed.any() else common
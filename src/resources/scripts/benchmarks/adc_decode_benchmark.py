@@ -0,0 +1,88 @@
+"""
+Microbenchmark of the SIB350 sweep decode paths.
+
+Compares the list API (read_sweep_response, int.from_bytes per sample, list.extend per chunk) against the opt-in
+buffer API (read_sweep_response_into, one preallocated bytearray viewed as big-endian uint16) on recorded-like
+sweeps of 300, 3,000 and 30,000 points. The serial port is replaced by an in-memory stream that uses pyserial's own
+read/readinto, so only the host side decoding is measured.
+
+Run from the repository root with: python -m src.resources.scripts.benchmarks.adc_decode_benchmark
+"""
+import io
+import time
+
+import numpy as np
+import serial
+
+from src.resources.sibcontrol.sibcontrol import SIB350
+
+BYTES_PER_CHUNK = 512
+REPEATS = 20
+
+
+class RecordedSerial(serial.SerialBase):
+    """A serial port that replays a recorded device response."""
+
+    def __init__(self, response: bytes):
+        super().__init__()
+        self.is_open = True
+        self.stream = io.BytesIO(response)
+
+    def read(self, size=1) -> bytes:
+        return self.stream.read(size)
+
+    def rewind(self):
+        self.stream.seek(0)
+
+
+def recordSweepResponse(numberOfPoints: int) -> bytes:
+    """The SEND_DATA packets and payloads of one sweep followed by the OK packet."""
+    codes = np.random.default_rng(numberOfPoints).integers(0, 2 ** 12, numberOfPoints).astype('>u2').tobytes()
+    response = bytearray()
+    for start in range(0, len(codes), BYTES_PER_CHUNK):
+        chunk = codes[start:start + BYTES_PER_CHUNK]
+        response += b'!ASD' + len(chunk).to_bytes(4, 'big') + chunk
+    response += b'!AA0' + bytes(4)
+    return bytes(response)
+
+
+def readWithList(sib: SIB350) -> list:
+    conversionResults = list()
+    while True:
+        ackMsg, data = sib.read_sweep_response()
+        if ackMsg == 'ok':
+            return conversionResults
+        conversionResults.extend(data)
+
+
+def readWithBuffer(sib: SIB350) -> np.ndarray:
+    sweepBuffer = sib.create_sweep_buffer()
+    while sib.read_sweep_response_into(sweepBuffer) != 'ok':
+        pass
+    return sweepBuffer.codes()
+
+
+def timeSweep(sib: SIB350, readSweep) -> tuple:
+    timings = []
+    for _ in range(REPEATS):
+        sib._comms._ser.rewind()
+        start = time.perf_counter()
+        codes = readSweep(sib)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000, codes
+
+
+def runBenchmark(pointCounts=(300, 3000, 30000)):
+    print(f"{'points':>8} {'list (ms)':>10} {'buffer (ms)':>12} {'speedup':>8}")
+    for numberOfPoints in pointCounts:
+        sib = SIB350('benchmark')
+        sib._comms._ser = RecordedSerial(recordSweepResponse(numberOfPoints))
+        sib._num_pts = numberOfPoints
+        listMs, listCodes = timeSweep(sib, readWithList)
+        bufferMs, bufferCodes = timeSweep(sib, readWithBuffer)
+        assert np.array_equal(listCodes, bufferCodes), "Decode paths disagree"
+        print(f"{numberOfPoints:>8} {listMs:>10.3f} {bufferMs:>12.3f} {listMs / bufferMs:>7.1f}x")
+
+
+if __name__ == '__main__':
+    runBenchmark()
@@ -0,0 +1,86 @@
+"""
+Accuracy versus latency of the peak finders in data_helpers on recorded scans.
+
+Every scan (the `Reader N/1*.csv` files of the dev folder, or of the folder given as the first argument) is fitted
+the way Analyzer does it, raw and Savitzky-Golay smoothed with 5 MHz on each side of the maximum, by:
+  - curve_fit: findMaxGaussian, the current engine and the reference for the accuracy columns,
+  - log-parabola: findMaxLogParabola, one scan at a time,
+  - batched: findMaxLogParabolas over all scans of a reader at once, timed per scan.
+
+Run from the repository root with: python -m src.resources.scripts.benchmarks.peak_finder_benchmark [folder]
+"""
+import glob
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas
+from scipy.signal import savgol_filter
+
+from src.app.helper_methods.data_helpers import findMaxGaussian, findMaxLogParabola, findMaxLogParabolas
+from src.app.properties.dev_properties import DevProperties
+
+
+def loadRecordedScans(folder: str) -> dict:
+    """The recorded scans of every reader folder, as (frequency, magnitudes) with one row per scan."""
+    readers = {}
+    for readerFolder in sorted(glob.glob(f'{folder}/Reader */')):
+        scans = [pandas.read_csv(file) for file in sorted(glob.glob(f'{readerFolder}/1*.csv'))]
+        scans = [scan for scan in scans if len(scan) > 101]
+        if scans:
+            frequency = scans[0]['Frequency (MHz)'].values
+            magnitudes = np.array([
+                scan['Signal Strength (Unitless)'].values for scan in scans
+                if np.array_equal(scan['Frequency (MHz)'].values, frequency)
+            ])
+            readers[os.path.basename(os.path.dirname(readerFolder))] = (frequency, magnitudes)
+    return readers
+
+
+def fitEach(findPeak, frequency, magnitudes, pointsOnEachSide) -> tuple:
+    peaks = []
+    start = time.perf_counter()
+    for magnitude in magnitudes:
+        try:
+            peaks.append(findPeak(frequency, magnitude, pointsOnEachSide))
+        except (RuntimeError, ValueError):
+            peaks.append((np.nan, np.nan, np.nan))
+    return np.array(peaks), (time.perf_counter() - start) / len(magnitudes)
+
+
+def fitBatched(frequency, magnitudes, pointsOnEachSide) -> tuple:
+    start = time.perf_counter()
+    peaks = np.column_stack(findMaxLogParabolas(frequency, magnitudes, pointsOnEachSide))
+    return peaks, (time.perf_counter() - start) / len(magnitudes)
+
+
+def describe(name: str, peaks: np.ndarray, seconds: float, reference: np.ndarray):
+    centroidError = np.abs(peaks[:, 1] - reference[:, 1])
+    widthError = np.abs(peaks[:, 2] / reference[:, 2] - 1) * 100
+    print(f"  {name:<13} {seconds * 1000:>9.3f} {np.nanmedian(centroidError) * 1000:>12.2f} "
+          f"{np.nanpercentile(centroidError, 95) * 1000:>9.2f} {np.nanmax(centroidError) * 1000:>9.2f} "
+          f"{np.nanmedian(widthError):>10.2f} {np.isnan(peaks[:, 1]).sum():>7}")
+
+
+def runBenchmark(folder: str):
+    readers = loadRecordedScans(folder)
+    if not readers:
+        print(f"No recorded scans found under {folder}/Reader */1*.csv")
+        return
+    warnings.simplefilter("ignore")
+    for reader, (frequency, magnitudes) in readers.items():
+        pointsOnEachSide = round(5 / np.median(np.diff(frequency)))
+        for series, rows in [("raw", magnitudes), ("smoothed", savgol_filter(magnitudes, 101, 2, axis=1))]:
+            print(f"{reader}, {series}: {len(rows)} scans of {len(frequency)} points")
+            print(f"  {'engine':<13} {'ms/scan':>9} {'median kHz':>12} {'p95 kHz':>9} {'max kHz':>9} "
+                  f"{'width %':>10} {'no peak':>7}")
+            reference, referenceSeconds = fitEach(findMaxGaussian, frequency, rows, pointsOnEachSide)
+            describe("curve_fit", reference, referenceSeconds, reference)
+            describe("log-parabola", *fitEach(findMaxLogParabola, frequency, rows, pointsOnEachSide), reference)
+            describe("batched", *fitBatched(frequency, rows, pointsOnEachSide), reference)
+
+
+if __name__ == '__main__':
+    runBenchmark(sys.argv[1] if len(sys.argv) > 1 else DevProperties().devBaseFolder)
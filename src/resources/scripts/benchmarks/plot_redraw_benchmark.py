@@ -0,0 +1,92 @@
+"""
+Redraw latency of the reader SGI plot as a run grows.
+
+Replays a simulated run of 5 minute scans through ResultSet, so the denoiser relabels recent points like it does live,
+and times the plot update of every scan with:
+  - redraw: the previous Plotter path, clearing the figure, rebuilding the axes and scatter and drawing everything,
+  - blit: FigureCanvas.setView/updateScatter/render, which only redraws on limit changes and otherwise blits.
+Both draw on an Agg canvas, so the Tk transfer and the jpg export, which neither path changes, are not measured.
+
+Run from the repository root with: python -m src.resources.scripts.benchmarks.plot_redraw_benchmark [scans]
+"""
+import sys
+import time
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from src.app.helper_methods.model.result_set.result_set import ResultSet
+from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
+from src.app.reader.helpers.plotter import Plotter
+from src.app.ui_manager.theme.colors import Colors
+from src.app.ui_manager.theme.figure_styles import FigureStyles
+from src.app.widget.figure import FigureCanvas
+
+REPORT_EVERY = 500
+
+
+def simulateRun(numberOfScans: int) -> tuple:
+    """Sigmoidal frequency drop over the run with measurement noise and outliers."""
+    rng = np.random.default_rng(0)
+    hours = np.arange(numberOfScans) / 12
+    frequency = 130 - 3 / (1 + np.exp(-(hours - hours[-1] / 2) / 5)) + rng.normal(0, 0.03, numberOfScans)
+    outliers = rng.choice(numberOfScans, numberOfScans // 30, replace=False)
+    frequency[outliers] += rng.normal(0, 1, len(outliers))
+    return hours, frequency
+
+
+def createCanvas() -> FigureCanvas:
+    figureCanvas = FigureCanvas('Skroot Growth Index (SGI)', 'Time (hours)', 'SGI')
+    figureCanvas.attachCanvas(FigureCanvasAgg(figureCanvas.frequencyFigure))
+    return figureCanvas
+
+
+def redraw(figureCanvas: FigureCanvas, x, y, state: dict):
+    figureCanvas.redrawPlot()
+    figureCanvas.setYAxisLimits(bottom=np.nanmin(y) * 1.1, top=max(FigureStyles().y_soft_max, np.nanmax(y) * 1.1))
+    figureCanvas.setXAxisLimits(right=max(FigureStyles().x_soft_max, np.nanmax(x) * 1.1))
+    figureCanvas.scatter(x, y, 20, Colors().buttons.hover)
+    figureCanvas.frequencyCanvas.draw()
+
+
+def blit(figureCanvas: FigureCanvas, x, y, state: dict):
+    state['time'] = Plotter.growLimit(state.get('time'), FigureStyles().x_soft_max, np.nanmax(x))
+    state['sgi'] = Plotter.growLimit(state.get('sgi'), FigureStyles().y_soft_max, np.nanmax(y))
+    figureCanvas.setView('sgi', (0, state['time']), (np.nanmin(y) * 1.1, state['sgi']))
+    figureCanvas.updateScatter('sgi', x, y, 20, Colors().buttons.hover)
+    figureCanvas.render()
+
+
+def timeRun(update, hours, frequency) -> np.ndarray:
+    resultSet, figureCanvas, state = ResultSet(), createCanvas(), {}
+    zeroPoint = frequency[0]
+    timings = []
+    for scan in range(len(hours)):
+        dataPoint = ResultSetDataPoint()
+        dataPoint.setTime(hours[scan])
+        dataPoint.setMaxFrequency(frequency[scan])
+        dataPoint.setMaxFrequencySmooth(frequency[scan])
+        resultSet.setValues(dataPoint)
+        start = time.perf_counter()
+        update(figureCanvas, resultSet.getDenoiseTimeSmooth(), resultSet.getDenoiseSgiSmooth(zeroPoint), state)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def runBenchmark(numberOfScans: int):
+    matplotlib.use('Agg')
+    FigureStyles.applyGenericStyles()
+    hours, frequency = simulateRun(numberOfScans)
+    redrawTimings = timeRun(redraw, hours, frequency)
+    blitTimings = timeRun(blit, hours, frequency)
+    print(f"{'scans':>7} {'redraw median (ms)':>19} {'blit median (ms)':>17} {'blit p95 (ms)':>14} {'full draws':>11}")
+    for end in range(REPORT_EVERY, numberOfScans + 1, REPORT_EVERY):
+        window = slice(end - REPORT_EVERY, end)
+        fullDraws = (blitTimings[window] > 5 * np.median(blitTimings[window])).sum()
+        print(f"{end:>7} {np.median(redrawTimings[window]) * 1000:>19.2f} {np.median(blitTimings[window]) * 1000:>17.2f} "
+              f"{np.percentile(blitTimings[window], 95) * 1000:>14.2f} {fullDraws:>11}")
+
+
+if __name__ == '__main__':
+    runBenchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -0,0 +1,189 @@
+"""
+Headless replay of recorded runs through the reader analysis pipeline, as fast as it will go.
+
+Every simulated reader replays the recorded scans of one `Reader N` folder of the dev folder, or of the folder given,
+through the same path a scan takes in ReaderThreadManager without the SIB, GUI or uploads: createScanFile, the raw scan
+segments, Analyzer.analyzeScan, the zero point at the end of equilibration, HarvestAlgorithm.check and the analyzed
+CSVs. Readers run concurrently on their own threads and share the Gaussian fitting service like they do live. Reports:
+  - throughput in scans per second over all readers,
+  - p50/p90/p99 latency of each stage, from the ScanTimer spans of the pipeline,
+  - peak RSS of this process and of the fitting processes,
+  - parity of every reader's smoothAnalyzed.csv against a golden run, written with --write-golden.
+Exits with 1 when the outputs differ from the golden run, so it can gate a release.
+
+Run from the repository root with:
+    python -m src.resources.scripts.benchmarks.replay_benchmark [folder] [--readers N] [--scans N] [--golden folder]
+"""
+import argparse
+import glob
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas
+
+from src.app.helper_methods.data_helpers import convertListFromPercent
+from src.app.helper_methods.file_manager.reader_file_manager import ReaderFileManager
+from src.app.helper_methods.file_manager.scan_segment_writer import ScanSegmentWriter
+from src.app.helper_methods.helper_functions import createScanFile, getZeroPoint
+from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.properties.common_properties import CommonProperties
+from src.app.properties.dev_properties import DevProperties
+from src.app.reader.algorithm.harvest_algorithm import HarvestAlgorithm
+from src.app.reader.analyzer.analyzer import Analyzer
+from src.app.reader.analyzer.gaussian_fitting_service import GaussianFittingService
+from src.app.reader.helpers.scan_metrics import ScanMetrics, STAGES
+from src.app.reader.helpers.scan_timer import ScanTimer
+
+PARITY_TOLERANCE = 1e-6
+
+
+def loadRecordedRuns(folder: str, maxScans: int) -> list:
+    """The (timestamp, SweepData) of the recorded scans of every reader folder, oldest first."""
+    runs = []
+    for readerFolder in sorted(glob.glob(f'{folder}/Reader */')):
+        scanFiles = sorted(glob.glob(f'{readerFolder}/1*.csv'), key=lambda file: int(os.path.basename(file)[:-4]))
+        scans = []
+        for scanFile in scanFiles[:maxScans]:
+            readings = pandas.read_csv(scanFile)
+            frequencies = readings.iloc[:, 0].values.tolist()
+            magnitudes = convertListFromPercent(readings.iloc[:, 1].values.tolist())
+            scans.append((int(os.path.basename(scanFile)[:-4]), SweepData(frequencies, magnitudes)))
+        if scans:
+            runs.append(scans)
+    return runs
+
+
+def replayReader(readerNumber: int, scans: list, outputFolder: str, equilibrationHours: float) -> list:
+    """
+    Runs the recorded scans through the pipeline of one reader, returning the stage timings of every scan. ScanMetrics
+    only keeps the last scanTimingHistory scans in memory, so the benchmark collects them itself.
+    """
+    fileManager = ReaderFileManager(f'{outputFolder}/Reader {readerNumber}', readerNumber)
+    os.makedirs(fileManager.getReaderSavePath())
+    harvestAlgorithm = HarvestAlgorithm(fileManager)
+    analyzer = Analyzer(fileManager, harvestAlgorithm)
+    analyzer.ResultSet.startTime = scans[0][0]
+    segmentWriter = ScanSegmentWriter(fileManager.getRawScanSegments())
+    metrics = ScanMetrics(fileManager.getScanTimings())
+    finishedEquilibration, scanTimings = False, []
+    for timestamp, sweepData in scans:
+        timer = ScanTimer()
+        fileManager.scanDateMillis = timestamp
+        with timer.active():
+            scanTimes = analyzer.ResultSet.getTime()
+            if not finishedEquilibration and len(scanTimes) and scanTimes[-1] >= equilibrationHours:
+                analyzer.setZeroPoint(getZeroPoint(equilibrationHours, analyzer.ResultSet.getMaxFrequencySmooth()))
+                analyzer.resetRun()
+                finishedEquilibration = True
+            with timer.span("scanFiles"):
+                createScanFile(fileManager.getCurrentScan(), sweepData)
+                segmentWriter.append(timestamp, sweepData)
+            try:
+                analyzer.analyzeScan(sweepData, CommonProperties().denoiseSet)
+            except Exception:
+                pass  # a failed fit is recorded in the result set like it is live
+            with timer.span("harvest"):
+                harvestAlgorithm.check(analyzer.ResultSet)
+            with timer.span("analyzedFiles"):
+                analyzer.createAnalyzedFiles()
+        scanTimings.append(metrics.record(timestamp, timer))
+    return scanTimings
+
+
+def compareToGolden(outputFolder: str, goldenFolder: str, readers: int) -> bool:
+    """Prints the largest difference of every column of each reader's smoothAnalyzed.csv from the golden run."""
+    matches = True
+    for readerNumber in range(1, readers + 1):
+        goldenFile = f'{goldenFolder}/Reader {readerNumber}/smoothAnalyzed.csv'
+        if not os.path.exists(goldenFile):
+            print(f"  Reader {readerNumber}: no golden output")
+            matches = False
+            continue
+        golden = pandas.read_csv(goldenFile)
+        output = pandas.read_csv(f'{outputFolder}/Reader {readerNumber}/smoothAnalyzed.csv')
+        if list(golden.columns) != list(output.columns) or len(golden) != len(output):
+            print(f"  Reader {readerNumber}: {len(output)} rows of {list(output.columns)}, "
+                  f"golden has {len(golden)} rows of {list(golden.columns)}")
+            matches = False
+            continue
+        differences = {}
+        for column in golden.columns:
+            expected, actual = golden[column].to_numpy(float), output[column].to_numpy(float)
+            same = np.isclose(actual, expected, rtol=PARITY_TOLERANCE, atol=PARITY_TOLERANCE, equal_nan=True)
+            differences[column] = np.nanmax(np.abs(actual - expected), initial=0.0)
+            matches = matches and bool(same.all())
+        print(f"  Reader {readerNumber}: " + ", ".join(f"{column} {difference:.2g}"
+                                                       for column, difference in differences.items()))
+    return matches
+
+
+def writeGolden(outputFolder: str, goldenFolder: str, readers: int):
+    for readerNumber in range(1, readers + 1):
+        os.makedirs(f'{goldenFolder}/Reader {readerNumber}', exist_ok=True)
+        shutil.copy(f'{outputFolder}/Reader {readerNumber}/smoothAnalyzed.csv',
+                    f'{goldenFolder}/Reader {readerNumber}/smoothAnalyzed.csv')
+
+
+def runBenchmark(arguments) -> int:
+    runs = loadRecordedRuns(arguments.folder, arguments.scans)
+    if not runs:
+        print(f"No recorded scans found under {arguments.folder}/Reader */1*.csv")
+        return 1
+    readerRuns = [runs[reader % len(runs)] for reader in range(arguments.readers)]
+    totalScans = sum(len(scans) for scans in readerRuns)
+    print(f"Replaying {totalScans} scans on {arguments.readers} readers from {len(runs)} recorded runs")
+    GaussianFittingService()  # start the fitting processes outside the timed section
+    with tempfile.TemporaryDirectory() as outputFolder:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=arguments.readers) as executor:
+            readerTimings = list(executor.map(
+                lambda reader: replayReader(reader + 1, readerRuns[reader], outputFolder, arguments.equilibration),
+                range(arguments.readers),
+            ))
+        elapsed = time.perf_counter() - start
+
+        print(f"Throughput: {totalScans / elapsed:.1f} scans/s ({elapsed:.2f} s)")
+        print(f"  {'stage':<14} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+        timings = {stage: [scan[stage] for scanTimings in readerTimings for scan in scanTimings] for stage in STAGES}
+        for stage in STAGES:
+            p50, p90, p99 = np.percentile(timings[stage], [50, 90, 99]) * 1000
+            print(f"  {stage:<14} {p50:>9.2f} {p90:>9.2f} {p99:>9.2f}")
+        # ru_maxrss is in kB on Linux
+        print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB, fitting processes "
+              f"{resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024:.0f} MB")
+
+        if arguments.write_golden:
+            writeGolden(outputFolder, arguments.golden, arguments.readers)
+            print(f"Wrote golden outputs to {arguments.golden}")
+            return 0
+        if arguments.golden:
+            print("Parity with the golden run:")
+            matches = compareToGolden(outputFolder, arguments.golden, arguments.readers)
+            print("Outputs match." if matches else "Outputs differ from the golden run.")
+            return 0 if matches else 1
+    return 0
+
+
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Replay recorded runs through the reader analysis pipeline.")
+    parser.add_argument("folder", nargs="?", default=DevProperties().devBaseFolder,
+                        help="folder with the Reader N folders of recorded scans, the dev folder by default")
+    parser.add_argument("--readers", type=int, default=4, help="simulated readers replaying at the same time")
+    parser.add_argument("--scans", type=int, default=None, help="most scans replayed per reader")
+    parser.add_argument("--equilibration", type=float, default=0.2, help="equilibration time in hours")
+    parser.add_argument("--golden", default=None, help="folder of the golden run outputs to compare against")
+    parser.add_argument("--write-golden", action="store_true", help="write this run's outputs as the golden run")
+    arguments = parser.parse_args()
+    if arguments.write_golden and not arguments.golden:
+        parser.error("--write-golden needs --golden")
+    return arguments
+
+
+if __name__ == '__main__':
+    sys.exit(runBenchmark(parseArguments()))
@@ -0,0 +1,72 @@
+"""
+Microbenchmark of the SGI conversions of a two week history.
+
+Every scan the plotter, KPI form and analyzer convert the denoised frequencies to SGI about five times. Compares:
+  - list: the previous per-value max(0, 100 * (1 - value / zeroPoint)),
+  - vectorized: frequencyToIndex on the whole array for every call,
+  - memoized: ResultSet.getDenoiseSgi, converting once per zero point and column revision.
+
+Run from the repository root with: python -m src.resources.scripts.benchmarks.sgi_conversion_benchmark
+"""
+import time
+
+import numpy as np
+
+from src.app.helper_methods.data_helpers import frequencyToIndex
+from src.app.helper_methods.model.result_set.result_set import ResultSet
+from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
+
+HISTORY = 4032  # Two weeks of scans every 5 minutes
+SCANS = 20
+CALLS_PER_SCAN = 5
+ZERO_POINT = 130.0
+
+
+def createResultSet() -> ResultSet:
+    resultSet = ResultSet()
+    resultSet.time = np.arange(HISTORY) / 12
+    resultSet.maxFrequency = np.linspace(130, 125, HISTORY)
+    resultSet.maxFrequencySmooth = np.linspace(130, 125, HISTORY)
+    resultSet.filenames = [""] * HISTORY
+    resultSet.timestamps = [0] * HISTORY
+    resultSet.denoiseIndices = list(range(HISTORY))
+    return resultSet
+
+
+def createDataPoint(scan: int) -> ResultSetDataPoint:
+    dataPoint = ResultSetDataPoint()
+    dataPoint.setTime((HISTORY + scan) / 12)
+    dataPoint.setMaxFrequency(125.0)
+    dataPoint.setMaxFrequencySmooth(125.0)
+    dataPoint.setFilename(f"{scan}.csv")
+    dataPoint.setTimestamp(1700000000000 + scan * 300000)
+    dataPoint.setDerivative(0.0)
+    return dataPoint
+
+
+def timeConversion(convert) -> float:
+    """Milliseconds per scan spent converting, the history growing by one scan between conversions."""
+    resultSet, elapsed = createResultSet(), 0
+    for scan in range(SCANS):
+        resultSet.setValues(createDataPoint(scan))
+        start = time.perf_counter()
+        for _ in range(CALLS_PER_SCAN):
+            convert(resultSet)
+        elapsed += time.perf_counter() - start
+    return elapsed / SCANS * 1000
+
+
+def runBenchmark():
+    print(f"{HISTORY} points of history, {CALLS_PER_SCAN} conversions per scan")
+    print(f"{'conversion':>12} {'ms/scan':>9}")
+    for name, convert in [
+        ("list", lambda resultSet: [max(0, 100 * (1 - value / ZERO_POINT))
+                                    for value in resultSet.getDenoiseFrequency()]),
+        ("vectorized", lambda resultSet: frequencyToIndex(ZERO_POINT, resultSet.getDenoiseFrequency())),
+        ("memoized", lambda resultSet: resultSet.getDenoiseSgi(ZERO_POINT)),
+    ]:
+        print(f"{name:>12} {timeConversion(convert):>9.3f}")
+
+
+if __name__ == '__main__':
+    runBenchmark()
@@ -0,0 +1,108 @@
+"""
+End to end acquisition latency through the SIB350 protocol stack, without hardware.
+
+Every SIB is opened on the sib350sim:// simulator, so BaseSib, SIB350 and NComm run unchanged over a simulated serial
+port with the given round-trip latency and jitter. Times the median of:
+  - performSweep: one configured 300 point sweep,
+  - takeScan: a whole ContinuousSib scan, waking, configuring, sweeping, calibrating and sleeping,
+  - resetSibConnection: closing, reopening and reconfiguring the port after a communication error,
+  - optimized sweep: a RollerBottleSib scan through the VNA sweep optimizer,
+and reports the commands each one sends the device, then the round-trip latency of every command on the last
+ContinuousSib connection.
+
+Run from the repository root with:
+    python -m src.resources.scripts.benchmarks.sib_acquisition_benchmark [round trip ms] [jitter ms]
+"""
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.app.helper_methods.custom_exceptions.sib_exception import SIBReconnectException
+from src.app.reader.sib.port_allocator import PortAllocator
+from src.app.reader.sib.sib_utils import createCalibrationFile
+from src.app.use_case.continuous.continuous_sib import ContinuousSib
+from src.app.use_case.roller_bottle.roller_bottle_sib import RollerBottleSib
+
+REPEATS = 10
+
+
+class SimulatedPortAllocator(PortAllocator):
+    """Hands every reader the same simulated port, so resetSibConnection reopens the simulator."""
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+
+    def getPortForReader(self, readerNumber):
+        self.ports[readerNumber] = self.url
+        return SimpleNamespace(device=self.url, serial_number='simulated')
+
+
+def createSimulatedSib(sibClass, url: str, calibrationFile: str):
+    portAllocator = SimulatedPortAllocator(url)
+    return sibClass(portAllocator.getPortForReader(1), calibrationFile, 1, portAllocator)
+
+
+def reconnect(sib):
+    try:
+        sib.resetSibConnection()
+    except SIBReconnectException:
+        pass
+
+
+def timeStep(sib, step) -> tuple:
+    timings, commands = [], []
+    for _ in range(REPEATS):
+        simulator = sib.sib._comms._ser.simulator
+        commandsBefore = sum(simulator.commands.values())
+        start = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - start)
+        stepCommands = sum(simulator.commands.values()) - commandsBefore
+        if sib.sib._comms._ser.simulator is not simulator:
+            # resetSibConnection opened a new port, with a new simulator counting the commands since
+            stepCommands += sum(sib.sib._comms._ser.simulator.commands.values())
+        commands.append(stepCommands)
+    return np.median(timings) * 1000, int(np.median(commands))
+
+
+def runBenchmark(roundTripMs: float, jitterMs: float):
+    with tempfile.TemporaryDirectory() as directory:
+        calibrationFile = os.path.join(directory, 'Calibration.csv')
+        calibrationFrequency = np.arange(50, 170, 0.2)
+        createCalibrationFile(calibrationFile, calibrationFrequency, np.full(len(calibrationFrequency), 1.5))
+        url = f'sib350sim://?latency_ms={roundTripMs}&jitter_ms={jitterMs}'
+        continuousSib = createSimulatedSib(ContinuousSib, f'{url}&profile=resonance', calibrationFile)
+        rollerBottleSib = createSimulatedSib(RollerBottleSib, f'{url}&profile=peak', calibrationFile)
+        for sib in [continuousSib, rollerBottleSib]:
+            # As Reader does, so the SIB has a valid sweep configuration before its first scan
+            sib.setStartFrequency(sib.SibProperties.startFrequency)
+            sib.setStopFrequency(sib.SibProperties.stopFrequency)
+        continuousSib.sib.wake()
+        continuousSib.checkAndSendConfiguration()
+
+        print(f"{roundTripMs} ms round trip, {jitterMs} ms jitter, median of {REPEATS}")
+        print(f"{'step':>20} {'ms':>9} {'commands':>9}")
+        for name, sib, step in [
+            ("performSweep", continuousSib, continuousSib.performSweep),
+            ("takeScan", continuousSib, lambda: continuousSib.takeScan(directory, np.nan)),
+            ("resetSibConnection", continuousSib, lambda: reconnect(continuousSib)),
+            ("optimized sweep", rollerBottleSib, lambda: rollerBottleSib.takeScan(directory, np.nan)),
+        ]:
+            milliseconds, commands = timeStep(sib, step)
+            print(f"{name:>20} {milliseconds:>9.2f} {commands:>9}")
+
+        print(f"\n{'command':>20} {'count':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for command, latency in continuousSib.sib.command_latency().items():
+            print(f"{command:>20} {latency['count']:>9} {latency['p50_ms']:>9.2f} {latency['p99_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    runBenchmark(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 1.0,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+    )
@@ -0,0 +1,95 @@
+"""
+Throughput of the Tunair reference-normalized acquisition against a simulated SIB.
+
+Every Tunair point is a 3-point DDS sweep over the reference and the point, repeated repeatMeasurements times. Compares:
+  - per-point: the previous loop, configuring the DDS with three write/ack round trips and looking up the calibration
+    of both frequencies for every repeat,
+  - batched: TunairSib.measurePoint, writing the configuration back to back and reading the acks after, and
+    calibrating all repeats at once.
+Both leave the DDS to settle for SibProperties.settleSeconds before every repeat and send the same commands, so the
+two run at the same rate: the settle delay and the sweep round trips, not the host side work, set the Tunair
+throughput. The benchmark checks measurePoint has not made it slower.
+The SIB is the sib350sim:// simulator answering every command after a fixed round-trip latency, so the time spent
+waiting on the device, which dominates on hardware, is part of the measurement.
+
+Run from the repository root with:
+    python -m src.resources.scripts.benchmarks.tunair_sweep_benchmark [points] [round trip ms]
+"""
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.app.reader.sib.port_allocator import PortAllocator
+from src.app.reader.sib.sib_utils import createCalibrationFile, normalizeToReference
+from src.app.use_case.tunair.tunair_sib import TunairSib
+from src.resources.sibcontrol.sibcontrol import SIBException
+
+
+def createSimulatedTunairSib(calibrationFile: str, roundTripMs: float) -> TunairSib:
+    port = SimpleNamespace(device=f'sib350sim://?latency_ms={roundTripMs}&profile=tunair', serial_number='simulated')
+    return TunairSib(port, calibrationFile, 1, PortAllocator())
+
+
+def perPointMeasurePoint(sib: TunairSib, freq: float) -> (list, list):
+    """The previous acquisition loop of TunairSib.performRandomSweep for one point."""
+    allFreqVolts, allReferenceVolts = [], []
+    stepSize = abs(freq - sib.referenceFreqMHz)
+    if freq > sib.referenceFreqMHz:
+        startFrequency, stopFrequency, referenceIndex, pointIndex = sib.referenceFreqMHz - stepSize, freq, 1, 2
+    else:
+        startFrequency, stopFrequency, referenceIndex, pointIndex = freq - stepSize, sib.referenceFreqMHz, 2, 1
+    sib.sib.start_MHz, sib.sib.stop_MHz, sib.sib.num_pts = startFrequency, stopFrequency, 3
+    sib.sib.write_start_ftw()
+    sib.sib.write_stop_ftw()
+    sib.sib.write_num_pts()
+    for _ in range(sib.SibProperties.repeatMeasurements):
+        time.sleep(sib.SibProperties.settleSeconds)
+        try:
+            sweepVolts = sib.performSweep()
+            referenceVolts = sib.calibrationPointComparison(sib.referenceFreqMHz, sweepVolts[referenceIndex])
+            pointVolts = sib.calibrationPointComparison(freq, sweepVolts[pointIndex])
+            allReferenceVolts.append(referenceVolts)
+            allFreqVolts.append(normalizeToReference(pointVolts, referenceVolts))
+        except SIBException:
+            pass
+    return allReferenceVolts, allFreqVolts
+
+
+def timePoints(sib: TunairSib, measurePoint, frequencies) -> tuple:
+    commands = sib.sib._comms._ser.simulator.commands
+    commandsBefore = sum(commands.values())
+    start = time.perf_counter()
+    for freq in frequencies:
+        measurePoint(freq)
+    return time.perf_counter() - start, sum(commands.values()) - commandsBefore
+
+
+def runBenchmark(numberOfPoints: int, roundTripMs: float):
+    with tempfile.TemporaryDirectory() as directory:
+        calibrationFile = os.path.join(directory, 'Calibration.csv')
+        calibrationFrequency = np.arange(50, 170, 0.2)
+        createCalibrationFile(calibrationFile, calibrationFrequency, np.full(len(calibrationFrequency), 1.6))
+        sib = createSimulatedTunairSib(calibrationFile, roundTripMs)
+        sib.sib.wake()
+        sib.setReferenceFrequency(140)
+        frequencies = np.round(np.random.default_rng(0).uniform(100, 160, numberOfPoints), 1)
+        repeats = sib.SibProperties.repeatMeasurements
+        print(f"{numberOfPoints} points of {repeats} repeats, {roundTripMs} ms round trip")
+        print(f"{'mode':>10} {'points/s':>9} {'commands':>9} {'seconds':>8}")
+        for name, measurePoint in [
+            ("per-point", lambda freq: perPointMeasurePoint(sib, freq)),
+            ("batched", sib.measurePoint),
+        ]:
+            seconds, commands = timePoints(sib, measurePoint, frequencies)
+            print(f"{name:>10} {numberOfPoints / seconds:>9.2f} {commands:>9} {seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    runBenchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 1.0,
+    )
@@ -0,0 +1,24 @@
+import os
+import sys
+import tkinter.filedialog
+
+try:
+    desktop = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
+except KeyError:
+    desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
+    sys.path = [
+        '/usr/lib/python3.10',
+        '/usr/lib/python3.10/lib-dynload',
+        '/usr/local/lib/python3.10/dist-packages',
+        '/usr/lib/python3/dist-packages',
+        '.',
+        '../../..',
+    ]
+
+from src.app.helper_methods.helper_functions import convertScanSegments
+
+print("Please select the Raw Scans folder of the reader you would like to convert.")
+segmentFolder = tkinter.filedialog.askdirectory()
+outputFolder = f"{segmentFolder}/CSV"
+scans = convertScanSegments(segmentFolder, outputFolder)
+print(f"Finished converting {scans} scans. You can find the scan files in {outputFolder}")
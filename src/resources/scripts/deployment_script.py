@@ -1,4 +1,5 @@
 import argparse
+import hashlib
 import json
 import os
 import shutil
@@ -28,12 +29,23 @@ def zip_files(folder_path, zip_name):
                 zipf.write(file_path, arcname)
 
 
-def s3_upload_file(file_path, file_name, aws_folder_name, tag_str=''):
+def file_sha256(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def s3_upload_file(file_path, file_name, aws_folder_name, tag_str='', metadata=None):
     s3 = boto3.resource('s3')
     b = s3.Bucket('skroot-data')
+    extra_args = {'Tagging': tag_str}
+    if metadata:
+        extra_args['Metadata'] = metadata
     b.upload_file(
         file_path, f'{aws_folder_name}/{file_name}',
-        ExtraArgs={'Tagging': tag_str}
+        ExtraArgs=extra_args
     )
 
 
@@ -95,7 +107,9 @@ def deploy_use_case(use_case: UseCase, skip_overwrite_check=False):
             zip_file_path,
             zip_name,
             software_releases_bucket,
-            tag_str=f'major_version={major_version}&minor_version={minor_version}'
+            tag_str=f'major_version={major_version}&minor_version={minor_version}',
+            # The device checks the downloaded update against it, a multipart upload has no whole-file checksum
+            metadata={'sha256': file_sha256(zip_file_path)}
         )
         print(f" > Uploading Release Notes as '{release_notes_name}' from '{release_notes_temp_fp}'")
         s3_upload_file(
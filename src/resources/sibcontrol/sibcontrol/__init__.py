@@ -1,4 +1,7 @@
+import serial
+
 from .sib350 import SIB350
+from .sweep_buffer import SweepBuffer
 from .sibutils import (
     SIBException,
     SIBConnectionError,
@@ -9,3 +12,7 @@ from .sibutils import (
     SIBDDSConfigError,
     SIBRegulatorsNotReadyError
 )
+
+# Lets serial.serial_for_url open sib350sim:// ports, see simulator.Serial
+if __name__ not in serial.protocol_handler_packages:
+    serial.protocol_handler_packages.append(__name__)
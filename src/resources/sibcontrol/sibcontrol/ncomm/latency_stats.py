@@ -0,0 +1,85 @@
+import collections
+
+
+class LatencyStats:
+    """
+    A class used to collect the round-trip latency of every command,
+    the time from writing a command packet to receiving its
+    acknowledgment packet.
+
+    Attributes
+    ----------
+    max_samples : int
+        The number of most recent samples kept per command.
+
+    Methods
+    -------
+    record(command_name, seconds)
+        Adds one latency sample of the command.
+    summary()
+        Returns the count, mean, median, 99th percentile and maximum
+        latency of every command, in milliseconds.
+    reset()
+        Discards all samples.
+    """
+
+    def __init__(self,
+                 max_samples: int = 1000
+                 ):
+        """
+        Parameters
+        ----------
+        max_samples : int
+            The number of most recent samples kept per command
+            (default is 1000).
+        """
+
+        self.max_samples = max_samples
+        self._samples = dict()
+        self._counts = collections.Counter()
+
+
+    def record(self,
+               command_name: str,
+               seconds: float
+               ):
+        """
+        Adds a latency of SECONDS to the samples of COMMAND_NAME.
+        """
+
+        if command_name not in self._samples:
+            self._samples[command_name] = collections.deque(maxlen=self.max_samples)
+        self._samples[command_name].append(seconds)
+        self._counts[command_name] += 1
+
+
+    def summary(self) -> dict:
+        """
+        Returns the latency of every command that has been acknowledged.
+
+        Returns
+        -------
+        dict[str, dict]
+            For each command name: the total number of acknowledgments
+            (count) and the mean_ms, p50_ms, p99_ms and max_ms of the
+            most recent max_samples latencies.
+        """
+
+        summary = dict()
+        for command_name, samples in self._samples.items():
+            ordered = sorted(samples)
+            summary[command_name] = {'count': self._counts[command_name],
+                                     'mean_ms': 1000 * sum(ordered) / len(ordered),
+                                     'p50_ms': 1000 * ordered[int(0.50 * (len(ordered) - 1))],
+                                     'p99_ms': 1000 * ordered[int(0.99 * (len(ordered) - 1))],
+                                     'max_ms': 1000 * ordered[-1]}
+        return summary
+
+
+    def reset(self):
+        """
+        Discards all samples.
+        """
+
+        self._samples.clear()
+        self._counts.clear()
@@ -1,5 +1,9 @@
+import collections
+import time
+
 import serial
 from .packet import Packet
+from .latency_stats import LatencyStats
 
 
 class NCommException(IOError):
@@ -26,6 +30,13 @@ class NCommUSBCDC:
     ack_packet : Packet
         Packet object to hold the ACK names and the ACK codes
         that are received from the device.
+    inter_byte_timeout : float
+        The number of seconds a read waits for the next byte once
+        the first byte has arrived, or None to wait for the whole
+        read timeout.
+    latency : LatencyStats
+        The round-trip latency of every command, from writing the
+        command packet to reading its first acknowledgment packet.
 
     Methods
     -------
@@ -36,8 +47,12 @@ class NCommUSBCDC:
     write_packet(command_name, data)
         Writes a single command packet to the device with
         data as the payload.
+    write_packets(commands)
+        Writes several command packets to the device in one write.
     read_packet()
         Reads a single acknowledgment packet from the device.
+    read_packets(num_packets)
+        Reads several acknowledgment packets from the device in one read.
     read_data(num_bytes)
         Reads num_bytes of data from the device.
     in_waiting()
@@ -55,7 +70,8 @@ class NCommUSBCDC:
     def __init__(self,
                  com_port: str,
                  read_timeout: float = None,
-                 write_timeout: float = None
+                 write_timeout: float = None,
+                 inter_byte_timeout: float = None
                  ):
         """
         Parameters
@@ -68,13 +84,19 @@ class NCommUSBCDC:
         write_timeout : float
             The number of seconds before a write operation times
             out (default is 10 seconds).
+        inter_byte_timeout : float
+            The number of seconds a read waits between two bytes before
+            it times out (default is None, reads only time out after
+            read_timeout). Lets a bulk read of several acknowledgments
+            fail fast when the device stops answering part way through.
         """
         
         if not isinstance(com_port, str):
             raise TypeError('COM Port must be entered as a string.')
         else:
-            self._ser = serial.Serial()
-            self._ser.port = com_port
+            # serial_for_url returns a serial.Serial for a device name, or the
+            # handler of a URL such as the simulator's sib350sim://
+            self._ser = serial.serial_for_url(com_port, do_not_open=True)
             self.com_port = com_port
 
         # Set the read timeout
@@ -101,12 +123,32 @@ class NCommUSBCDC:
 
         self._ser.timeout = 10          # Read timeout in seconds
         self._ser.write_timeout = 10    # Write timeout in seconds
+        self.inter_byte_timeout = inter_byte_timeout
+
+        # The commands written but not yet acknowledged, with the time they were written
+        self._unacknowledged = collections.deque()
+        self.latency = LatencyStats()
 
         # The Packet object to hold the host-to-device commands.
         self.command_packet = None
 
         # The Packet object to hold the device-to-host commands
         self.ack_packet = None
+
+
+    @property
+    def inter_byte_timeout(self):
+        '''The read timeout between two bytes in seconds, None if disabled.'''
+        return self._ser.inter_byte_timeout
+
+    @inter_byte_timeout.setter
+    def inter_byte_timeout(self, inter_byte_timeout):
+        if inter_byte_timeout is not None:
+            try:
+                inter_byte_timeout = float(inter_byte_timeout)
+            except ValueError:
+                raise ValueError('Inter-byte timeout must be a number.')
+        self._ser.inter_byte_timeout = inter_byte_timeout
     
 
     def connect(self):
@@ -137,6 +179,7 @@ class NCommUSBCDC:
         
         # Only try to open the port if it is not already open
         if not self._ser.is_open:
+            self._unacknowledged.clear()
             try:
                 self._ser.open()
             except serial.SerialException:
@@ -161,6 +204,7 @@ class NCommUSBCDC:
         """
 
         self._ser.close()
+        self._unacknowledged.clear()
 
     
     def write_packet(self,
@@ -191,28 +235,59 @@ class NCommUSBCDC:
         None
         """
 
+        self.write_packets([(command_name, data)])
+
+
+    def write_packets(self,
+                      commands: list
+                      ):
+        """
+        Writes several command packets to the device in a single write,
+        so the device can process them back to back instead of waiting
+        for the host between commands. Each command is acknowledged in
+        order, see read_packets().
+
+        Parameters
+        -----------
+        commands : list[tuple[str, int]]
+            The name and payload of every command to write, in order.
+
+        Raises
+        ------
+        NCommConnectionError
+            If the serial connection is not open. Also raised if the serial.write
+            command fails.
+        NCommTimeout
+            If the write operation times out.
+
+        Returns
+        -------
+        None
+        """
+
         # Ensure that the device is connected
         if not self._ser.is_open:
             raise NCommConnectionError('Device not connected. Cannot write packet.')
-        
-        # Get the packet size
-        command_size, payload_size = self.command_packet.size
-        packet_size = command_size + payload_size
 
-        # Format the payload
-        payload = int(data).to_bytes(payload_size, 'big')
+        # Get the payload size
+        _, payload_size = self.command_packet.size
 
-        # Get the desired command code
-        command_code = self.command_packet.command_from_name(command_name)
+        # Format every packet into one buffer
+        buffer = bytearray()
+        for command_name, data in commands:
+            buffer += self.command_packet.command_from_name(command_name)
+            buffer += int(data).to_bytes(payload_size, 'big')
 
-        # Write packet and check that the correct number of bytes has been written
+        # Write all packets at once
         try:
-            self._ser.write(bytes(command_code + payload))
+            self._ser.write(bytes(buffer))
         except serial.SerialTimeoutException:
             raise NCommTimeout('Write operation timed out.')
         except serial.SerialException as e:
             raise NCommConnectionError('Port appears to be open, but write failed: {}'.format(e))
-        
+
+        written = time.perf_counter()
+        self._unacknowledged.extend((command_name, written) for command_name, _ in commands)
 
 
     def read_packet(self):
@@ -241,32 +316,77 @@ class NCommUSBCDC:
             The payload received from the device.
         """
 
+        return self.read_packets(1)[0]
+
+
+    def read_packets(self,
+                     num_packets: int
+                     ) -> list:
+        """
+        Reads NUM_PACKETS acknowledgment packets from the device in a
+        single read, such as the acknowledgments of the commands written
+        by one write_packets() call. The read timeout applies to the whole
+        read, and the inter-byte timeout between any two bytes of it.
+
+        Parameters
+        ----------
+        num_packets : int
+            The number of acknowledgment packets to read.
+
+        Raises
+        ------
+        NCommConnectionError
+            If serial connection is not open.
+        NCommTimeout
+            If the read operation times out before all packets are received.
+
+        Returns
+        -------
+        list[tuple(ack_msg, rx_payload)]
+
+        ack_msg : str
+            The human readible identifier of the acknowledgment code
+        rx_payload : int
+            The payload received from the device.
+        """
+
         # Ensure that the device is connected
         if not self._ser.is_open:
             raise NCommConnectionError('Device not connected. Cannot read packet.')
-        
+
         # Get the packet size
         command_size, payload_size = self.ack_packet.size
         packet_size = command_size + payload_size
 
-        # Wait for the packet from the device
+        # Wait for all packets from the device
         try:
-            raw_packet = self._ser.read(packet_size)
+            raw_packets = self._ser.read(packet_size * num_packets)
         except serial.SerialException as e:
             raise NCommConnectionError('Port appears to be open but reading packet failed: {}'.format(e))
 
-        # Check for read timeout
-        if len(raw_packet) != packet_size:
+        # Check for read timeout. The unacknowledged commands can no longer be matched to their ACKs.
+        if len(raw_packets) != packet_size * num_packets:
+            self._unacknowledged.clear()
             raise NCommTimeout('Read operation timed out.')
-        
-        # Extract the ACK name from the received ACK code
-        rx_code = raw_packet[:command_size]
-        rx_payload = raw_packet[payload_size:]
 
-        # Get the ACK message
-        ack_msg = self.ack_packet.name_from_command(rx_code)
+        received = time.perf_counter()
+        packets = list()
+        for start in range(0, len(raw_packets), packet_size):
+            # Extract the ACK name from the received ACK code
+            rx_code = raw_packets[start:start + command_size]
+            rx_payload = raw_packets[start + command_size:start + packet_size]
+
+            # Get the ACK message
+            ack_msg = self.ack_packet.name_from_command(rx_code)
+            packets.append((ack_msg, int.from_bytes(rx_payload, 'big')))
+
+            # The first ACK after a command completes its round trip. Commands such as
+            # start_test send more ACKs, which are not matched to any command.
+            if self._unacknowledged:
+                command_name, written = self._unacknowledged.popleft()
+                self.latency.record(command_name, received - written)
 
-        return (ack_msg, int.from_bytes(rx_payload, 'big'))
+        return packets
 
 
     def read_data(self,
@@ -311,6 +431,47 @@ class NCommUSBCDC:
         return rx_data
     
 
+    def read_data_into(self,
+                       buffer: memoryview    # Writable buffer sized to the number of bytes to receive
+                       ) -> int:
+        """
+        Reads data from the device directly into a preallocated buffer.
+        This function should only be called after a SEND_DATA acknowledgment.
+
+        Parameters
+        ----------
+        buffer : memoryview
+            The writable buffer to fill. Exactly len(buffer) bytes are read.
+
+        Raises
+        ------
+        NCommConnectionError
+            If the serial connection is not open.
+        NCommTimeout
+            If the read operation times out.
+
+        Returns
+        -------
+        num_bytes : int
+            The number of bytes received
+        """
+        # Ensure that the device is connected
+        if not self._ser.is_open:
+            raise NCommConnectionError('Device not connected. Cannot read data.')
+
+        # Wait for the specified number of bytes
+        try:
+            num_bytes = self._ser.readinto(buffer)
+        except serial.SerialException as e:
+            raise NCommConnectionError('Port appears to be open but reading data failed: {}'.format(e))
+
+        # Check for read timeout
+        if num_bytes != len(buffer):
+            raise NCommTimeout('Read operation timed out when reading data.')
+
+        return num_bytes
+
+
     def in_waiting(self) -> int:
         """
         Returns the number of bytes waiting in the serial read buffer.
@@ -379,6 +540,7 @@ class NCommUSBCDC:
         """
 
         self._ser.reset_input_buffer()
+        self._unacknowledged.clear()
     
 
     def reset_output_buffer(self):
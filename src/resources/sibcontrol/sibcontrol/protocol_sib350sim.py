@@ -0,0 +1,2 @@
+# pyserial URL handler for sib350sim://, see simulator.Serial
+from .simulator import Serial  # noqa: F401
@@ -1,5 +1,6 @@
 from .ncomm import ncomm as ncomm
 from .dds import AD9910
+from .sweep_buffer import SweepBuffer
 from .sibutils import (
     SIBConnectionError,
     SIBTimeoutError,
@@ -53,6 +54,14 @@ class SIB350:
         Write the amplitude scale factor to the device.
     write_num_pts()
         Writes the number of points to the device.
+    write_commands(commands)
+        Writes several commands to the device in one write and reads all
+        their acknowledgments in one read.
+    write_sweep_config()
+        Writes the start FTW, stop FTW and number of points to the device
+        as one batch of commands.
+    command_latency()
+        Returns the round-trip latency statistics of every command.
     valid_config()
         Checks the configuration data stored in the SIB350 object and
         returns True if it is valid.
@@ -73,17 +82,22 @@ class SIB350:
 
    
     def __init__(self,
-                 com_port: str
+                 com_port: str,
+                 inter_byte_timeout: float = None
                  ):
         """
         Parameters
         ----------
         com_port : str
             The COM port used to connect to the device.
+        inter_byte_timeout : float
+            The number of seconds to wait between two received bytes
+            before a read times out (default is None, reads only time
+            out after the read timeout).
         """
         
         # Initialize the NComm structure
-        self._comms = ncomm.NCommUSBCDC(com_port)
+        self._comms = ncomm.NCommUSBCDC(com_port, inter_byte_timeout=inter_byte_timeout)
         self._comms.command_packet = ncomm.Packet(SIB350.cmd_size, SIB350.payload_size)
         self._comms.command_packet.command_dict = {'send_start_ftw' : b'!C01',
                                     'send_stop_ftw' : b'!C02',
@@ -236,6 +250,35 @@ class SIB350:
             raise SIBTimeoutError('Read operation timed out. Timeout is {}'.format(self._comms._ser.timeout)) from None
         
         return(msg, payload)
+
+
+    def _write_packets(self,
+                       commands: list
+                       ):
+        # Wrapper for the NComm write_packets function with SIB
+        # exceptions.
+
+        try:
+            self._comms.write_packets(commands)
+        except ncomm.NCommConnectionError:
+            raise SIBConnectionError('Problem with connection to port {}. Cannot write packets.'.format(self._comms.com_port))
+        except ncomm.NCommTimeout:
+            raise SIBTimeoutError('Write operation timed out. Timeout is {}'.format(self._comms._ser.write_timeout)) from None
+
+
+    def _read_packets(self,
+                      num_packets: int
+                      ) -> list:
+        # Wrapper for the NComm read_packets function with SIB
+        # exceptions.
+
+        try:
+            return self._comms.read_packets(num_packets)
+        except ncomm.NCommConnectionError:
+            raise SIBConnectionError('Problem with connection to port {}. Cannot read packets.'.format(self._comms.com_port))
+        except ncomm.NCommTimeout:
+            raise SIBTimeoutError('Read operation timed out. Timeout is {}, inter-byte timeout is {}'.format(
+                self._comms._ser.timeout, self._comms.inter_byte_timeout)) from None
     
 
     def _read_data(self, num_bytes):
@@ -262,6 +305,22 @@ class SIB350:
         return data
 
 
+    def _read_data_into(self, sweep_buffer: SweepBuffer, num_bytes: int):
+        '''Wrapper for the NComm read data into function with
+        SIB exceptions. The received bytes are left in the sweep
+        buffer undecoded; SweepBuffer.codes() views them as 12-bit
+        ADC output codes.
+        '''
+
+        try:
+            received = self._comms.read_data_into(sweep_buffer.next_chunk(num_bytes))
+        except ncomm.NCommConnectionError:
+            raise SIBConnectionError('Problem with connection to port {}. Cannot read data.'.format(self._comms.com_port))
+        except ncomm.NCommTimeout:
+            raise SIBTimeoutError('Read data timed out. Timeout is {}'.format(self._comms._ser.timeout)) from None
+        sweep_buffer.commit(received)
+
+
 
 
     '''
@@ -586,6 +645,102 @@ class SIB350:
         return ack_payload
     
 
+    def write_commands(self,
+                       commands: list
+                       ) -> list:
+        """
+        Writes COMMANDS to the device in a single write and then reads
+        all their acknowledgments in a single read, rather than waiting
+        for each acknowledgment before writing the next command. Only
+        for commands that respond with a single OK, such as the DDS
+        configuration commands and the handshake.
+
+        Parameters
+        ----------
+        commands : list[tuple[str, int]]
+            The name and payload of every command to write, in order.
+
+        Raises
+        ------
+        SIBError
+            Host received an unexpected acknowledgment code
+        SIBConnectionError
+            There is a problem with the serial connection. It must be reset.
+        SIBTimeoutError
+            Not all acknowledgments were received before the read timeout
+            or inter-byte timeout.
+
+        Returns
+        -------
+        list[int]
+          The payload the SIB responds with to every command, in order.
+        """
+
+        self._write_packets(commands)
+
+        # Every command must have been acknowledged with OK
+        ack_payloads = list()
+        for ack_msg, ack_payload in self._read_packets(len(commands)):
+            if ack_msg == 'fail':
+                raise SIBError('Unexpected error code received: {}'.format(ack_payload))
+            elif ack_msg != 'ok':
+                raise SIBError('Unexpeced acknowledgment received: {}'.format(ack_msg))
+            ack_payloads.append(ack_payload)
+
+        return ack_payloads
+
+
+    def write_sweep_config(self) -> tuple:
+        """
+        Writes the start FTW, stop FTW and number of points to the device
+        as one batch of commands, see write_commands(). The values that
+        were written to the DDS are then returned.
+
+        Parameters
+        ----------
+        None
+
+        Raises
+        ------
+        ValueError
+            The DDS configuration data is not valid.
+        SIBError
+            Host received an unexpected acknowledgment code
+        SIBConnectionError
+            There is a problem with the serial connection. It must be reset.
+
+        Returns
+        -------
+        tuple[int, int, int]
+          The SIB responds with the start FTW, stop FTW and number of
+          points written to the DDS.
+        """
+
+        if not self.valid_config():
+            raise ValueError('DDS configuration data is not valid.')
+
+        return tuple(self.write_commands([('send_start_ftw', self._start_FTW),
+                                          ('send_stop_ftw', self._stop_FTW),
+                                          ('send_num_pts', self._num_pts)]))
+
+
+    def command_latency(self) -> dict:
+        """
+        Returns the round-trip latency of every command sent through this
+        object: the time from writing the command to reading its first
+        acknowledgment. Commands written in one batch share
+        the time of the bulk read.
+
+        Returns
+        -------
+        dict[str, dict]
+          For each command name, the count, mean_ms, p50_ms, p99_ms and
+          max_ms of its latency.
+        """
+
+        return self._comms.latency.summary()
+
+
     def handshake(self,
                   data: int
                   ) -> int:
@@ -875,6 +1030,69 @@ class SIB350:
             raise SIBError('Unexpected acknowledgment received: {}'.format(ack_msg))
         
         return (ack_msg, data)
+
+
+    def create_sweep_buffer(self) -> SweepBuffer:
+        """
+        Creates a receive buffer sized for the configured sweep, for use
+        with read_sweep_response_into(). The device sends num_pts + 1
+        samples, from the start to the stop frequency included.
+        """
+
+        return SweepBuffer(self._num_pts + 1)
+
+
+    def read_sweep_response_into(self, sweep_buffer: SweepBuffer) -> str:
+        """
+        Same as read_sweep_response(), except that the measurement data of
+        a SEND_DATA acknowledgment is read directly into SWEEP_BUFFER instead
+        of being returned as a list of integers. Once the OK acknowledgment
+        has been received, sweep_buffer.codes() holds the whole sweep.
+
+        Parameters
+        ----------
+        sweep_buffer : SweepBuffer
+            The buffer collecting the sweep, see create_sweep_buffer().
+
+        Raises
+        ------
+        SIBRegulatorsNotReadyError
+            The voltage regulators are not enabled on the SIB.
+        SIBError
+            The number of bytes to receive is not an even number.
+            Host received an unexpected acknowledgment code or error code.
+        SIBConnectionError
+            There is a problem with the serial connection. It must be reset.
+
+        Returns
+        -------
+        ack_msg : str
+            The human readible message received from the device
+        """
+
+        # This command can result in OK, SEND_DATA, or FAIL
+        ack_msg, ack_payload = self._read_packet()
+
+        if ack_msg == 'ok':
+            # Sweep is complete
+            pass
+        elif ack_msg == 'send_data':
+            # The ack_payload contains the number of bytes to receive
+            # which should be an even value
+            if (ack_payload % 2) != 0:
+                raise SIBError('Number of received bytes should be an even value: {}'.format(ack_payload))
+            else:
+                self._read_data_into(sweep_buffer, ack_payload)
+        elif ack_msg == 'fail':
+            # Decode the error code
+            if (self._error_dict.get(ack_payload) == 'regulators_not_ready'):
+                raise SIBRegulatorsNotReadyError
+            else:
+                raise SIBError('Unexpected error code received: {}'.format(ack_payload))
+        else:
+            raise SIBError('Unexpected acknowledgment received: {}'.format(ack_msg))
+
+        return ack_msg
     
 
 
@@ -0,0 +1,314 @@
+import collections
+import math
+import random
+import time
+import urllib.parse
+
+import numpy as np
+from serial.serialutil import SerialBase, PortNotOpenError
+
+
+class ResonanceProfile():
+    """
+    A class used to represent the magnitude a simulated SIB350 measures
+    over frequency: a flat baseline with a Lorentzian dip at the sensor
+    resonance, or a peak for a negative depth, plus measurement noise.
+    The resonance can drift by a fixed amount every sweep to imitate a
+    growing culture.
+
+    Methods
+    -------
+    volts(frequency_MHz, rng)
+        Returns the measured voltage at every frequency of one sweep.
+    """
+
+    def __init__(self,
+                 center_MHz: float = 130.0,
+                 width_MHz: float = 2.0,
+                 depth_V: float = 0.5,
+                 baseline_V: float = 1.5,
+                 noise_V: float = 0.005,
+                 drift_MHz_per_sweep: float = 0.0
+                 ):
+        self.center_MHz = center_MHz
+        self.width_MHz = width_MHz
+        self.depth_V = depth_V
+        self.baseline_V = baseline_V
+        self.noise_V = noise_V
+        self.drift_MHz_per_sweep = drift_MHz_per_sweep
+        self._sweeps = 0
+
+
+    def volts(self,
+              frequency_MHz: np.ndarray,
+              rng: np.random.Generator
+              ) -> np.ndarray:
+        center_MHz = self.center_MHz + self.drift_MHz_per_sweep * self._sweeps
+        self._sweeps += 1
+        dip = self.depth_V / (1 + ((frequency_MHz - center_MHz) / (self.width_MHz / 2)) ** 2)
+        return self.baseline_V - dip + rng.normal(0, self.noise_V, len(frequency_MHz))
+
+
+# Profiles selectable with the profile parameter of a sib350sim:// URL
+PROFILES = {
+    'resonance': lambda: ResonanceProfile(),
+    'flat': lambda: ResonanceProfile(depth_V=0),
+    'peak': lambda: ResonanceProfile(center_MHz=140.0, width_MHz=8.0, depth_V=-0.5),
+    'growth': lambda: ResonanceProfile(drift_MHz_per_sweep=-0.001),
+    'tunair': lambda: ResonanceProfile(center_MHz=140.0, width_MHz=4.0, depth_V=0.3),
+}
+
+
+class SIB350Simulator():
+    """
+    A class used to represent the firmware of a SIB350, answering the
+    NComm command packets the host writes with the acknowledgment
+    packets and measurement data the device would send back.
+
+    Attributes
+    ----------
+    awake : bool
+        The voltage regulators are enabled. Sweeps fail while asleep.
+    num_pts : int
+        The number of points of the configured sweep.
+    commands : collections.Counter
+        The number of packets received per command code.
+
+    Methods
+    -------
+    respond(packet)
+        Returns the bytes the device sends back for one command packet.
+    """
+
+    ok = b'!AA0'
+    send_data = b'!ASD'
+    fail = b'!AFF'
+    invalid_command = 0x21454141
+    dds_config_error = 0x21454242
+    regulators_not_ready = 0x21454341
+
+    def __init__(self,
+                 profile: ResonanceProfile = None,
+                 chunk_bytes: int = 512,
+                 firmware_version: tuple = (1, 2, 0),
+                 seed: int = 0
+                 ):
+        self.profile = ResonanceProfile() if profile is None else profile
+        self.chunk_bytes = chunk_bytes - chunk_bytes % 2
+        self.firmware_version = firmware_version
+        self.rng = np.random.default_rng(seed)
+        self.commands = collections.Counter()
+        self._reset_state()
+
+
+    def _reset_state(self):
+        self.awake = False
+        self.start_ftw = 0
+        self.stop_ftw = 0
+        self.num_pts = 0
+        self.asf = 0
+
+
+    def respond(self,
+                packet: bytes
+                ) -> bytes:
+        """
+        Returns the acknowledgment for PACKET, a 4 byte command code
+        followed by a 4 byte big-endian payload. A start_test command
+        is answered with the whole sweep: SEND_DATA packets each followed
+        by up to chunk_bytes of 12-bit ADC codes, then OK. Like the
+        firmware, a sweep of num_pts points returns num_pts + 1 samples,
+        the last one at the stop frequency.
+        """
+
+        command, payload = bytes(packet[:4]), int.from_bytes(packet[4:8], 'big')
+        self.commands[command] += 1
+        if command == b'!C01':
+            self.start_ftw = payload
+        elif command == b'!C02':
+            self.stop_ftw = payload
+        elif command == b'!C03':
+            self.num_pts = payload
+        elif command == b'!C04':
+            self.asf = payload
+        elif command == b'!C70':
+            payload = int.from_bytes(bytes((0,) + tuple(self.firmware_version)), 'big')
+        elif command == b'!C80':
+            return self._sweep()
+        elif command == b'!C92':
+            self.awake = False
+        elif command == b'!C93':
+            self.awake = True
+        elif command == b'!CRR':
+            self._reset_state()
+        elif command != b'!C91':
+            return self._packet(self.fail, self.invalid_command)
+        return self._packet(self.ok, payload)
+
+
+    def _sweep(self) -> bytes:
+        if not self.awake:
+            return self._packet(self.fail, self.regulators_not_ready)
+        if self.start_ftw >= self.stop_ftw or not 0 < self.num_pts <= self.stop_ftw - self.start_ftw:
+            return self._packet(self.fail, self.dds_config_error)
+        start_MHz, stop_MHz = (ftw / 2**32 * 1000 for ftw in (self.start_ftw, self.stop_ftw))
+        # The firmware measures num_pts steps from the start to the stop frequency, both included
+        frequency_MHz = start_MHz + (stop_MHz - start_MHz) / self.num_pts * np.arange(self.num_pts + 1)
+        volts = self.profile.volts(frequency_MHz, self.rng)
+        codes = np.clip(np.round(volts / 3.3 * 2**10), 0, 2**12 - 1).astype('>u2').tobytes()
+        response = bytearray()
+        for start in range(0, len(codes), self.chunk_bytes):
+            chunk = codes[start:start + self.chunk_bytes]
+            response += self._packet(self.send_data, len(chunk)) + chunk
+        return bytes(response + self._packet(self.ok, 0))
+
+
+    @staticmethod
+    def _packet(code: bytes, payload: int) -> bytes:
+        return code + payload.to_bytes(4, 'big')
+
+
+class Serial(SerialBase):
+    """
+    A pyserial port connected to a SIB350Simulator instead of a device,
+    opened with serial.serial_for_url('sib350sim://?<parameters>'), so
+    the whole SIB350 and NComm stack runs unchanged on top of it.
+
+    Every response becomes readable once the device has answered: after
+    the round-trip latency, plus uniform jitter, plus the time the bytes
+    take at the baud rate, and never before an earlier response. Reads
+    honour the port timeout and inter-byte timeout, so a slow or dropped
+    response raises the same timeout errors as hardware.
+
+    URL parameters
+    --------------
+    latency_ms : float
+        The round-trip latency of every command (default 1).
+    jitter_ms : float
+        The maximum extra latency, drawn uniformly per command (default 0).
+    baud : int
+        The transfer rate of the response bytes at 10 bits per byte, 0 for
+        instant transfers (default 0, USB CDC ignores the baud rate).
+    profile : str
+        The resonance profile, a key of PROFILES (default resonance).
+    chunk_bytes : int
+        The most sweep bytes sent after one SEND_DATA packet (default 512).
+    drop_every : int
+        Never answer every nth command, to simulate timeouts (default 0).
+    seed : int
+        The seed of the measurement noise and jitter (default 0).
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.simulator = SIB350Simulator()
+        self.latency_s = 0.001
+        self.jitter_s = 0.0
+        self.bytes_per_second = 0
+        self.drop_every = 0
+        self._random = random.Random(0)
+        self._incoming = bytearray()
+        self._responses = collections.deque()
+        self._pending = bytearray()
+        self._last_ready = 0.0
+        super().__init__(*args, **kwargs)
+
+
+    def open(self):
+        if self._port is None:
+            raise ValueError('Port must be configured before it can be used.')
+        self.from_url(self._port)
+        self.is_open = True
+        self.reset_input_buffer()
+
+
+    def close(self):
+        self.is_open = False
+
+
+    def from_url(self, url: str):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != 'sib350sim':
+            raise ValueError('Expected a sib350sim:// URL, got {!r}'.format(url))
+        parameters = {name: values[-1] for name, values in urllib.parse.parse_qs(parts.query).items()}
+        seed = int(parameters.get('seed', 0))
+        profile = parameters.get('profile', 'resonance')
+        if profile not in PROFILES:
+            raise ValueError('Unknown resonance profile {!r}, expected one of {}'.format(profile, list(PROFILES)))
+        self.simulator = SIB350Simulator(PROFILES[profile](), int(parameters.get('chunk_bytes', 512)), seed=seed)
+        self.latency_s = float(parameters.get('latency_ms', 1)) / 1000
+        self.jitter_s = float(parameters.get('jitter_ms', 0)) / 1000
+        self.bytes_per_second = int(parameters.get('baud', 0)) / 10
+        self.drop_every = int(parameters.get('drop_every', 0))
+        self._random = random.Random(seed)
+
+
+    def _reconfigure_port(self):
+        pass
+
+
+    @property
+    def in_waiting(self) -> int:
+        self._collect_ready(time.perf_counter())
+        return len(self._pending)
+
+
+    def write(self, data) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        self._incoming += data
+        now = time.perf_counter()
+        while len(self._incoming) >= 8:
+            packet, self._incoming = bytes(self._incoming[:8]), self._incoming[8:]
+            response = self.simulator.respond(packet)
+            if self.drop_every and sum(self.simulator.commands.values()) % self.drop_every == 0:
+                continue
+            ready = max(now + self.latency_s + self._random.uniform(0, self.jitter_s), self._last_ready)
+            if self.bytes_per_second:
+                ready += len(response) / self.bytes_per_second
+            self._last_ready = ready
+            self._responses.append((ready, response))
+        return len(data)
+
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError()
+        now = time.perf_counter()
+        give_up = math.inf if self._timeout is None else now + self._timeout
+        last_byte = now if self._pending else None
+        while len(self._pending) < size:
+            if last_byte is not None and self._inter_byte_timeout is not None:
+                give_up = min(give_up, last_byte + self._inter_byte_timeout)
+            ready = self._responses[0][0] if self._responses else math.inf
+            if ready > give_up:
+                # A real port waits out its timeout for bytes that never come
+                time.sleep(max(0.0, give_up - time.perf_counter()))
+                break
+            if ready == math.inf:
+                break
+            time.sleep(max(0.0, ready - time.perf_counter()))
+            self._collect_ready(ready)
+            last_byte = max(ready, now)
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+    def _collect_ready(self, now: float):
+        while self._responses and self._responses[0][0] <= now:
+            self._pending += self._responses.popleft()[1]
+
+
+    def reset_input_buffer(self):
+        self._collect_ready(time.perf_counter())
+        self._pending.clear()
+
+
+    def reset_output_buffer(self):
+        self._incoming.clear()
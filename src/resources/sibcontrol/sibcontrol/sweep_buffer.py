@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class SweepBuffer():
+    """
+    A class used to collect the ADC output codes of one frequency sweep
+    without copying them into Python integers.
+
+    The receive buffer is a bytearray preallocated for num_pts samples.
+    Every SEND_DATA payload is read straight into the next free slice of
+    it, and the codes are handed out as a big-endian uint16 view of the
+    same memory.
+
+    Attributes
+    ----------
+    num_bytes : int
+        The number of bytes received so far.
+
+    Methods
+    -------
+    next_chunk(num_bytes)
+        Returns a writable memoryview for the next num_bytes bytes.
+    commit(num_bytes)
+        Marks num_bytes bytes of the last chunk as received.
+    codes()
+        Returns the received ADC output codes as a numpy array.
+    """
+
+    sample_size = 2             # Size, in bytes, of one ADC output code
+
+    def __init__(self,
+                 num_pts: int
+                 ):
+        """
+        Parameters
+        ----------
+        num_pts : int
+            The number of points expected in the sweep.
+        """
+
+        self._buffer = bytearray(SweepBuffer.sample_size * max(int(num_pts), 1))
+        self.num_bytes = 0
+
+
+    def next_chunk(self, num_bytes: int) -> memoryview:
+        """
+        Returns a writable view of the next num_bytes bytes of the buffer.
+        The buffer only grows (doubling) if the device sends more samples
+        than num_pts.
+        """
+
+        required = self.num_bytes + num_bytes
+        if required > len(self._buffer):
+            self._buffer.extend(bytes(max(required, 2 * len(self._buffer)) - len(self._buffer)))
+        return memoryview(self._buffer)[self.num_bytes:required]
+
+
+    def commit(self, num_bytes: int):
+        """Marks num_bytes bytes of the last chunk as received."""
+
+        self.num_bytes += num_bytes
+
+
+    def codes(self) -> np.ndarray:
+        """
+        Returns the 12-bit ADC output codes received so far. The array is a
+        big-endian view of the receive buffer, not a copy, so no further
+        chunks can be added while it is alive.
+        """
+
+        return np.frombuffer(self._buffer, dtype='>u2', count=self.num_bytes // SweepBuffer.sample_size)
@@ -21,8 +21,23 @@ class UseCase(Enum):
     RollerBottle = "RollerBottle"
 
 
+USE_CASE_THEMES = {
+    UseCase.WWContinuous:      Theme.WW,
+    UseCase.SkrootContinuous:  Theme.Skroot,
+    UseCase.FlowCell:          Theme.IBI,
+    UseCase.SkrootFlowCell:    Theme.Skroot,
+    UseCase.Tunair:            Theme.IBI,
+    UseCase.RollerBottle:      Theme.Skroot,
+}
+
+DEVICE_CONFIG_PATH = "/etc/skroot/device_config.json"
+
+
 class Version:
     _inMemoryUseCase = None
+    # The use case read from the device config, resolved once per process; see invalidateUseCase.
+    _deviceUseCase = None
+    _deviceUseCaseResolved = False
 
     def __init__(self):
         self.major = 3.0
@@ -30,16 +45,9 @@ class Version:
         self.developmentVersion = DevelopmentVersion.Test
         self.isBeta = True
 
-        self.use_case_themes = {
-            UseCase.WWContinuous:      Theme.WW,
-            UseCase.SkrootContinuous:  Theme.Skroot,
-            UseCase.FlowCell:          Theme.IBI,
-            UseCase.SkrootFlowCell:    Theme.Skroot,
-            UseCase.Tunair:            Theme.IBI,
-            UseCase.RollerBottle:      Theme.Skroot,
-        }
+        self.use_case_themes = USE_CASE_THEMES
 
-        self.deviceConfigPath = "/etc/skroot/device_config.json"
+        self.deviceConfigPath = DEVICE_CONFIG_PATH
         self.useCase = self._resolveUseCase()
         self.theme = self.use_case_themes[self.useCase] if self.useCase else None
 
@@ -47,11 +55,18 @@ class Version:
         """Resolve use case from in-memory override or device_config.json.
         On Windows, only the in-memory override is used so the product selection
         dialog is shown on every launch without persisting to disk.
+        The device config is only read the first time, until invalidateUseCase.
         Returns None if not configured."""
         if Version._inMemoryUseCase is not None:
             return Version._inMemoryUseCase
         if platform.system() == "Windows":
             return None
+        if not Version._deviceUseCaseResolved:
+            Version._deviceUseCase = self._readDeviceUseCase()
+            Version._deviceUseCaseResolved = True
+        return Version._deviceUseCase
+
+    def _readDeviceUseCase(self):
         if not os.path.exists(self.deviceConfigPath):
             return None
         try:
@@ -68,21 +83,28 @@ class Version:
         except (json.JSONDecodeError, KeyError, FileNotFoundError):
             return None
 
+    @staticmethod
+    def invalidateUseCase():
+        """Make the next Version() read the device config again."""
+        Version._deviceUseCaseResolved = False
+
     @staticmethod
     def setInMemoryUseCase(use_case: UseCase):
         """Store the selected use case in memory only (no file write).
         Used on Windows to avoid persisting dev selections to disk."""
         Version._inMemoryUseCase = use_case
+        Version.invalidateUseCase()
 
     @staticmethod
     def setDeviceUseCase(use_case: UseCase):
         """Write the selected use case to the device config file and update Plymouth boot theme."""
         import logging
-        config_path = "/etc/skroot/device_config.json"
+        config_path = DEVICE_CONFIG_PATH
         try:
             os.makedirs(os.path.dirname(config_path), exist_ok=True)
             with open(config_path, 'w') as f:
                 json.dump({"use_case": use_case.value}, f, indent=2)
+            Version.invalidateUseCase()
         except PermissionError:
             logging.exception(
                 f"Permission denied writing to {config_path}. "
@@ -94,15 +116,7 @@ class Version:
             return
 
         # Update Plymouth boot splash to match the selected use case
-        theme_map = {
-            UseCase.WWContinuous:      Theme.WW,
-            UseCase.SkrootContinuous:  Theme.Skroot,
-            UseCase.FlowCell:          Theme.IBI,
-            UseCase.SkrootFlowCell:    Theme.Skroot,
-            UseCase.Tunair:            Theme.IBI,
-            UseCase.RollerBottle:      Theme.Skroot,
-        }
-        theme = theme_map.get(use_case)
+        theme = USE_CASE_THEMES.get(use_case)
         if theme:
             try:
                 import subprocess
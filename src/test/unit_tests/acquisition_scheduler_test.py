@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+
+from src.app.reader.interval_thread.acquisition_scheduler import AcquisitionScheduler
+from src.app.reader.sib.port_allocator import PortAllocator
+
+
+class TestAcquisitionScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.portAllocator = PortAllocator()
+        self.portAllocator.ports = {1: "/dev/ttyACM0", 2: "/dev/ttyACM1"}
+        self.scheduler = AcquisitionScheduler(self.portAllocator)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_runsJobsInDeadlineOrder(self):
+        order, done = [], threading.Event()
+        now = time.monotonic()
+        self.scheduler.scheduleAt(now + 0.06, lambda: (order.append(3), done.set()))
+        self.scheduler.scheduleAt(now + 0.02, lambda: order.append(1))
+        self.scheduler.scheduleAt(now + 0.04, lambda: order.append(2))
+        self.assertTrue(done.wait(2))
+        self.assertEqual([1, 2, 3], order)
+
+    def test_cancelledJobNeverRuns(self):
+        ran, done = [], threading.Event()
+        job = self.scheduler.scheduleAt(time.monotonic() + 0.02, lambda: ran.append(True))
+        self.scheduler.scheduleAt(time.monotonic() + 0.05, done.set)
+        self.assertTrue(self.scheduler.cancel(job))
+        self.assertTrue(done.wait(2))
+        self.assertEqual([], ran)
+        self.assertFalse(self.scheduler.cancel(job))
+
+    def test_slowPortDoesNotDelayOtherPorts(self):
+        releaseSlowPort, fastScanDone = threading.Event(), threading.Event()
+        threads = {}
+        self.scheduler.scheduleScan(time.monotonic(), 1, lambda: releaseSlowPort.wait(2))
+        self.scheduler.scheduleScan(
+            time.monotonic(), 2,
+            lambda: (threads.__setitem__(2, threading.current_thread().name), fastScanDone.set()),
+        )
+        self.assertTrue(fastScanDone.wait(1))
+        self.assertFalse(releaseSlowPort.is_set())
+        self.assertEqual("Port /dev/ttyACM1", threads[2])
+        releaseSlowPort.set()
+        self.scheduler.releaseReader(1)
+        self.scheduler.releaseReader(2)
+        self.assertEqual({}, self.scheduler.portWorkers)
+
+    def test_releaseReaderStopsWorkerAfterPortWasRemoved(self):
+        scanDone = threading.Event()
+        self.scheduler.scheduleScan(time.monotonic(), 1, scanDone.set)
+        self.assertTrue(scanDone.wait(1))
+        worker = self.scheduler.portWorkers["/dev/ttyACM0"]
+        self.portAllocator.removePort(1)
+        self.scheduler.releaseReader(1)
+        worker.thread.join(1)
+        self.assertFalse(worker.thread.is_alive())
+        self.assertNotIn("/dev/ttyACM0", self.scheduler.portWorkers)
+
+    def test_shutdownStopsDispatcherAndWorkers(self):
+        scanDone = threading.Event()
+        self.scheduler.scheduleScan(time.monotonic(), 1, scanDone.set)
+        self.assertTrue(scanDone.wait(1))
+        worker = self.scheduler.portWorkers["/dev/ttyACM0"]
+        self.scheduler.shutdown()
+        self.assertFalse(self.scheduler.dispatcher.is_alive())
+        self.assertFalse(worker.thread.is_alive())
+
+    def test_analysisRunsOnSharedPool(self):
+        future = self.scheduler.submitAnalysis(lambda a, b: (a + b, threading.current_thread().name), 1, 2)
+        result, threadName = future.result(2)
+        self.assertEqual(3, result)
+        self.assertTrue(threadName.startswith("Analysis"))
+
+
+if __name__ == '__main__':
+    unittest.main()
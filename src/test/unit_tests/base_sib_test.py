@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from src.app.reader.sib.base_sib import BaseSib
+from src.app.reader.sib.sib_utils import find_nearest
+
+
+class _CalibratedSib(BaseSib):
+    """A BaseSib with only a calibration, no SIB connection."""
+
+    def __init__(self, calibrationFrequency: np.ndarray, calibrationVolts: np.ndarray):
+        self.calibrationFrequency, self.calibrationVolts = calibrationFrequency, calibrationVolts
+        self.calibrationIndices = {}
+
+    def takeScan(self, directory: str, currentVolts: float):
+        pass
+
+
+class TestBaseSibCalibration(unittest.TestCase):
+
+    def setUp(self):
+        calibrationFrequency = 100 + 0.25 * np.arange(64)
+        self.sib = _CalibratedSib(calibrationFrequency, np.linspace(1.2, 1.8, len(calibrationFrequency)))
+
+    def _perPointCalibration(self, frequency, volts) -> list:
+        return [volt / find_nearest(freq, list(self.sib.calibrationFrequency), self.sib.calibrationVolts)
+                for freq, volt in zip(frequency, volts)]
+
+    def test_calibrationComparisonMatchesPerPointLookup(self):
+        # Includes ties halfway between calibration points and frequencies outside the calibration
+        frequency = np.concatenate([[95.0], 100.125 + 0.25 * np.arange(63), [116.0]])
+        volts = np.random.default_rng(0).uniform(1, 2, len(frequency))
+        np.testing.assert_array_equal(self._perPointCalibration(frequency, volts),
+                                      self.sib.calibrationComparison(frequency, volts))
+        self.assertEqual(self.sib.calibrationPointComparison(95.0, 1.5), 1.5 / self.sib.calibrationVolts[0])
+
+    def test_calibrationComparisonIgnoresSamplesPastTheLastFrequency(self):
+        frequency = 100 + 0.5 * np.arange(20)
+        volts = np.random.default_rng(1).uniform(1, 2, len(frequency) + 1)
+        np.testing.assert_array_equal(self._perPointCalibration(frequency, volts),
+                                      self.sib.calibrationComparison(frequency, volts))
+
+    def test_calibrationIndicesAreCachedPerGridAndEvictedPast16Grids(self):
+        grids = [np.linspace(100 + start, 110 + start, 51) for start in np.arange(17) * 0.1]
+        indices = self.sib.getCalibrationIndices(grids[0])
+        self.assertIs(indices, self.sib.getCalibrationIndices(grids[0]))
+        for grid in grids[1:16]:
+            self.sib.getCalibrationIndices(grid)
+        self.assertEqual(16, len(self.sib.calibrationIndices))
+        self.sib.getCalibrationIndices(grids[16])
+        self.assertEqual(1, len(self.sib.calibrationIndices))
+        recomputed = self.sib.getCalibrationIndices(grids[0])
+        self.assertIsNot(indices, recomputed)
+        np.testing.assert_array_equal(indices, recomputed)
+        volts = np.ones(len(grids[16]))
+        np.testing.assert_array_equal(self._perPointCalibration(grids[16], volts),
+                                      self.sib.calibrationComparison(grids[16], volts))
+
+
+if __name__ == '__main__':
+    unittest.main()
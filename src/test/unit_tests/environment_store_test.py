@@ -0,0 +1,85 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from src.app.helper_methods.environment_store import EnvironmentStore
+
+
+class TestEnvironmentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.location = f"{self.directory.name}/environment"
+        with open(self.location, "w") as environment:
+            environment.write('PATH="/usr/bin"\n# comment\nAUTH_ENABLED="true"\nREFERENCE_FREQUENCY=\'140.5\'\n')
+        EnvironmentStore._instance = None
+        self.store = EnvironmentStore(self.location)
+
+    def tearDown(self):
+        EnvironmentStore._instance = None
+        self.directory.cleanup()
+
+    def test_readsTypedValuesFromMemoryUntilTheFileChanges(self):
+        self.assertTrue(self.store.getBool("AUTH_ENABLED", False))
+        self.assertEqual(140.5, self.store.getFloat("REFERENCE_FREQUENCY", 0.0))
+        self.assertEqual("Hours", self.store.getString("AXIS_UNITS", "Hours"))
+        with mock.patch("builtins.open", side_effect=AssertionError("reparsed")):
+            self.assertEqual("/usr/bin", self.store.getString("PATH", ""))
+
+        with open(self.location, "a") as environment:
+            environment.write('AXIS_UNITS="Minutes"\n')
+        os.utime(self.location, ns=(0, 0))
+        self.assertEqual("Minutes", self.store.getString("AXIS_UNITS", "Hours"))
+
+    def _setValuesAsRoot(self, settings: dict):
+        """ setValues, running its privileged command without sudo. Returns the mock of subprocess.run. """
+        runCommand = subprocess.run
+
+        def runWithoutSudo(command, **kwargs):
+            self.assertEqual("sudo", command[0])
+            return runCommand(command[1:], **kwargs)
+
+        with mock.patch("platform.system", return_value="Linux"), \
+                mock.patch("subprocess.run", side_effect=runWithoutSudo) as run:
+            self.store.setValues(settings)
+        return run
+
+    def test_writesEveryFlagInOnePrivilegedCall(self):
+        run = self._setValuesAsRoot({"AUTH_ENABLED": False, "REFERENCE_FREQUENCY": 120.0, "AXIS_UNITS": "Minutes"})
+        self.assertEqual(1, run.call_count)
+        self.assertFalse(self.store.getBool("AUTH_ENABLED", True))
+        self.assertEqual(120.0, self.store.getFloat("REFERENCE_FREQUENCY", 0.0))
+        self.assertEqual("Minutes", self.store.getString("AXIS_UNITS", "Hours"))
+        with open(self.location) as environment:
+            self.assertEqual('PATH="/usr/bin"\n# comment\nAUTH_ENABLED="false"\nREFERENCE_FREQUENCY="120.0"\n'
+                             'AXIS_UNITS="Minutes"\n', environment.read())
+        self.assertEqual(["environment"], os.listdir(self.directory.name))
+
+    def test_replacesTheFileRatherThanRewritingIt(self):
+        inode = os.stat(self.location).st_ino
+        with open(self.location) as original:
+            self._setValuesAsRoot({"AXIS_UNITS": "Minutes"})
+            # A reader of the old file still sees all of it
+            self.assertEqual('PATH="/usr/bin"\n# comment\nAUTH_ENABLED="true"\nREFERENCE_FREQUENCY=\'140.5\'\n',
+                             original.read())
+        self.assertNotEqual(inode, os.stat(self.location).st_ino)
+
+    def test_failedReplaceKeepsTheFile(self):
+        with mock.patch("platform.system", return_value="Linux"), \
+                mock.patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "sudo")):
+            self.store.setValues({"AXIS_UNITS": "Minutes"})
+        self.assertEqual("/usr/bin", self.store.getString("PATH", ""))
+        self.assertEqual("Hours", self.store.getString("AXIS_UNITS", "Hours"))
+
+    def test_quotesAndBackslashesInValuesRoundTrip(self):
+        self._setValuesAsRoot({"LOT_NAME": 'lot "A" \\ 2'})
+        self.assertEqual('lot "A" \\ 2', self.store.getString("LOT_NAME", ""))
+        self.assertEqual("/usr/bin", self.store.getString("PATH", ""))
+        with open(self.location) as environment:
+            self.assertIn('LOT_NAME="lot \\"A\\" \\\\ 2"\n', environment.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import matplotlib
+import numpy as np
+from matplotlib.image import imread
+
+from src.app.reader.helpers.figure_export_service import FigureExportService
+from src.app.widget.figure import FigureCanvas
+
+matplotlib.use('Agg')
+
+
+def _snapshot(numberOfPoints):
+    figureCanvas = FigureCanvas('SGI', 'Time (hours)', 'SGI')
+    figureCanvas.setView('sgi', (0, 10), (-1, 6))
+    figureCanvas.updateScatter('sgi', np.arange(numberOfPoints) / 12, np.linspace(0, 5, numberOfPoints), 20, 'blue')
+    return figureCanvas.snapshot()
+
+
+class TestFigureExportService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = f"{self.directory.name}/Result Figure.jpg"
+        self.service = FigureExportService()
+        self.service.exportDpi, self.service.finalDpi = 50, 100
+
+    def tearDown(self):
+        self.service.exportSeconds = 600
+        self.directory.cleanup()
+
+    def test_coalescesRequestsUntilTheFinalRender(self):
+        self.service.exportSeconds = 600
+        self.service.requestExport(_snapshot(10), self.filename).result(5)
+        runningShape = imread(self.filename).shape
+        throttled = [self.service.requestExport(_snapshot(numberOfPoints), self.filename) for numberOfPoints in (11, 12)]
+        self.assertFalse(any(future.done() for future in throttled))
+        self.service.requestExport(_snapshot(13), self.filename, final=True).result(5)
+        self.assertTrue(all(future.done() for future in throttled))
+        self.assertAlmostEqual(2, imread(self.filename).shape[0] / runningShape[0], delta=0.05)
+        self.assertEqual(["Result Figure.jpg"], os.listdir(self.directory.name))
+
+    def test_skipsUnchangedFigures(self):
+        self.service.exportSeconds = 0
+        skipped = self.service.getMetrics()["skipped"]
+        snapshot = _snapshot(10)
+        self.service.requestExport(snapshot, self.filename).result(5)
+        self.service.requestExport(_snapshot(10), self.filename).result(5)
+        self.assertEqual(skipped + 1, self.service.getMetrics()["skipped"])
+        self.service.requestExport(_snapshot(11), self.filename).result(5)
+        self.assertEqual(skipped + 1, self.service.getMetrics()["skipped"])
+        self.assertGreater(self.service.getMetrics()["running"]["renders"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
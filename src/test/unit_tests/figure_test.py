@@ -0,0 +1,58 @@
+import unittest
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from src.app.ui_manager.theme.figure_styles import FigureStyles
+from src.app.widget.figure import FigureCanvas
+
+matplotlib.use('Agg')
+
+
+def _createCanvas() -> FigureCanvas:
+    figureCanvas = FigureCanvas('SGI', 'Time (hours)', 'SGI')
+    figureCanvas.attachCanvas(FigureCanvasAgg(figureCanvas.frequencyFigure))
+    return figureCanvas
+
+
+def _plot(figureCanvas: FigureCanvas, x, y):
+    figureCanvas.setView('sgi', (0, 10), (-1, 6))
+    figureCanvas.updateScatter('sgi', x, y, 20, 'blue')
+    figureCanvas.render()
+    return np.asarray(figureCanvas.frequencyCanvas.buffer_rgba()).copy()
+
+
+class TestFigureCanvas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        FigureStyles.applyGenericStyles()
+
+    def test_blittedFramesMatchFullDraws(self):
+        rng = np.random.default_rng(3)
+        x, y = np.arange(120) / 12, rng.normal(2, 1, 120)
+        figureCanvas = _createCanvas()
+        for scan in range(1, len(x)):
+            if scan % 25 == 0:
+                # A relabelled point behind the cached frame forces a redraw from the empty axes.
+                y[scan // 2] += 1
+            y[scan - 3:scan] += 0.1
+            blitted = _plot(figureCanvas, x[:scan], y[:scan])
+            if scan % 10 == 0:
+                np.testing.assert_array_equal(_plot(_createCanvas(), x[:scan], y[:scan]), blitted)
+        self.assertGreater(figureCanvas.series['sgi'].cachedPoints, 100)
+
+    def test_limitChangeRedrawsWithoutRebuildingTheAxes(self):
+        figureCanvas = _createCanvas()
+        _plot(figureCanvas, [1, 2], [1, 2])
+        axes = figureCanvas.currentPlot
+        figureCanvas.setView('sgi', (0, 12), (-1, 6))
+        self.assertIsNone(figureCanvas.frameBackground)
+        self.assertIs(axes, figureCanvas.currentPlot)
+        figureCanvas.setView('signal', (0, 12), (-1, 6))
+        self.assertIsNot(axes, figureCanvas.currentPlot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.app.helper_methods.data_helpers import findMaxGaussian, findMaxLogParabola, fitGaussianStd, gaussian, \
+    findMaxLogParabolas, findPeak
+from src.app.helper_methods.model.peak_fit import PeakFit
+from src.app.reader.analyzer import gaussian_fitting_service
+from src.app.reader.analyzer.gaussian_fitting_service import GaussianFittingService, fitPeak, fitPeakBatches
+
+
+def _makeSweep(centroid, seed=0):
+    """A resonance peak sampled like a 100-160 MHz sweep with a 0.2 MHz step."""
+    frequency = np.arange(100, 160, 0.2)
+    magnitude = gaussian(frequency, 0.8, centroid, 2.1) + np.random.default_rng(seed).normal(0, 0.005, len(frequency))
+    return frequency, magnitude
+
+
+class TestGaussianFittingService(unittest.TestCase):
+
+    def tearDown(self):
+        GaussianFittingService().shutdown()
+        GaussianFittingService().timings.clear()
+
+    def test_coldFitMatchesFindMaxGaussian(self):
+        frequency, magnitude = _makeSweep(131.3)
+        fit = fitPeak(frequency, magnitude, 25)
+        self.assertEqual(PeakFit.GAUSSIAN, fit.method)
+        self.assertFalse(fit.warmStarted)
+        self.assertEqual(findMaxGaussian(frequency, magnitude, 25), fit.getParameters())
+
+    def test_warmStartConvergesToTheSamePeak(self):
+        previousFit = fitPeak(*_makeSweep(131.3, seed=1), 25)
+        frequency, magnitude = _makeSweep(131.1, seed=2)
+        warmFit = fitPeak(frequency, magnitude, 25, previousFit.getParameters())
+        self.assertTrue(warmFit.warmStarted)
+        np.testing.assert_allclose(findMaxGaussian(frequency, magnitude, 25), warmFit.getParameters(), rtol=1e-6)
+
+    def test_logParabolaRecoversNoiselessGaussian(self):
+        frequency = np.arange(100, 160, 0.2)
+        np.testing.assert_allclose(
+            (0.8, 131.3, 2.1),
+            findMaxLogParabola(frequency, gaussian(frequency, 0.8, 131.3, 2.1), 25),
+            rtol=1e-9,
+        )
+
+    def test_fallsBackToLogParabolaWhenIllConditioned(self):
+        frequency, magnitude = _makeSweep(131.3)
+        illConditioned = (np.array([0.8, 131.3, 2.1]), np.full((3, 3), np.inf))
+        with mock.patch.object(gaussian_fitting_service, "fitGaussianPeak", return_value=illConditioned):
+            fit = fitPeak(frequency, magnitude, 25)
+        self.assertEqual(PeakFit.LOG_PARABOLA, fit.method)
+        np.testing.assert_allclose(findMaxLogParabola(frequency, magnitude, 25), fit.getParameters())
+
+    def test_batchedLogParabolaMatchesOneSweepAtATime(self):
+        frequency = np.arange(100, 160, 0.2)
+        magnitudes = np.array([_makeSweep(centroid, seed)[1] for seed, centroid in enumerate([101, 120.5, 131.3, 159])])
+        magnitudes = np.vstack([magnitudes, frequency / 160])
+        amplitudes, centroids, widths = findMaxLogParabolas(frequency, magnitudes, 25)
+        for row in range(4):
+            np.testing.assert_allclose(
+                findMaxLogParabola(frequency, magnitudes[row], 25),
+                (amplitudes[row], centroids[row], widths[row]),
+            )
+        self.assertTrue(np.isnan(centroids[4]))
+        self.assertRaises(ValueError, findMaxLogParabola, frequency, magnitudes[4], 25)
+
+    def test_logParabolaEngineIsSelectable(self):
+        frequency, magnitude = _makeSweep(131.3)
+        fit = fitPeak(frequency, magnitude, 25, None, PeakFit.LOG_PARABOLA)
+        self.assertEqual(PeakFit.LOG_PARABOLA, fit.method)
+        self.assertFalse(fit.fellBack)
+        self.assertEqual(findPeak(frequency, magnitude, 25, PeakFit.LOG_PARABOLA), fit.getParameters())
+        self.assertAlmostEqual(131.3, fit.centroid, delta=0.02)
+
+    def test_poolMatchesInlineFitsAndRecordsTimings(self):
+        requests = [(*_makeSweep(centroid, seed), 25, None) for seed, centroid in enumerate([120.5, 131.3, 145.0])]
+        inlineFits = GaussianFittingService().fitPeaks(requests)
+        GaussianFittingService().start()
+        pooledFits = GaussianFittingService().fitPeaks(requests)
+        self.assertEqual(
+            [fit.getParameters() for fit in inlineFits],
+            [fit.getParameters() for fit in pooledFits],
+        )
+        metrics = GaussianFittingService().getMetrics()["peak"]
+        self.assertEqual(6, metrics["fits"])
+        self.assertEqual(0, metrics["fallbacks"])
+        self.assertGreaterEqual(metrics["meanRoundTripMs"], 0)
+
+    def test_poolIsRebuiltAfterAFittingProcessDies(self):
+        requests = [(*_makeSweep(131.3), 25, None)]
+        GaussianFittingService().start()
+        expected = GaussianFittingService().fitPeaks(requests)
+        brokenPool = GaussianFittingService().pool
+        for process in list(brokenPool._processes.values()):
+            process.kill()
+            process.join()
+        fits = GaussianFittingService().fitPeaks(requests)
+        self.assertIsNot(brokenPool, GaussianFittingService().pool)
+        self.assertEqual([fit.getParameters() for fit in expected], [fit.getParameters() for fit in fits])
+
+    def test_scansWaitingForABusyPoolAreSentAsOneTask(self):
+        service = GaussianFittingService()
+        service.start()
+        requests = [[(*_makeSweep(centroid, seed), 25, None)] for seed, centroid in enumerate(np.linspace(110, 150, 6))]
+        release, batchSizes, fits = threading.Event(), [], {}
+        run = service._run
+
+        def blockFirstTasks(function, batches):
+            batchSizes.append(len(batches))
+            if len(batchSizes) <= 2:
+                release.wait(5)
+            return run(function, batches)
+
+        def fitScan(reader):
+            fits[reader] = service.fitPeaks(requests[reader])
+
+        with mock.patch.object(service, "_run", side_effect=blockFirstTasks):
+            readers = [threading.Thread(target=fitScan, args=(reader,)) for reader in range(6)]
+            for reader in readers[:2]:
+                reader.start()
+            while len(batchSizes) < 2:
+                time.sleep(0.001)
+            for reader in readers[2:]:
+                reader.start()
+            while len(service._waitingFits) < 4:
+                time.sleep(0.001)
+            release.set()
+            for reader in readers:
+                reader.join(30)
+        self.assertEqual([1, 1, 4], batchSizes)
+        for reader in range(6):
+            self.assertEqual([fit.getParameters() for fit in fitPeakBatches([requests[reader]])[0]],
+                             [fit.getParameters() for fit in fits[reader]])
+
+    def test_failedScanDoesNotFailTheScansSentWithIt(self):
+        goodScan, failingScan = [(*_makeSweep(131.3), 25, None)], [(np.empty(0), np.empty(0), 25, None)]
+        goodFits, error = fitPeakBatches([goodScan, failingScan])
+        self.assertAlmostEqual(131.3, goodFits[0].centroid, delta=0.05)
+        self.assertIsInstance(error, ValueError)
+        GaussianFittingService().start()
+        with self.assertRaises(ValueError):
+            GaussianFittingService().fitPeaks(failingScan)
+        self.assertEqual(0, GaussianFittingService()._fitsInFlight)
+
+    def test_harvestFitWarmStart(self):
+        time = np.arange(0, 96, 1 / 12)
+        derivative = gaussian(time, 0.5, 48, 12) + np.random.default_rng(0).normal(0, 0.01, len(time))
+        derivative[::37] = np.nan
+        centroid, std, rSquared, popt = fitGaussianStd(time, derivative)
+        warmCentroid, warmStd, warmRSquared, _ = fitGaussianStd(time, derivative, popt)
+        np.testing.assert_allclose((centroid, std, rSquared), (warmCentroid, warmStd, warmRSquared), rtol=1e-6)
+        self.assertAlmostEqual(48, centroid, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
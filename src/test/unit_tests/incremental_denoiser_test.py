@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+from src.app.helper_methods.model.result_set.incremental_denoiser import IncrementalDenoiser, \
+    calculateDenoiseIndices
+from src.app.helper_methods.model.result_set.result_set import ResultSet
+from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
+
+
+def _makeRun(numberOfPoints, seed=0):
+    """Sigmoidal frequency drop with measurement noise, outliers and failed scans."""
+    rng = np.random.default_rng(seed)
+    time = np.arange(numberOfPoints) * 5 / 60
+    frequency = 130 - 3 / (1 + np.exp(-(time - time[-1] / 2) / 5)) + rng.normal(0, 0.03, numberOfPoints)
+    outliers = rng.choice(numberOfPoints, numberOfPoints // 30, replace=False)
+    frequency[outliers] += rng.normal(0, 1, len(outliers))
+    frequency[rng.choice(numberOfPoints, numberOfPoints // 100, replace=False)] = np.nan
+    return time.tolist(), frequency.tolist()
+
+
+class TestIncrementalDenoiser(unittest.TestCase):
+
+    def test_matchesBatchDbscanOnEveryScan(self):
+        time, frequency = _makeRun(300)
+        denoiser = IncrementalDenoiser()
+        for index in range(len(time)):
+            denoiser.append(time[index], frequency[index])
+            self.assertEqual(
+                calculateDenoiseIndices(time[:index + 1], frequency[:index + 1]),
+                denoiser.getDenoiseIndices(),
+                f"Mismatch after {index + 1} points",
+            )
+
+    def test_matchesBatchDbscanOnLongRun(self):
+        time, frequency = _makeRun(1200, seed=1)
+        denoiser = IncrementalDenoiser()
+        for index in range(len(time)):
+            denoiser.append(time[index], frequency[index])
+            if index % 100 == 0 or index == len(time) - 1:
+                self.assertEqual(
+                    calculateDenoiseIndices(time[:index + 1], frequency[:index + 1]),
+                    denoiser.getDenoiseIndices(),
+                    f"Mismatch after {index + 1} points",
+                )
+        self.assertLess(denoiser.fullRecounts, len(time) / 5)
+
+    def test_parityCheckRecoversFromDivergence(self):
+        time, frequency = _makeRun(60, seed=4)
+        denoiser = IncrementalDenoiser(parityCheck=True)
+        denoiser.rebuild(time[:-1], frequency[:-1])
+        denoiser._core[:] = False
+        denoiser.append(time[-1], frequency[-1])
+        self.assertEqual(denoiser.parityMismatches, 1)
+        self.assertEqual(denoiser.getDenoiseIndices(), calculateDenoiseIndices(time, frequency))
+
+    def test_rebuildMatchesAppending(self):
+        time, frequency = _makeRun(150, seed=2)
+        appended = IncrementalDenoiser()
+        for index in range(len(time)):
+            appended.append(time[index], frequency[index])
+        rebuilt = IncrementalDenoiser()
+        rebuilt.rebuild(time, frequency)
+        self.assertEqual(len(rebuilt), len(time))
+        self.assertEqual(appended.getDenoiseIndices(), rebuilt.getDenoiseIndices())
+
+    def test_resultSetFollowsReplacedHistory(self):
+        """
+        Test that the result set re-seeds its denoisers when the history is assigned directly, as DevAnalyzer does.
+        """
+        time, frequency = _makeRun(120, seed=3)
+        resultSet = ResultSet()
+        resultSet.time = time[:-1]
+        resultSet.maxFrequency = frequency[:-1]
+        resultSet.maxFrequencySmooth = frequency[:-1]
+        dataPoint = ResultSetDataPoint()
+        dataPoint.setTime(time[-1])
+        dataPoint.setMaxFrequency(frequency[-1])
+        dataPoint.setMaxFrequencySmooth(frequency[-1])
+        resultSet.setValues(dataPoint)
+        self.assertEqual(resultSet.denoiseIndices, calculateDenoiseIndices(time, frequency))
+        self.assertEqual(resultSet.denoiseSmoothIndices, calculateDenoiseIndices(time, frequency))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from src.app.helper_methods.datetime_helpers import datetimeToMillis
+from src.app.widget.logger import DuplicateFilter, writeRunLog
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("root", logging.INFO, __file__, 0, message, None, None)
+
+
+def _line(logId: str, time: datetime, message: str) -> str:
+    return f"{logId} - {time.strftime('%Y-%m-%d %H:%M:%S')},000 [INFO] (MainThread) {message}\n"
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.location = f"{self.directory.name}/log.txt"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_duplicateFilterCountsRepeatsAcrossThreads(self):
+        duplicateFilter = DuplicateFilter()
+        duplicateFilter.consecutive_repeats_warning = 10 ** 6
+        passed = []
+
+        def logRepeats():
+            passed.extend(duplicateFilter.filter(_record("scan failed")) for _ in range(10000))
+
+        threads = [threading.Thread(target=logRepeats) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, sum(passed))
+        self.assertEqual(39999, duplicateFilter.consecutive_repeats)
+
+    def test_runLogKeepsTheReaderAndGlobalRecordsOfTheRun(self):
+        runStart = datetime.now().replace(microsecond=0)
+        with open(f"{self.location}.2", "w") as oldest:
+            oldest.write(_line("Reader 1", runStart - timedelta(hours=1), "previous run"))
+        os.utime(f"{self.location}.2", (0, 0))
+        with open(f"{self.location}.1", "w") as rotated:
+            rotated.write(_line("Reader 1", runStart - timedelta(minutes=1), "before the run"))
+            rotated.write(_line("Reader 1", runStart, "started"))
+            rotated.write(_line("Reader 2", runStart, "other reader"))
+        with open(self.location, "w") as current:
+            current.write(_line("Reader 1", runStart + timedelta(minutes=5), "scan failed"))
+            current.write("Traceback (most recent call last):\n  ZeroPointException\n")
+            current.write(_line("aws", runStart + timedelta(minutes=6), "no internet"))
+            current.write(_line("Reader 3", runStart + timedelta(minutes=7), "other reader failed"))
+            current.write("Traceback (most recent call last):\n")
+
+        writeRunLog(self.location, f"{self.directory.name}/run.txt", "Reader 1", datetimeToMillis(runStart))
+        with open(f"{self.directory.name}/run.txt") as runLog:
+            lines = runLog.read().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertTrue(lines[0].endswith("started"))
+        self.assertEqual("  ZeroPointException", lines[3])
+        self.assertTrue(lines[4].endswith("no internet"))
+
+
+if __name__ == '__main__':
+    unittest.main()
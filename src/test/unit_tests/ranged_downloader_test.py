@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+
+from src.app.common_modules.aws.helpers.exceptions import ChecksumMismatchException
+from src.app.common_modules.aws.ranged_downloader import RangedDownloader
+
+
+class _LocalDownloadTransport:
+    """
+    Stand-in for AwsBoto3 as the RangedDownloader transport, serving objects from {folder}/{bucket}/{key}.
+
+    The ETag is the object's modification time and size, and the checksum its SHA-256 unless checksum is set. After
+    failAfterRanges ranges have been served every further request raises ConnectionError, like a dropped connection.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.checksum = None
+        self.failAfterRanges = None
+        self.ranges = []
+        self.lock = threading.Lock()
+
+    def getObjectInfo(self, bucket: str, key: str) -> tuple:
+        objectFile = os.path.join(self.folder, bucket, key)
+        status = os.stat(objectFile)
+        if self.checksum is None:
+            with open(objectFile, "rb") as contents:
+                checksum = hashlib.sha256(contents.read()).hexdigest()
+        else:
+            checksum = self.checksum
+        return status.st_size, f'"{status.st_mtime_ns}-{status.st_size}"', checksum
+
+    def getObjectRange(self, bucket: str, key: str, etag: str, start: int, stop: int) -> bytes:
+        with self.lock:
+            if self.failAfterRanges is not None and len(self.ranges) >= self.failAfterRanges:
+                raise ConnectionError("Offline")
+            self.ranges.append((start, stop))
+        with open(os.path.join(self.folder, bucket, key), "rb") as contents:
+            contents.seek(start)
+            return contents.read(stop - start)
+
+
+class TestRangedDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.folder = self.directory.name
+        os.makedirs(f"{self.folder}/bucket/releases")
+        self.contents = os.urandom(10 * 1024 + 17)
+        with open(f"{self.folder}/bucket/releases/DesktopApp.zip", "wb") as release:
+            release.write(self.contents)
+        self.transport = _LocalDownloadTransport(self.folder)
+        self.localFile = f"{self.folder}/DesktopApp.zip"
+        self.progress = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _downloader(self) -> RangedDownloader:
+        downloader = RangedDownloader(self.transport, lambda *progress: self.progress.append(progress))
+        downloader.chunkBytes = 1024
+        downloader.attempts = 1
+        return downloader
+
+    def test_interruptedDownloadResumes(self):
+        self.transport.failAfterRanges = 4
+        with self.assertRaises(ConnectionError):
+            self._downloader().download("bucket", "releases/DesktopApp.zip", self.localFile)
+        self.assertFalse(os.path.exists(self.localFile))
+        self.assertTrue(os.path.exists(f"{self.localFile}.progress"))
+
+        self.transport.failAfterRanges = None
+        sha256 = self._downloader().download("bucket", "releases/DesktopApp.zip", self.localFile)
+        with open(self.localFile, "rb") as downloaded:
+            self.assertEqual(self.contents, downloaded.read())
+        self.assertEqual(hashlib.sha256(self.contents).hexdigest(), sha256)
+        self.assertEqual(11, len(self.transport.ranges))  # 4 before the interruption and the 7 missing after
+        self.assertFalse(os.path.exists(f"{self.localFile}.progress"))
+        self.assertEqual((len(self.contents), len(self.contents)), self.progress[-1][:2])
+
+    def test_checksumMismatchIsRejected(self):
+        self.transport.checksum = "0" * 64
+        with self.assertRaises(ChecksumMismatchException):
+            self._downloader().download("bucket", "releases/DesktopApp.zip", self.localFile)
+        self.assertEqual([], [name for name in os.listdir(self.folder) if name.startswith("DesktopApp")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.app.reader.interval_thread import reader_thread_manager
+from src.app.reader.interval_thread.acquisition_scheduler import AcquisitionScheduler
+from src.app.reader.interval_thread.reader_thread_manager import ReaderThreadManager
+from src.app.reader.sib.port_allocator import PortAllocator
+
+
+class TestReaderThreadManager(unittest.TestCase):
+
+    def setUp(self):
+        self.portAllocator = PortAllocator()
+        self.portAllocator.ports = {1: "/dev/ttyACM0"}
+        self.scheduler = AcquisitionScheduler(self.portAllocator)
+        reader = mock.MagicMock(readerNumber=1)
+        reader.finishedEquilibrationPeriod = False
+        # Like ReaderPage._resetReader, which closes the SibInterface and so removes the reader's port
+        resetRunFunc = mock.Mock(side_effect=self.portAllocator.removePort)
+        self.manager = ReaderThreadManager(reader, mock.MagicMock(), mock.MagicMock(), resetRunFunc,
+                                           mock.Mock(return_value=False), self.scheduler)
+        self.manager.scanRate = 1
+        patches = [mock.patch.object(reader_thread_manager, "text_notification"),
+                   mock.patch.object(reader_thread_manager, "copyExperimentLog")]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_finishRunStopsThePortWorker(self):
+        scanDone = threading.Event()
+        self.scheduler.scheduleScan(time.monotonic(), 1, scanDone.set)
+        self.assertTrue(scanDone.wait(1))
+        worker = self.scheduler.portWorkers["/dev/ttyACM0"]
+        self.manager.finishRun()
+        worker.thread.join(1)
+        self.assertFalse(worker.thread.is_alive())
+        self.assertEqual({}, self.scheduler.portWorkers)
+        self.assertIsNone(self.portAllocator.getAllocatedPort(1))
+
+    def test_stopReaderLoopDoesNotWaitForScanScheduledDuringStop(self):
+        stopper = threading.Thread(target=self.manager.stopReaderLoop)
+        stopper.start()
+        # The analysis of the scan in flight schedules the next scan while the stop button is being handled
+        self.manager.scheduleNextScan(time.monotonic())
+        stopper.join(2)
+        self.assertFalse(stopper.is_alive())
+        self.assertTrue(self.manager.runFinished.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
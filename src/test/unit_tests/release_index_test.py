@@ -0,0 +1,80 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import botocore.exceptions
+
+from src.app.common_modules.aws.release_index import ReleaseIndex
+
+
+class _Paginator:
+    def __init__(self, objects: dict):
+        self.objects = objects
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        for start in range(0, len(keys), 1000):
+            yield {'Contents': [{'Key': key, 'ETag': self.objects[key][0]} for key in keys[start:start + 1000]]}
+
+
+class _S3:
+    """ A bucket of {key: (etag, tags)}, counting the tagging requests. """
+
+    def __init__(self, objects: dict):
+        self.objects = objects
+        self.taggingRequests = 0
+        self.lock = threading.Lock()
+
+    def get_paginator(self, operation):
+        return _Paginator(self.objects)
+
+    def get_object_tagging(self, Bucket, Key):
+        with self.lock:
+            self.taggingRequests += 1
+        tags = self.objects[Key][1]
+        if tags is None:
+            raise botocore.exceptions.ClientError({'Error': {'Code': 'AccessDenied'}}, 'GetObjectTagging')
+        return {'TagSet': [{'Key': key, 'Value': value} for key, value in tags.items()]}
+
+
+def _release(etag: str, major: str, minor: str):
+    return etag, {'major_version': major, 'minor_version': minor}
+
+
+class TestReleaseIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cacheFile = f"{self.directory.name}/Release Index.json"
+        self.objects = {
+            f"software-releases/reader/v1.{minor}.zip": _release("a", "1.0", str(minor)) for minor in range(1500)
+        }
+        self.objects["software-releases/reader/"] = ("folder", {})
+        self.objects["software-releases/reader/rnd.zip"] = ("r", None)
+        self.s3 = _S3(self.objects)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _index(self) -> ReleaseIndex:
+        return ReleaseIndex(self.s3, 'skroot-data', 'software-releases/reader', self.cacheFile)
+
+    def test_onlyChangedReleasesAreRead(self):
+        releases = self._index().refresh()
+        self.assertEqual(1500, len(releases))
+        self.assertEqual((1.0, 1499), releases["software-releases/reader/v1.1499.zip"])
+        self.assertEqual(1501, self.s3.taggingRequests)
+
+        self.objects["software-releases/reader/v1.3.zip"] = _release("b", "2.0", "0")
+        del self.objects["software-releases/reader/v1.4.zip"]
+        self.s3.taggingRequests = 0
+        releases = self._index().refresh()
+        self.assertEqual(1499, len(releases))
+        self.assertEqual((2.0, 0), releases["software-releases/reader/v1.3.zip"])
+        self.assertEqual(2, self.s3.taggingRequests)  # the changed release and the unreadable R&D release
+        self.assertTrue(os.path.exists(self.cacheFile))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+from scipy.signal import savgol_filter
+
+from src.app.helper_methods.data_helpers import frequencyToIndex
+from src.app.helper_methods.model.result_set.column import Column, MaskedColumns
+from src.app.helper_methods.model.result_set.incremental_denoiser import calculateDenoiseIndices
+from src.app.helper_methods.model.result_set.result_set import ResultSet
+from src.app.helper_methods.model.result_set.result_set_data_point import ResultSetDataPoint
+from src.app.helper_methods.model.result_set.running_sum import RunningSum
+from src.test.unit_tests.incremental_denoiser_test import _makeRun
+
+
+def _dataPoint(time, frequency, index):
+    dataPoint = ResultSetDataPoint()
+    dataPoint.setTime(time)
+    dataPoint.setMaxFrequency(frequency)
+    dataPoint.setMaxFrequencySmooth(frequency)
+    dataPoint.setFilename(f"{index}.csv")
+    dataPoint.setTimestamp(1700000000000 + index * 300000)
+    dataPoint.setDerivative(0.01 * index)
+    return dataPoint
+
+
+class TestResultSet(unittest.TestCase):
+
+    def test_denoisedViewsMatchListFiltering(self):
+        time, frequency = _makeRun(150, seed=5)
+        resultSet = ResultSet()
+        for index in range(len(time)):
+            resultSet.setValues(_dataPoint(time[index], frequency[index], index))
+            if index % 10 == 0 or index == len(time) - 1:
+                indices = calculateDenoiseIndices(time[:index + 1], frequency[:index + 1])
+                self.assertEqual(resultSet.denoiseIndices, indices)
+                self.assertEqual(resultSet.getDenoiseTime().tolist(), [time[i] for i in indices])
+                np.testing.assert_array_equal(resultSet.getDenoiseFrequencySmooth(), [frequency[i] for i in indices])
+                self.assertEqual(resultSet.getDenoiseFilenames().tolist(), [f"{i}.csv" for i in indices])
+                self.assertEqual(resultSet.getDenoiseSmoothTimestamps().tolist(),
+                                 [1700000000000 + i * 300000 for i in indices])
+        self.assertEqual(len(resultSet.getDerivativeMean()), len(time))
+
+    def test_derivativeMeanMatchesWindowedNanmeanAndSavgol(self):
+        rng = np.random.default_rng(7)
+        derivatives = np.r_[np.full(96, np.nan), rng.normal(0.1, 0.02, 360)]
+        derivatives[rng.choice(np.arange(96, len(derivatives)), 30, replace=False)] = np.nan
+        resultSet = ResultSet()
+        for index, derivative in enumerate(derivatives):
+            dataPoint = _dataPoint(index / 12, 130.0, index)
+            dataPoint.setDerivative(derivative)
+            resultSet.setValues(dataPoint)
+        expectedMean = [np.nan] * 96 + [np.nanmean(derivatives[:index + 1][-96:]) for index in range(96, len(derivatives))]
+        np.testing.assert_allclose(resultSet.derivativeMean.values(), expectedMean, rtol=1e-12)
+        # savgol_filter itself raises on the leading NaNs, so compare where its windows are NaN free.
+        expectedSmooth = savgol_filter(np.array(expectedMean)[96:], 151, 2)
+        np.testing.assert_allclose(resultSet.getDerivativeMean()[96 + 75:], expectedSmooth[75:], rtol=1e-9)
+        self.assertTrue(np.isnan(resultSet.getDerivativeMean()[:96 + 75]).all())
+
+    def test_runningSumIsAddedUpAgainEveryWindowUpdates(self):
+        runningSum, window = RunningSum(3), [1e16, 1.0, np.nan]
+        for value in window:
+            runningSum.add(value)
+        for value in [1.0, 1.0]:
+            runningSum.remove(window.pop(0))
+            window.append(value)
+            runningSum.add(value)
+            runningSum.updated(window)
+        self.assertEqual((1.0, 2), (runningSum.total, runningSum.count))  # the 1.0 added to 1e16 was rounded away
+        runningSum.remove(window.pop(0))
+        window.append(2.0)
+        runningSum.add(2.0)
+        runningSum.updated(window)
+        self.assertEqual((4.0, 3), (runningSum.total, runningSum.count))
+        self.assertEqual(4 / 3, runningSum.mean())
+
+    def test_assignedHistoryKeepsListBehaviour(self):
+        """
+        Test that assigning lists and indices directly, as DevAnalyzer does, and appending to the attributes, as the
+        post processing scripts do, still work.
+        """
+        resultSet = ResultSet()
+        resultSet.time = [0.0, 1.0, 2.0, 3.0]
+        resultSet.maxFrequency = [130.0, 129.0, np.nan, 128.0]
+        resultSet.timestamps = [10, 20, 30, 40]
+        resultSet.filenames = ["a", "b", "c", "d"]
+        resultSet.denoiseIndices = [0, 1, 3]
+        self.assertEqual(resultSet.getDenoiseTime().tolist(), [0.0, 1.0, 3.0])
+        self.assertEqual(resultSet.getDenoiseTimestamps().tolist(), [10, 20, 40])
+        resultSet.time.append(np.nan)
+        self.assertEqual(len(resultSet.getTime()), 5)
+        resultSet.time = [5.0, 6.0, 7.0, 8.0]
+        self.assertEqual(resultSet.getDenoiseTime().tolist(), [5.0, 6.0, 8.0])
+
+    def test_resetRunKeepsLastPoint(self):
+        time, frequency = _makeRun(40, seed=6)
+        resultSet = ResultSet()
+        for index in range(len(time)):
+            resultSet.setValues(_dataPoint(time[index], frequency[index], index))
+        resultSet.resetRun()
+        self.assertEqual(resultSet.getTime().tolist(), [time[-1]])
+        self.assertEqual(resultSet.getDenoiseTime().tolist(), [time[-1]])
+        resultSet.setValues(_dataPoint(time[-1] + 0.1, frequency[-1], len(time)))
+        self.assertEqual(len(resultSet.getTime()), 2)
+
+    def test_maskedColumnsUpdateFromChangedIndex(self):
+        values = Column()
+        values.extend(np.arange(10.0))
+        mask = Column(bool)
+        mask.extend(np.arange(10) % 2 == 0)
+        masked = MaskedColumns(mask, {"values": values})
+        masked.update(0)
+        mask.values()[7] = True
+        mask.values()[8] = False
+        masked.update(7)
+        self.assertEqual(masked.get("values").tolist(), [0.0, 2.0, 4.0, 6.0, 7.0])
+
+    def test_frequencyToIndexMatchesScalarFormula(self):
+        frequencies = [130.0, 131.0, 129.5, np.nan, 125.0]
+        expected = [max(0, 100 * (1 - value / 130.0)) for value in frequencies]
+        np.testing.assert_allclose(frequencyToIndex(130.0, frequencies), expected)
+
+    def test_sgiIsMemoizedPerZeroPointAndRevision(self):
+        time, frequency = _makeRun(60, seed=8)
+        resultSet = ResultSet()
+        for index in range(len(time)):
+            resultSet.setValues(_dataPoint(time[index], frequency[index], index))
+        sgi = resultSet.getDenoiseSgiSmooth(130.0)
+        self.assertIs(sgi, resultSet.getDenoiseSgiSmooth(130.0))
+        self.assertFalse(sgi.flags.writeable)
+        np.testing.assert_array_equal(sgi, frequencyToIndex(130.0, resultSet.getDenoiseFrequencySmooth()))
+        self.assertIsNot(sgi, resultSet.getDenoiseSgiSmooth(129.0))
+        resultSet.setValues(_dataPoint(time[-1] + 0.1, 128.0, len(time)))
+        np.testing.assert_array_equal(
+            resultSet.getDenoiseSgiSmooth(130.0),
+            frequencyToIndex(130.0, resultSet.getDenoiseFrequencySmooth()),
+        )
+        np.testing.assert_array_equal(resultSet.getSgi(130.0), frequencyToIndex(130.0, resultSet.getMaxFrequency()))
+
+    def test_sgiIsReusedUntilColumnRevisionChanges(self):
+        resultSet = ResultSet()
+        for index in range(10):
+            resultSet.setValues(_dataPoint(index / 12, 130.0 - index / 10, index))
+        sgi = resultSet.getSgi(130.0)
+        revision = resultSet._maxFrequency.revision
+        self.assertIs(sgi, resultSet.getSgi(130.0))
+        self.assertFalse(sgi.flags.writeable)
+        with self.assertRaises(ValueError):
+            sgi[0] = 1.0
+        resultSet.setValues(_dataPoint(10 / 12, 128.0, 10))
+        self.assertNotEqual(revision, resultSet._maxFrequency.revision)
+        updatedSgi = resultSet.getSgi(130.0)
+        self.assertIsNot(sgi, updatedSgi)
+        self.assertEqual(11, len(updatedSgi))
+        self.assertIs(updatedSgi, resultSet.getSgi(130.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from src.app.reader.analyzer.rolling_derivative import RollingDerivative
+
+
+def _interquartileDerivative(time, sgi, window):
+    """The list based estimate Analyzer.calculateDerivativeValues made before the rolling estimator."""
+    if len(time) <= window:
+        return np.nan
+    timeChanges = np.diff(time[-window:]).tolist()
+    sgiChanges = np.diff(sgi[-window:]).tolist()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        quartile1 = np.nanquantile(sgiChanges, 0.25)
+        quartile3 = np.nanquantile(sgiChanges, 0.75)
+        return np.nanmean([change for change in sgiChanges if quartile1 < change < quartile3]) / np.nanmean(timeChanges)
+
+
+class TestRollingDerivative(unittest.TestCase):
+
+    def test_matchesListEstimateAsTheSeriesGrowsAndChanges(self):
+        rng = np.random.default_rng(3)
+        time = np.arange(500) / 12
+        sgi = np.round(np.cumsum(rng.normal(0.1, 0.05, len(time))), 3)
+        sgi[rng.choice(len(time), 25, replace=False)] = np.nan
+        estimator = RollingDerivative(96)
+        for length in range(1, len(time) + 1):
+            sgiSoFar = sgi[:length] * (1.02 if length % 89 == 0 else 1)
+            expected = _interquartileDerivative(time[:length], sgiSoFar, 96)
+            actual = estimator.update(time[:length], sgiSoFar)
+            if np.isnan(expected):
+                self.assertTrue(np.isnan(actual), length)
+            else:
+                self.assertAlmostEqual(expected, actual, delta=abs(expected) * 1e-12, msg=length)
+
+    def test_nanWhenThereIsNoInterquartileChange(self):
+        estimator = RollingDerivative(4)
+        self.assertTrue(np.isnan(estimator.update(np.arange(6.0), np.full(6, np.nan))))
+        self.assertTrue(np.isnan(estimator.update(np.arange(7.0), 2 * np.arange(7.0))))
+        self.assertTrue(np.isnan(estimator.update(np.arange(3.0), 2 * np.arange(3.0))))
+
+
+if __name__ == '__main__':
+    unittest.main()
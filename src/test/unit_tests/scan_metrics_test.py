@@ -0,0 +1,56 @@
+import csv
+import tempfile
+import threading
+import time
+import unittest
+
+from src.app.reader.helpers.scan_metrics import ScanMetrics, STAGES
+from src.app.reader.helpers.scan_timer import ScanTimer, timedSpan, timedStage
+
+
+@timedStage("sweepTransfer")
+def _transfer():
+    time.sleep(0.01)
+
+
+class TestScanMetrics(unittest.TestCase):
+
+    def test_stagesAreTimedOnEveryThreadTheTimerIsActiveOn(self):
+        timer = ScanTimer()
+        with timedSpan("sibWake"):
+            pass  # no active timer, nothing recorded
+        with timer.active():
+            _transfer()
+            _transfer()
+
+        def analyze():
+            with timer.active(), timedSpan("peakFit"):
+                time.sleep(0.01)
+
+        analysis = threading.Thread(target=analyze)
+        analysis.start()
+        analysis.join()
+        _transfer()
+        self.assertEqual({"sweepTransfer", "peakFit"}, set(timer.stages))
+        self.assertGreaterEqual(timer.stages["sweepTransfer"], 0.02)
+        self.assertIsNone(ScanTimer.current())
+
+    def test_timingsAreWrittenAndSummarized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = ScanMetrics(f"{directory}/Scan Timings.csv")
+            for scan in range(10):
+                timer = ScanTimer()
+                timer.record("peakFit", scan / 10)
+                metrics.record(scan, timer)
+            with open(f"{directory}/Scan Timings.csv") as timingsFile:
+                rows = list(csv.reader(timingsFile))
+        self.assertEqual(["Scan Date"] + STAGES, rows[0])
+        self.assertEqual(11, len(rows))
+        self.assertEqual("0.9000", rows[-1][STAGES.index("peakFit") + 1])
+        percentiles = metrics.getPercentiles()
+        self.assertAlmostEqual(0.45, percentiles["peakFit"][50])
+        self.assertAlmostEqual(0.0, percentiles["harvest"][90])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.app.helper_methods.file_manager.scan_segment_writer import ScanSegmentWriter
+from src.app.helper_methods.helper_functions import convertScanSegments, createScanFile
+from src.app.helper_methods.model.sweep_data import SweepData
+from src.app.helper_methods.scan_segment import decodeScanSegment, encodeScanSegment, PACKED_12_BIT
+
+
+def _sweeps(count: int, points: int = 600):
+    frequency = np.linspace(40, 120, points)
+    for scan in range(count):
+        center = 80 - scan * 0.05
+        yield 1_700_000_000_000 + scan * 300_000, SweepData(frequency, 1.2 + 0.3 * np.exp(-(frequency - center) ** 2 / 8))
+
+
+def _readCsv(filename: str):
+    with open(filename) as scanFile:
+        rows = list(csv.reader(scanFile))
+    return rows[0], np.array(rows[1:], dtype=float)
+
+
+class TestScanSegment(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.folder = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encodingsRoundTrip(self):
+        frequency = np.linspace(40, 120, 7)
+        magnitudes = np.array([[1.0, 1.1, np.nan, 1.3, 1.4, 1.5, 1.6], [2.0, 1.9, 1.8, 1.7, 1.6, 1.5, 1.45]])
+        for encoding, tolerance in [("float32", 1e-6), (PACKED_12_BIT, 1.0 / 4094)]:
+            decodedFrequency, timestamps, decoded = decodeScanSegment(
+                encodeScanSegment(frequency, [1, 2], magnitudes, encoding))
+            np.testing.assert_array_equal(frequency, decodedFrequency)
+            np.testing.assert_array_equal([1, 2], timestamps)
+            np.testing.assert_allclose(magnitudes, decoded, atol=tolerance, equal_nan=True)
+
+    def test_writerRollsSegmentsAndConvertsBackToScanFiles(self):
+        writer = ScanSegmentWriter(f"{self.folder}/Raw Scans")
+        writer.scansPerSegment = 4
+        csvBytes = 0
+        for timestamp, sweepData in _sweeps(10):
+            writer.append(timestamp, sweepData)
+            createScanFile(f"{self.folder}/{timestamp}.csv", sweepData)
+            csvBytes += os.path.getsize(f"{self.folder}/{timestamp}.csv")
+        segments = sorted(os.listdir(f"{self.folder}/Raw Scans"))
+        self.assertEqual(3, len(segments))
+        segmentBytes = sum(os.path.getsize(f"{self.folder}/Raw Scans/{segment}") for segment in segments)
+        self.assertLess(segmentBytes * 4, csvBytes)
+
+        self.assertEqual(10, convertScanSegments(f"{self.folder}/Raw Scans", f"{self.folder}/Converted"))
+        for timestamp, _ in _sweeps(10):
+            header, original = _readCsv(f"{self.folder}/{timestamp}.csv")
+            convertedHeader, converted = _readCsv(f"{self.folder}/Converted/{timestamp}.csv")
+            self.assertEqual(header, convertedHeader)
+            np.testing.assert_allclose(original, converted, rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
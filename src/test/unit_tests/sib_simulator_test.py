@@ -0,0 +1,71 @@
+import time
+import unittest
+
+import numpy as np
+
+from src.resources.sibcontrol.sibcontrol import SIB350, SIBRegulatorsNotReadyError, SIBTimeoutError
+
+
+def _openSimulatedSib(parameters: str = "latency_ms=0") -> SIB350:
+    sib = SIB350(f"sib350sim://?{parameters}")
+    sib.open()
+    return sib
+
+
+def _sweep(sib: SIB350) -> np.ndarray:
+    sib.write_sweep_command()
+    sweepBuffer = sib.create_sweep_buffer()
+    while sib.read_sweep_response_into(sweepBuffer) != 'ok':
+        pass
+    return sweepBuffer.codes() * 3.3 / 2 ** 10
+
+
+class TestSibSimulator(unittest.TestCase):
+
+    def test_sweepsTheResonanceThroughTheWholeProtocolStack(self):
+        sib = _openSimulatedSib("latency_ms=0&chunk_bytes=64")
+        self.assertEqual(500332, sib.handshake(500332))
+        self.assertEqual("1.2.0", sib.version())
+        sib.wake()
+        sib.start_MHz, sib.stop_MHz, sib.num_pts = 120, 140, 200
+        sib.write_sweep_config()
+        volts = _sweep(sib)
+        self.assertEqual(201, len(volts))
+        self.assertAlmostEqual(130, 120 + 0.1 * np.argmin(volts), delta=0.5)
+        self.assertEqual(1, sib._comms._ser.simulator.commands[b'!C80'])
+
+    def test_sweepFailsWhileAsleep(self):
+        sib = _openSimulatedSib()
+        sib.start_MHz, sib.stop_MHz, sib.num_pts = 120, 140, 200
+        sib.write_sweep_config()
+        with self.assertRaises(SIBRegulatorsNotReadyError):
+            _sweep(sib)
+
+    def test_droppedResponseTimesOut(self):
+        sib = _openSimulatedSib("latency_ms=0&drop_every=2")
+        sib._comms._ser.timeout = 0.05
+        sib.handshake(1)
+        with self.assertRaises(SIBTimeoutError):
+            sib.handshake(2)
+
+    def test_batchedCommandsAreWrittenAndAcknowledgedTogether(self):
+        sib = _openSimulatedSib()
+        sib.start_MHz, sib.stop_MHz, sib.num_pts = 120, 140, 200
+        self.assertEqual([7, 200], sib.write_commands([('handshake', 7), ('send_num_pts', 200)]))
+        self.assertEqual(200, sib.write_sweep_config()[2])
+        latency = sib.command_latency()
+        self.assertEqual(1, latency['handshake']['count'])
+        self.assertEqual(2, latency['send_num_pts']['count'])
+        self.assertEqual(1, latency['send_start_ftw']['count'])
+
+    def test_interByteTimeoutEndsBatchedReadEarly(self):
+        sib = SIB350("sib350sim://?latency_ms=0&drop_every=2", inter_byte_timeout=0.02)
+        sib.open()
+        start = time.perf_counter()
+        with self.assertRaises(SIBTimeoutError):
+            sib.write_commands([('handshake', 1), ('handshake', 2)])
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from src.app.reader.sib.sib_utils import findNearestIndices, find_nearest
+
+# A grid of exactly representable frequencies, so the midpoints between calibration points are exact ties
+CALIBRATION_FREQUENCY = 100 + 0.25 * np.arange(64)
+
+
+class TestFindNearestIndices(unittest.TestCase):
+
+    def _assertMatchesFindNearest(self, frequencies):
+        indices = np.arange(len(CALIBRATION_FREQUENCY))
+        expected = [find_nearest(frequency, list(CALIBRATION_FREQUENCY), indices) for frequency in frequencies]
+        np.testing.assert_array_equal(expected, findNearestIndices(frequencies, CALIBRATION_FREQUENCY))
+
+    def test_matchesFindNearestOnASweepGrid(self):
+        self._assertMatchesFindNearest(np.arange(100, 115.75, 0.2))
+
+    def test_tiesHalfwayBetweenPointsUseTheLowerPoint(self):
+        midpoints = CALIBRATION_FREQUENCY[:-1] + 0.125
+        self._assertMatchesFindNearest(midpoints)
+        np.testing.assert_array_equal(np.arange(63), findNearestIndices(midpoints, CALIBRATION_FREQUENCY))
+
+    def test_exactCalibrationFrequenciesMapToThemselves(self):
+        self._assertMatchesFindNearest(CALIBRATION_FREQUENCY)
+
+    def test_outOfRangeFrequenciesClampToTheEnds(self):
+        self._assertMatchesFindNearest([50.0, 99.99, 115.76, 170.0])
+        np.testing.assert_array_equal([0, 0, 63, 63],
+                                      findNearestIndices([50.0, 99.99, 115.76, 170.0], CALIBRATION_FREQUENCY))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.app.helper_methods.custom_exceptions.sib_exception import SIBReconnectException
+from src.app.reader.sib.port_allocator import PortAllocator
+from src.app.reader.sib.sib_utils import calculateFrequencyValues, createCalibrationFile
+from src.app.use_case.continuous.continuous_sib import ContinuousSib
+from src.app.use_case.roller_bottle.roller_bottle_sib import RollerBottleSib
+from src.resources.version.version import Version, UseCase
+
+
+class _SimulatedPortAllocator(PortAllocator):
+    """Hands the reader the same simulated port every time, so resetSibConnection reopens the simulator."""
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+
+    def getPortForReader(self, readerNumber):
+        self.ports[readerNumber] = self.url
+        return SimpleNamespace(device=self.url, serial_number='simulated')
+
+
+class TestSimulatedSib(unittest.TestCase):
+    """Runs the SIB use cases unchanged over BaseSib, SIB350 and NComm on the sib350sim:// simulator."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.calibrationFile = os.path.join(self.directory.name, 'Calibration.csv')
+        calibrationFrequency = np.arange(50, 170, 0.2)
+        createCalibrationFile(self.calibrationFile, calibrationFrequency, np.full(len(calibrationFrequency), 1.5))
+
+    def tearDown(self):
+        self.directory.cleanup()
+        Version._inMemoryUseCase = None
+        Version.invalidateUseCase()
+
+    def _createSib(self, useCase: UseCase, sibClass, profile: str):
+        Version.setInMemoryUseCase(useCase)
+        portAllocator = _SimulatedPortAllocator(f'sib350sim://?latency_ms=0&profile={profile}')
+        sib = sibClass(portAllocator.getPortForReader(1), self.calibrationFile, 1, portAllocator)
+        sib.setStartFrequency(sib.SibProperties.startFrequency)
+        sib.setStopFrequency(sib.SibProperties.stopFrequency)
+        return sib
+
+    def test_performSweepReturnsOneSamplePerHostFrequency(self):
+        sib = self._createSib(UseCase.WWContinuous, ContinuousSib, 'resonance')
+        sib.sib.wake()
+        sib.checkAndSendConfiguration()
+        volts = sib.performSweep()
+        self.assertEqual(len(calculateFrequencyValues(sib.startFreqMHz, sib.stopFreqMHz, sib.stepSize)), len(volts))
+        self.assertAlmostEqual(1.5, float(np.median(volts)), delta=0.01)
+
+    def test_takeScanCalibratesTheResonanceAndSleeps(self):
+        sib = self._createSib(UseCase.WWContinuous, ContinuousSib, 'resonance')
+        sweepData = sib.takeScan(self.directory.name, np.nan)
+        self.assertEqual(len(sweepData.frequency), len(sweepData.magnitude))
+        self.assertAlmostEqual(sib.SibProperties.startFrequency, sweepData.frequency[0])
+        self.assertAlmostEqual(130, sweepData.frequency[np.argmin(sweepData.magnitude)], delta=0.5)
+        self.assertAlmostEqual(1, float(np.median(sweepData.magnitude)), delta=0.01)
+        self.assertFalse(sib.sib._comms._ser.simulator.awake)
+
+    def test_resetSibConnectionReopensAndReconfiguresThePort(self):
+        sib = self._createSib(UseCase.WWContinuous, ContinuousSib, 'resonance')
+        simulator = sib.sib._comms._ser.simulator
+        with self.assertRaises(SIBReconnectException):
+            sib.resetSibConnection()
+        reopened = sib.sib._comms._ser.simulator
+        self.assertIsNot(simulator, reopened)
+        self.assertEqual(1, reopened.commands[b'!C03'])
+        self.assertEqual(sib.sib.num_pts, reopened.num_pts)
+        sweepData = sib.takeScan(self.directory.name, np.nan)
+        self.assertAlmostEqual(130, sweepData.frequency[np.argmin(sweepData.magnitude)], delta=0.5)
+
+    def test_rollerBottleScanFocusesOnThePeak(self):
+        sib = self._createSib(UseCase.RollerBottle, RollerBottleSib, 'peak')
+        sweepData = sib.takeScan(self.directory.name, np.nan)
+        self.assertEqual(200, len(sweepData.frequency))
+        self.assertEqual(len(sweepData.frequency), len(sweepData.magnitude))
+        self.assertLessEqual(sweepData.frequency[-1] - sweepData.frequency[0], 20 + 1e-9)
+        self.assertAlmostEqual(140, sweepData.frequency[np.argmax(sweepData.magnitude)], delta=1)
+        commands = sib.sib._comms._ser.simulator.commands
+        self.assertEqual(commands[b'!C80'], commands[b'!C03'])  # every optimizer sweep configures the DDS
+        self.assertFalse(sib.sib._comms._ser.simulator.awake)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import csv
+import os
+import tempfile
+import unittest
+from itertools import zip_longest
+
+import numpy as np
+
+from src.app.helper_methods.data_helpers import frequencyToIndex, sgiCsvColumn
+from src.app.helper_methods.file_manager.streaming_csv_writer import StreamingCsvWriter
+
+
+def _writeWithCsvModule(path, headers, columns):
+    """The way the analyzed files were written before the streaming writer."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(zip_longest(*columns, fillvalue=np.nan))
+
+
+class TestStreamingCsvWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "Analyzed.csv")
+        self.expectedPath = os.path.join(self.directory.name, "expected.csv")
+        self.headers = ['Filename', 'Time (hours)', 'SGI', 'Estimated Harvest Time (hrs)']
+        self.writer = StreamingCsvWriter(self.path, self.headers)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertMatchesCsvModule(self, columns):
+        self.writer.write(columns)
+        _writeWithCsvModule(self.expectedPath, self.headers, columns)
+        with open(self.path, 'rb') as actual, open(self.expectedPath, 'rb') as expected:
+            self.assertEqual(expected.read(), actual.read())
+
+    def test_matchesCsvModuleAcrossAppendsAndEdits(self):
+        rng = np.random.default_rng(0)
+        filenames, harvestTimes = [], []
+        time, sgi = np.empty(0), np.empty(0)
+        for scan in range(200):
+            filenames.append(f"{1700000000000 + scan}.csv")
+            time = np.append(time, scan / 12)
+            sgi = np.append(sgi, rng.normal(10, 1))
+            harvestTimes.append(np.nan if scan < 150 else round(rng.normal(1700000000000, 100)))
+            if scan % 17 == 0:
+                sgi[-rng.integers(1, len(sgi) + 1):] *= 1.01
+            if scan % 41 == 0:
+                del filenames[-3:]
+            self.assertMatchesCsvModule([np.array(filenames, dtype=object), time, sgi, harvestTimes])
+        self.assertLess(self.writer.rowsWritten, 200 * 100)
+
+    def test_clampedSgiIsWrittenLikeTheListConversion(self):
+        frequencies = [130.5, 130.0, 129.0, np.nan, 125.25]
+        listSgi = [max(0, 100 * (1 - value / 130.0)) for value in frequencies]
+        self.writer.write([["a.csv"] * 5, [0.0, 0.1, 0.2, 0.3, 0.4], sgiCsvColumn(frequencyToIndex(130.0, frequencies)),
+                           [np.nan] * 5])
+        _writeWithCsvModule(self.expectedPath, self.headers, [["a.csv"] * 5, [0.0, 0.1, 0.2, 0.3, 0.4], listSgi,
+                                                              [np.nan] * 5])
+        with open(self.path, 'rb') as actual, open(self.expectedPath, 'rb') as expected:
+            self.assertEqual(expected.read(), actual.read())
+
+    def test_onlyAppendsWhenRowsAreAdded(self):
+        time = []
+        for scan in range(50):
+            time.append(scan * 0.25)
+            self.assertMatchesCsvModule([time, time, time, time])
+        self.assertEqual(self.writer.fullRewrites, 1)
+        self.assertEqual(self.writer.rowsWritten, 50)
+
+    def test_rewritesWhenFileIsRemoved(self):
+        self.assertMatchesCsvModule([[1.0, 2.0], [3.0], [], [np.nan]])
+        os.remove(self.path)
+        self.assertMatchesCsvModule([[1.0, 2.0, 5.0], [3.0], [], [np.nan]])
+        self.assertEqual(self.writer.fullRewrites, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
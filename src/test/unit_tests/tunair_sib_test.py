@@ -0,0 +1,73 @@
+import dataclasses
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.app.reader.sib.port_allocator import PortAllocator
+from src.app.reader.sib.sib_utils import createCalibrationFile, normalizeToReference
+from src.app.use_case.tunair.tunair_sib import TunairSib
+from src.resources.version.version import Version, UseCase
+
+
+def _perPointMeasurePoint(sib: TunairSib, freq: float) -> (list, list):
+    """The acquisition loop TunairSib.measurePoint replaced, configuring and calibrating every repeat."""
+    allReferenceVolts, allFreqVolts = [], []
+    stepSize = abs(freq - sib.referenceFreqMHz)
+    if freq > sib.referenceFreqMHz:
+        sib.prepareSweep(sib.referenceFreqMHz - stepSize, sib.referenceFreqMHz + stepSize, 3)
+        referenceIndex, pointIndex = 1, 2
+    else:
+        sib.prepareSweep(sib.referenceFreqMHz - (2 * stepSize), sib.referenceFreqMHz, 3)
+        referenceIndex, pointIndex = 2, 1
+    for _ in range(sib.SibProperties.repeatMeasurements):
+        sweepVolts = sib.performSweep()
+        referenceVolts = sib.calibrationPointComparison(sib.referenceFreqMHz, sweepVolts[referenceIndex])
+        allReferenceVolts.append(referenceVolts)
+        allFreqVolts.append(normalizeToReference(sib.calibrationPointComparison(freq, sweepVolts[pointIndex]),
+                                                 referenceVolts))
+    return allReferenceVolts, allFreqVolts
+
+
+class TestTunairSib(unittest.TestCase):
+
+    def setUp(self):
+        Version.setInMemoryUseCase(UseCase.Tunair)
+        self.directory = tempfile.TemporaryDirectory()
+        self.calibrationFile = os.path.join(self.directory.name, 'Calibration.csv')
+        calibrationFrequency = np.arange(50, 170, 0.2)
+        createCalibrationFile(self.calibrationFile, calibrationFrequency,
+                              np.linspace(1.4, 1.7, len(calibrationFrequency)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+        Version._inMemoryUseCase = None
+        Version.invalidateUseCase()
+
+    def _createSimulatedSib(self) -> TunairSib:
+        port = SimpleNamespace(device='sib350sim://?latency_ms=0&profile=tunair&seed=3', serial_number='simulated')
+        sib = TunairSib(port, self.calibrationFile, 1, PortAllocator())
+        sib.SibProperties = dataclasses.replace(sib.SibProperties, repeatMeasurements=5, settleSeconds=0)
+        sib.setReferenceFrequency(150)
+        sib.sib.wake()
+        return sib
+
+    def test_measurePointMatchesThePerRepeatLoop(self):
+        batchedSib, perPointSib = self._createSimulatedSib(), self._createSimulatedSib()
+        for freq in [120.4, 139.8, 152.2]:
+            referenceVolts, freqVolts = batchedSib.measurePoint(freq)
+            expectedReferenceVolts, expectedFreqVolts = _perPointMeasurePoint(perPointSib, freq)
+            np.testing.assert_allclose(expectedReferenceVolts, referenceVolts)
+            np.testing.assert_allclose(expectedFreqVolts, freqVolts)
+
+    def test_measurePointAtTheReferenceIsNormalizedToOne(self):
+        sib = self._createSimulatedSib()
+        referenceVolts, freqVolts = sib.measurePoint(sib.referenceFreqMHz)
+        self.assertTrue(np.all(np.isnan(referenceVolts)))
+        np.testing.assert_array_equal(np.ones(5), freqVolts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.app.common_modules.aws.upload_queue import UploadQueue
+
+
+class _LocalUploadTransport:
+    """
+    Stand-in for AwsBoto3 as the UploadQueue transport, storing objects and rows under a local folder.
+
+    Objects are copied to {folder}/{bucket}/{destination} and rows written to {folder}/{table}/{n}.json in the order
+    they were sent. While offline every call raises ConnectionError like AwsBoto3 does without internet. Every batch of
+    rows sent is kept in batches.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.offline = False
+        self.calls = 0
+        self.batches = []
+
+    def putObject(self, fileLocation: str, bucket: str, destination: str, extraArgs: dict):
+        self._connect()
+        objectFile = os.path.join(self.folder, bucket, destination)
+        os.makedirs(os.path.dirname(objectFile), exist_ok=True)
+        shutil.copyfile(fileLocation, objectFile)
+
+    def putItems(self, items: list) -> list:
+        self._connect()
+        self.batches.append(items)
+        for table, item in items:
+            tableFolder = os.path.join(self.folder, table)
+            os.makedirs(tableFolder, exist_ok=True)
+            with open(os.path.join(tableFolder, f"{len(os.listdir(tableFolder))}.json"), "w") as itemFile:
+                json.dump(item, itemFile)
+        return []
+
+    def _connect(self):
+        self.calls += 1
+        if self.offline:
+            raise ConnectionError("Offline")
+
+
+
+def _stopQueue():
+    if UploadQueue._instance is not None:
+        UploadQueue._instance.stop()
+    UploadQueue._instance = None
+
+
+def _startQueue(folder: str, offline: bool) -> UploadQueue:
+    _stopQueue()
+    transport = _LocalUploadTransport(f"{folder}/s3")
+    transport.offline = offline
+    uploadQueue = UploadQueue()
+    uploadQueue.retrySeconds = 0.05
+    uploadQueue.start(transport, f"{folder}/queue.sqlite")
+    return uploadQueue
+
+
+class TestUploadQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.folder = self.directory.name
+        self.scanFile = f"{self.folder}/smoothAnalyzed.csv"
+
+    def tearDown(self):
+        _stopQueue()
+        self.directory.cleanup()
+
+    def _writeScanFile(self, contents: str):
+        with open(self.scanFile, "w") as scanFile:
+            scanFile.write(contents)
+
+    def test_supersededUploadsAreSentOnce(self):
+        uploadQueue = _startQueue(self.folder, offline=True)
+        for version in range(3):
+            self._writeScanFile(f"version {version}")
+            uploadQueue.enqueueFile(self.scanFile, "bucket", "run/smoothAnalyzed.csv", {"ContentType": "text/csv"})
+            uploadQueue.enqueueItem("runs", "customer/1", {"lastUpdated": {"N": str(version)}})
+        self.assertEqual(2, uploadQueue.getPendingCount())
+        uploadQueue.transport.offline = False
+        self.assertTrue(uploadQueue.waitUntilEmpty(5))
+        with open(f"{self.folder}/s3/bucket/run/smoothAnalyzed.csv") as uploaded:
+            self.assertEqual("version 2", uploaded.read())
+        self.assertEqual(["0.json"], os.listdir(f"{self.folder}/s3/runs"))
+        with open(f"{self.folder}/s3/runs/0.json") as row:
+            self.assertEqual({"lastUpdated": {"N": "2"}}, json.load(row))
+
+    def test_offlineRetriesBackOffExponentially(self):
+        uploadQueue = _startQueue(self.folder, offline=True)
+        uploadQueue.enqueueItem("runs", "customer/1", {})
+        time.sleep(0.6)
+        # Retries after 0.05, 0.1, 0.2 and 0.4 s rather than one per job or one per poll.
+        self.assertLessEqual(uploadQueue.transport.calls, 5)
+        self.assertGreaterEqual(uploadQueue.connectionFailures, 3)
+        self.assertEqual(1, uploadQueue.getPendingCount())
+
+    def test_queuedWorkSurvivesRestarts(self):
+        self._writeScanFile("queued before restart")
+        _startQueue(self.folder, offline=True).enqueueFile(self.scanFile, "bucket", "run/smoothAnalyzed.csv", {})
+        restarted = _startQueue(self.folder, offline=False)
+        self.assertTrue(restarted.waitUntilEmpty(5))
+        self.assertTrue(os.path.exists(f"{self.folder}/s3/bucket/run/smoothAnalyzed.csv"))
+
+    def test_rowsAreBatchedCoalescedAndSkipped(self):
+        uploadQueue = _startQueue(self.folder, offline=True)
+        for run in range(30):
+            uploadQueue.enqueueItem("runs", f"customer/{run}", {"runUid": {"N": str(run)}})
+        uploadQueue.transport.offline = False
+        self.assertTrue(uploadQueue.waitUntilEmpty(5))
+        self.assertEqual([25, 5], [len(batch) for batch in uploadQueue.transport.batches])
+
+        for version in range(3):
+            uploadQueue.enqueueItem("runs", "customer/0", {"saturation": {"S": str(version)}}, delaySeconds=60)
+        self.assertEqual(1, uploadQueue.getPendingCount())
+        uploadQueue.enqueueItem("runs", "customer/0", {"endDate": {"S": "1"}, "lastUpdated": {"N": "1"}},
+                                ignoredAttributes=("lastUpdated",))
+        self.assertTrue(uploadQueue.waitUntilEmpty(5))
+        uploadQueue.enqueueItem("runs", "customer/0", {"endDate": {"S": "1"}, "lastUpdated": {"N": "2"}},
+                                ignoredAttributes=("lastUpdated",))
+        self.assertEqual(0, uploadQueue.getPendingCount())
+        self.assertEqual(3, len(uploadQueue.transport.batches))
+        self.assertEqual({"endDate": {"S": "1"}}, uploadQueue.sentItems["dynamodb:runs/customer/0"])
+        metrics = uploadQueue.getRowMetrics()
+        self.assertEqual(35, metrics["queued"])
+        self.assertEqual((3, 1, 4), (metrics["coalesced"], metrics["skipped"], metrics["writesSaved"]))
+
+    def test_queueThatWasNeverStartedIsEmpty(self):
+        _stopQueue()
+        self.assertTrue(UploadQueue().waitUntilEmpty(0))
+        self.assertEqual(0, UploadQueue().getPendingCount())
+
+    def test_stopEndsTheWorkerAndClosesTheDatabase(self):
+        uploadQueue = _startQueue(self.folder, offline=True)
+        worker = uploadQueue.worker
+        uploadQueue.stop()
+        self.assertFalse(worker.is_alive())
+        self.assertIsNone(uploadQueue.database)
+
+    def test_missingFilesAreDropped(self):
+        uploadQueue = _startQueue(self.folder, offline=False)
+        uploadQueue.enqueueFile(f"{self.folder}/deleted.csv", "bucket", "run/deleted.csv", {})
+        self.assertTrue(uploadQueue.waitUntilEmpty(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
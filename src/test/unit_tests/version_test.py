@@ -108,6 +108,21 @@ class TestSetDeviceUseCase(unittest.TestCase):
             os.remove(config_path)
 
 
+class TestUseCaseCache(unittest.TestCase):
+
+    def tearDown(self):
+        Version._inMemoryUseCase = None
+        Version.invalidateUseCase()
+
+    def test_device_config_read_once_until_use_case_set(self):
+        first = Version().useCase
+        with patch("builtins.open", side_effect=AssertionError("device config read again")):
+            self.assertEqual(first, Version().useCase)
+            Version.setInMemoryUseCase(UseCase.RollerBottle)
+            self.assertEqual(UseCase.RollerBottle, Version().useCase)
+            self.assertEqual(Theme.Skroot, Version().getTheme())
+
+
 class TestGetAllUseCases(unittest.TestCase):
 
     def test_returns_all_six_use_cases(self):